@@ -11,16 +11,21 @@ import numpy as np
 from datetime import datetime, timedelta
 import config
 from data.data_handler import DataHandler
+from data.bar_series import BarSeries
+from data.tick_archive import TickArchive
 from indicators.technical import TechnicalIndicators
 from strategy.signal_generator import SignalGenerator
 from strategy.risk_manager import RiskManager
 
 class Backtester:
     def __init__(self):
-        self.handler = DataHandler()
+        # Offline tool: may run on the local history store without a terminal
+        self.handler = DataHandler(store_fallback=True)
         self.signal_generator = SignalGenerator()
         self.technical = TechnicalIndicators()
         self.risk_manager = RiskManager()
+        # Recorded ticks decide bars that touch both the stop and the target
+        self.ticks = TickArchive()
         
         self.trades = []
         self.equity_curve = []
@@ -40,19 +45,25 @@ class Backtester:
             print(f"Initial Capital: ${initial_capital:,.2f}")
             print("=" * 60)
             
-            # Connect to MT5
+            # Connect to the data source; without it the bars come from the local history store
             if not self.handler.connect_mt5():
-                print("[ERROR] Failed to connect to MT5")
-                return None
+                print(f"[WARN] Data source unavailable, backtesting on the local history store "
+                      f"({self.handler.store.root}); results only cover the bars archived there")
+            else:
+                # Pips, stops and lot sizes follow the symbol's contract specification
+                symbol_info = self.handler.get_symbol_info()
+                self.signal_generator = SignalGenerator(symbol_info)
+                self.risk_manager = self.signal_generator.risk_manager
             
             capital = initial_capital
             self.trades = []
             self.equity_curve = [initial_capital]
             
-            # Get historical data
+            # Get historical data from start_date (plus the indicator warm-up) to end_date
             print("Fetching historical data...")
-            df_h4 = self.handler.get_gold_data('H4', 5000)  # Large dataset
-            df_m15 = self.handler.get_gold_data('M15', 10000)
+            fetch_end = pd.to_datetime(end_date) + timedelta(days=1)
+            df_h4 = self.handler.get_range('H4', start_date, fetch_end, SignalGenerator.H4_COLUMNS)
+            df_m15 = self.handler.get_range('M15', start_date, fetch_end, SignalGenerator.M15_COLUMNS)
             
             if df_h4 is None or df_m15 is None:
                 print("[ERROR] Failed to fetch data")
@@ -60,8 +71,11 @@ class Backtester:
             
             # Calculate indicators
             print("[CALC] Calculating indicators...")
-            df_h4 = self.technical.calculate_all(df_h4)
-            df_m15 = self.technical.calculate_all(df_m15)
+            df_h4 = self.technical.calculate_all(df_h4, SignalGenerator.H4_COLUMNS)
+            df_m15 = self.technical.calculate_all(df_m15, SignalGenerator.M15_COLUMNS)
+            if self.technical.cache is not None:
+                stats = self.technical.cache.stats()
+                print(f"[CACHE] indicator frames: {stats['hits']} hits, {stats['misses']} misses")
             
             # Filter by date range
             start = pd.to_datetime(start_date)
@@ -70,31 +84,48 @@ class Backtester:
             df_h4 = df_h4[(df_h4.index >= start) & (df_h4.index <= end)]
             df_m15 = df_m15[(df_m15.index >= start) & (df_m15.index <= end)]
             
+            # Array-backed views: per-bar slicing below is O(1)
+            bars_h4 = BarSeries.from_frame(df_h4)
+            bars_m15 = BarSeries.from_frame(df_m15)
+            
+            # Key levels of every H4 prefix, computed once instead of per bar
+            structural = self.signal_generator.structural
+            levels_table = structural.levels_table(df_h4)
+            
+            # Trading-session mask of every H4 bar in one table lookup
+            _, session_open = self.signal_generator.market_hours.session_table(df_h4.index)
+            
             print(f"[DATA] Analyzing {len(df_h4)} H4 bars...")
             
             # Simulate trading
             signals_checked = 0
             
-            for i in range(100, len(df_h4) - 50):  # Leave buffer for forward testing
+            for i in range(100, len(bars_h4) - 50):  # Leave buffer for forward testing
                 # Get data up to current point
-                current_h4 = df_h4.iloc[:i+1]
-                current_m15 = df_m15[df_m15.index <= current_h4.index[-1]]
+                current_h4 = bars_h4[:i+1]
+                
+                # Get current timestamp
+                current_time = current_h4.timestamp()
+                current_m15 = bars_m15.until(current_time)
                 
                 if len(current_m15) < 100:
                     continue
                 
-                # Get current timestamp
-                current_time = current_h4.index[-1]
+                signals_checked += 1
+                
+                # Outside trading hours generate_signal would stop at its session check
+                if not session_open[i]:
+                    continue
                 
                 # Generate signal with timestamp for backtesting
-                signal = self.signal_generator.generate_signal(current_h4, current_m15, current_time)
-                signals_checked += 1
+                signal = self.signal_generator.generate_signal(
+                    current_h4, current_m15, current_time, levels=structural.levels_at(levels_table, i))
                 
                 if signal:
                     # Simulate trade execution
                     trade_result = self._simulate_trade(
                         signal,
-                        df_m15[df_m15.index > current_h4.index[-1]].head(500),
+                        bars_m15.after(current_time)[:500],
                         capital
                     )
                     
@@ -109,7 +140,7 @@ class Backtester:
                 
                 # Progress update
                 if i % 100 == 0:
-                    progress = (i / len(df_h4)) * 100
+                    progress = (i / len(bars_h4)) * 100
                     print(f"Progress: {progress:.1f}% | Signals: {len(self.trades)} | Balance: ${capital:.2f}")
             
             # Calculate final metrics
@@ -146,7 +177,7 @@ class Backtester:
             return None
     
     def _simulate_trade(self, signal, future_data, capital):
-        """Simulate how a trade would have performed"""
+        """Simulate how a trade would have performed (future_data: BarSeries)"""
         try:
             entry = signal['entry_price']
             stop_loss = signal['stop_loss']
@@ -161,11 +192,25 @@ class Backtester:
             if lot_size == 0:
                 return None
             
+            highs = future_data['High']
+            lows = future_data['Low']
+            
             # Track trade through future data
-            for i, (timestamp, bar) in enumerate(future_data.iterrows()):
+            for i in range(len(future_data)):
+                timestamp = future_data.timestamp(i)
+                
+                if direction == 'LONG':
+                    stop_hit, target_hit = lows[i] <= stop_loss, highs[i] >= tp1
+                else:
+                    stop_hit, target_hit = highs[i] >= stop_loss, lows[i] <= tp1
+                
+                # Both inside one bar: the stop is assumed first unless recorded ticks say otherwise
+                if stop_hit and target_hit and self._target_first(direction, stop_loss, tp1, timestamp):
+                    stop_hit = False
+                
                 if direction == 'LONG':
                     # Check if stop loss hit
-                    if bar['Low'] <= stop_loss:
+                    if stop_hit:
                         pnl = (stop_loss - entry) * lot_size * 100  # 100 oz per lot
                         return {
                             'direction': direction,
@@ -179,7 +224,7 @@ class Backtester:
                         }
                     
                     # Check if TP1 hit
-                    if bar['High'] >= tp1:
+                    if target_hit:
                         pnl = (tp1 - entry) * lot_size * 100
                         return {
                             'direction': direction,
@@ -194,7 +239,7 @@ class Backtester:
                 
                 else:  # SHORT
                     # Check if stop loss hit
-                    if bar['High'] >= stop_loss:
+                    if stop_hit:
                         pnl = (entry - stop_loss) * lot_size * 100
                         return {
                             'direction': direction,
@@ -208,7 +253,7 @@ class Backtester:
                         }
                     
                     # Check if TP1 hit
-                    if bar['Low'] <= tp1:
+                    if target_hit:
                         pnl = (entry - tp1) * lot_size * 100
                         return {
                             'direction': direction,
@@ -231,6 +276,28 @@ class Backtester:
             print(f"Error simulating trade: {e}")
             return None
     
+    def _target_first(self, direction, stop_loss, target, bar_time, bar_minutes=15):
+        """
+        Whether the target traded before the stop inside one bar, by the
+        recorded ticks (longs exit on the bid, shorts on the ask); False
+        when the bar has no ticks or neither level is crossed
+        """
+        try:
+            start = pd.Timestamp(bar_time)
+            ticks = self.ticks.load(config.SYMBOL, start, start + pd.Timedelta(minutes=bar_minutes))
+        except Exception as e:
+            print(f"Error reading ticks: {e}")
+            return False
+        
+        if direction == 'LONG':
+            stops, targets = ticks['bid'] <= stop_loss, ticks['bid'] >= target
+        else:
+            stops, targets = ticks['ask'] >= stop_loss, ticks['ask'] <= target
+        
+        if not targets.any():
+            return False
+        return not stops.any() or int(np.argmax(targets)) < int(np.argmax(stops))
+    
     def _calculate_metrics(self, initial_capital, final_capital):
         """Calculate performance metrics"""
         if len(self.trades) == 0:
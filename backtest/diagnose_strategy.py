@@ -7,11 +7,12 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 import config
 from data.data_handler import DataHandler
 from indicators.technical import TechnicalIndicators
-from indicators.structural import StructuralLevels
+from indicators.structural import StructuralLevels, sweep_events, latest_sweep
 from strategy.regime_detector import RegimeDetector
 from data.market_hours import MarketHours
 
@@ -19,14 +20,13 @@ print("[SCAN] STRATEGY DIAGNOSTIC TOOL")
 print("=" * 60)
 
 # Connect and get data
-handler = DataHandler()
+handler = DataHandler(store_fallback=True)
 if not handler.connect_mt5():
-    print("[ERROR] Failed to connect to MT5")
-    exit()
+    print("[WARN] Data source unavailable, reading the local history store")
 
 print("\nFetching recent data...")
-df_h4 = handler.get_gold_data('H4', 500)
-df_m15 = handler.get_gold_data('M15', 1000)
+frames = handler.get_frames({'H4': dict(bars=500), 'M15': dict(bars=1000)})
+df_h4, df_m15 = frames['H4'], frames['M15']
 
 if df_h4 is None or df_m15 is None:
     print("[ERROR] Failed to fetch data")
@@ -36,8 +36,8 @@ if df_h4 is None or df_m15 is None:
 # Calculate indicators
 print("[CALC] Calculating indicators...")
 tech = TechnicalIndicators()
-df_h4 = tech.calculate_all(df_h4)
-df_m15 = tech.calculate_all(df_m15)
+df_h4 = tech.calculate_all(df_h4, RegimeDetector.REQUIRED_COLUMNS)
+df_m15 = tech.calculate_all(df_m15, ('RSI', 'Stoch_K', 'Stoch_D'))
 
 # Analyze last 100 bars
 print("\n" + "=" * 60)
@@ -48,44 +48,44 @@ detector = RegimeDetector()
 market_hours = MarketHours()
 structural = StructuralLevels()
 
+# Key levels as of every H4 bar, looked up below instead of recomputed
+levels_table = structural.levels_table(df_h4)
+# Trading-session mask of every H4 bar
+_, session_open = market_hours.session_table(df_h4.index)
+
 favorable_count = 0
 session_ok_count = 0
 level_near_count = 0
 sweep_count = 0
 rsi_ok_count = 0
+sweep_checks = []  # (M15 bars seen, nearest level) per H4 bar
 
 for i in range(-100, 0):
     try:
         current_h4 = df_h4.iloc[:i]
-        current_m15 = df_m15[df_m15.index <= current_h4.index[-1]]
+        m15_stop = df_m15.index.searchsorted(current_h4.index[-1], side='right')
+        current_m15 = df_m15.iloc[:m15_stop]
         
         if len(current_m15) < 50:
             continue
         
-        timestamp = current_h4.index[-1]
-        
         # Check regime
         regime, adx = detector.detect_regime(current_h4)
         if detector.is_favorable_regime(regime):
             favorable_count += 1
         
         # Check session
-        should_trade, _ = market_hours.should_trade_now(timestamp)
-        if should_trade:
+        if session_open[len(current_h4) - 1]:
             session_ok_count += 1
         
         # Check for nearby levels
-        levels = structural.identify_key_levels(current_h4)
+        levels = structural.levels_at(levels_table, len(current_h4) - 1)
         current_price = current_m15['Close'].iloc[-1]
         nearest, name, dist = structural.find_nearest_level(current_price, levels, max_distance_pips=30)
         
         if nearest:
             level_near_count += 1
-            
-            # Check for sweep
-            sweep = structural.check_liquidity_sweep(current_m15, nearest)
-            if sweep['detected']:
-                sweep_count += 1
+            sweep_checks.append((m15_stop, nearest))
         
         # Check RSI
         rsi = current_m15['RSI'].iloc[-1]
@@ -95,6 +95,16 @@ for i in range(-100, 0):
     except Exception as e:
         continue
 
+# Check for sweeps: one pass over the M15 series for all levels found above
+if sweep_checks:
+    stops, nearest_levels = (np.array(values) for values in zip(*sweep_checks))
+    candidates, level_ids = np.unique(nearest_levels, return_inverse=True)
+    events = sweep_events(df_m15['High'], df_m15['Low'], df_m15['Close'], candidates)
+    
+    for level_id in range(len(candidates)):
+        found = latest_sweep(events, level_id, stops[level_ids == level_id], StructuralLevels.SWEEP_LOOKBACK)
+        sweep_count += int((found >= 0).sum())
+
 print(f"\nCondition Analysis (out of ~100 bars checked):")
 print(f"  - Favorable Regime:     {favorable_count:3d} bars ({favorable_count}%)")
 print(f"  - Trading Session OK:   {session_ok_count:3d} bars ({session_ok_count}%)")
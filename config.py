@@ -10,6 +10,14 @@ MT5_LOGIN = int(os.getenv('MT5_LOGIN', 0))
 MT5_PASSWORD = os.getenv('MT5_PASSWORD')
 MT5_SERVER = os.getenv('MT5_SERVER')
 SYMBOL = os.getenv('SYMBOL', 'XAUUSDm')
+# Symbols the bot scans (comma-separated, default: SYMBOL), in parallel
+# across SCAN_WORKERS threads
+SYMBOLS = [symbol.strip() for symbol in os.getenv('SYMBOLS', SYMBOL).split(',') if symbol.strip()]
+SCAN_WORKERS = int(os.getenv('SCAN_WORKERS', 4))
+# Where bars and prices come from: 'mt5' (terminal, Windows only), 'replay'
+# (files in REPLAY_DATA_DIR, default HISTORY_STORE_DIR) or 'synthetic'
+MARKET_DATA_SOURCE = os.getenv('MARKET_DATA_SOURCE', 'mt5')
+REPLAY_DATA_DIR = os.getenv('REPLAY_DATA_DIR', '')
 
 ACCOUNT_BALANCE = float(os.getenv('ACCOUNT_BALANCE', 10000))
 RISK_PERCENT = float(os.getenv('RISK_PERCENT', 1.5))
@@ -32,9 +40,31 @@ MACD_FAST = 12
 MACD_SLOW = 26
 MACD_SIGNAL = 9
 ATR_PERIOD = 14
+# Divergence: bars back to compare; pivot window 0 = compare the bar
+# DIVERGENCE_LOOKBACK-1 back, N = last two swing pivots with N bars each side
+DIVERGENCE_LOOKBACK = 14
+DIVERGENCE_PIVOT_WINDOW = int(os.getenv('DIVERGENCE_PIVOT_WINDOW', 0))
+# Swing levels: 0 = highest high/lowest low of the lookback, N = newest
+# fractal pivot with N bars each side (the range if none in the lookback)
+SWING_PIVOT_ORDER = int(os.getenv('SWING_PIVOT_ORDER', 0))
+# Extra swing levels (swing_high_N / swing_low_N): the newest fractal pivot
+# of each order N within the swing lookback, all orders from one tracker
+SWING_PIVOT_ORDERS = [int(order) for order in os.getenv('SWING_PIVOT_ORDERS', '3,5,10').split(',') if order.strip()]
+
+# 'numpy' = fused vectorized kernel, 'ta' = original ta-library classes
+INDICATOR_BACKEND = os.getenv('INDICATOR_BACKEND', 'numpy')
+# Byte budget of the shared calculate_all result cache
+INDICATOR_CACHE_MB = int(os.getenv('INDICATOR_CACHE_MB', 64))
+# A bar counts as warmed up once EMA/Wilder seeds have decayed below this
+# fraction of their starting error (sizes history fetches and buffers)
+INDICATOR_CONVERGENCE_TOLERANCE = float(os.getenv('INDICATOR_CONVERGENCE_TOLERANCE', 1e-3))
 
 MIN_RISK_REWARD = 1.5
 MAX_STOP_LOSS_PIPS = 30
+# Pip of a symbol without a contract specification (XAUUSD: 0.10 in price,
+# $10 per lot); with one, a pip is ten points (see metadata_cache.pip_spec)
+PIP_SIZE = 0.10
+PIP_VALUE = 10.0
 TP1_RATIO = 1.5
 TP2_RATIO = 2.5
 TP3_RATIO = 4.0
@@ -46,9 +76,22 @@ LONDON_OPEN = 8
 LONDON_CLOSE = 16
 NY_OPEN = 13
 NY_CLOSE = 21
+# Trading calendar (GMT dates, comma-separated YYYY-MM-DD): holidays are
+# closed all day, half days stop taking trades from HALF_DAY_CLOSE
+MARKET_HOLIDAYS = [day.strip() for day in os.getenv('MARKET_HOLIDAYS', '').split(',') if day.strip()]
+MARKET_HALF_DAYS = [day.strip() for day in os.getenv('MARKET_HALF_DAYS', '').split(',') if day.strip()]
+HALF_DAY_CLOSE = int(os.getenv('HALF_DAY_CLOSE', 17))
 
 TIMEFRAME_H4 = 'H4'
 TIMEFRAME_M15 = 'M15'
+# Bar length in minutes per timeframe name
+TIMEFRAME_MINUTES = {'M1': 1, 'M5': 5, 'M15': 15, 'M30': 30, 'H1': 60, 'H4': 240, 'D1': 1440}
+# Timeframes DataHandler aggregates from RESAMPLE_BASE_TIMEFRAME bars instead
+# of fetching (empty = fetch everything); bars open on multiples of their
+# length in broker server time, shifted by RESAMPLE_OFFSET_MINUTES
+RESAMPLE_BASE_TIMEFRAME = os.getenv('RESAMPLE_BASE_TIMEFRAME', 'M15')
+RESAMPLED_TIMEFRAMES = [tf.strip() for tf in os.getenv('RESAMPLED_TIMEFRAMES', 'H1,H4,D1').split(',') if tf.strip()]
+RESAMPLE_OFFSET_MINUTES = int(os.getenv('RESAMPLE_OFFSET_MINUTES', 0))
 
 USE_ML_FILTER = True
 ML_CONFIDENCE_THRESHOLD = 0.65
@@ -58,6 +101,17 @@ ML_TRAINING_SAMPLES = 1000
 BACKTEST_START_DATE = '2023-01-01'
 BACKTEST_END_DATE = '2025-09-28'
 BACKTEST_INITIAL_CAPITAL = 100
+# On-disk OHLCV history (symbol/timeframe/month .npy files): DataHandler
+# archives closed bars here; backtests and tools read it without MT5
+HISTORY_STORE_DIR = os.getenv('HISTORY_STORE_DIR', 'data/history')
+# Tick archive (compressed per-day chunks): the recorder polls the terminal
+# every TICK_POLL_SECONDS and writes a chunk every TICK_FLUSH_SECONDS
+TICK_ARCHIVE_DIR = os.getenv('TICK_ARCHIVE_DIR', 'data/ticks')
+TICK_RECORDER_ENABLED = os.getenv('TICK_RECORDER_ENABLED', 'false').lower() == 'true'
+TICK_POLL_SECONDS = float(os.getenv('TICK_POLL_SECONDS', 1))
+TICK_FLUSH_SECONDS = int(os.getenv('TICK_FLUSH_SECONDS', 60))
+# Ticks fetched on the first poll of an empty archive
+TICK_BACKFILL_MINUTES = int(os.getenv('TICK_BACKFILL_MINUTES', 60))
 
 
 LOG_LEVEL = 'INFO'
@@ -65,6 +119,17 @@ LOG_FILE = 'logs/trading.log'
 
 
 SCAN_INTERVAL_MINUTES = 15
+# Seconds after each bar close to wait for the broker to finalize the bar
+SCAN_SETTLE_SECONDS = int(os.getenv('SCAN_SETTLE_SECONDS', 5))
+# Minutes a symbol is skipped after it produced a signal (0 = off)
+SIGNAL_COOLDOWN_MINUTES = int(os.getenv('SIGNAL_COOLDOWN_MINUTES', 0))
+# Signals per symbol per day; the symbol is skipped until midnight after that (0 = no limit)
+MAX_SIGNALS_PER_DAY = int(os.getenv('MAX_SIGNALS_PER_DAY', 0))
+# Metadata cache: symbol specs rarely change, balance/equity move with trades;
+# the refresher reloads entries due within its interval (0 = off)
+SYMBOL_INFO_TTL_SECONDS = int(os.getenv('SYMBOL_INFO_TTL_SECONDS', 3600))
+ACCOUNT_INFO_TTL_SECONDS = int(os.getenv('ACCOUNT_INFO_TTL_SECONDS', 30))
+METADATA_REFRESH_SECONDS = int(os.getenv('METADATA_REFRESH_SECONDS', 10))
 
 
 ENVIRONMENT = os.getenv('ENVIRONMENT', 'production')
@@ -83,14 +148,16 @@ def validate_config():
     if not TELEGRAM_CHAT_ID:
         errors.append("TELEGRAM_CHAT_ID not set in .env file")
     
-    if MT5_LOGIN == 0:
-        errors.append("MT5_LOGIN not set in .env file")
-    
-    if not MT5_PASSWORD:
-        errors.append("MT5_PASSWORD not set in .env file")
-    
-    if not MT5_SERVER:
-        errors.append("MT5_SERVER not set in .env file")
+    # Replay and synthetic data sources run without a terminal account
+    if MARKET_DATA_SOURCE == 'mt5':
+        if MT5_LOGIN == 0:
+            errors.append("MT5_LOGIN not set in .env file")
+        
+        if not MT5_PASSWORD:
+            errors.append("MT5_PASSWORD not set in .env file")
+        
+        if not MT5_SERVER:
+            errors.append("MT5_SERVER not set in .env file")
     
     if errors:
         print(" Configuration Errors:")
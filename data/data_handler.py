@@ -2,164 +2,392 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
-import MetaTrader5 as mt5
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import pytz
 import config
+from indicators.technical import TechnicalIndicators
+from data.rate_buffer import RateBuffer, rates_frame
+from data.resampler import BarResampler, resample_rates
+from data.history_store import HistoryStore
+from data.sources import create_source
+from data.metadata_cache import metadata, pip_spec
+
+def _utc(moment):
+    """Timestamp as a UTC datetime for range requests (naive = UTC already)"""
+    moment = pd.Timestamp(moment)
+    moment = moment.tz_localize('UTC') if moment.tz is None else moment.tz_convert('UTC')
+    return moment.to_pydatetime()
+
 
 class DataHandler:
-    def __init__(self):
+    def __init__(self, source=None, symbol=None, store_fallback=False):
+        """
+        Args:
+            source: MarketDataSource to read from (default: the one named by
+                    config.MARKET_DATA_SOURCE, MetaTrader 5 unless set)
+            symbol: Symbol to fetch (default: config.SYMBOL)
+            store_fallback: Serve fetches from the local history store while
+                            not connected (offline tools only; the live
+                            path must see None instead of stale bars)
+        """
         self.connected = False
-        self.symbol = config.SYMBOL
+        self.store_fallback = store_fallback
+        self.symbol = symbol or config.SYMBOL
+        self.source = source or create_source()
+        # Latest bars per timeframe, topped up incrementally between fetches
+        self.buffers = {}
+        # Bars that closed between the last two fetches, per timeframe
+        self.new_bars = {}
+        # Higher timeframes built from the base timeframe's buffer:
+        # timeframe -> (base RateBuffer, BarResampler)
+        self.resamplers = {}
+        # Closed bars are archived here for backtests and offline tools
+        self.store = HistoryStore()
+        # Handlers of other symbols sharing this connection (for_symbol)
+        self.children = []
         
     def connect_mt5(self):
-        """Connect to MetaTrader 5"""
+        """Connect to the market-data source (MetaTrader 5 unless configured otherwise)"""
         try:
-            if not mt5.initialize():
-                print(f"MT5 initialization failed: {mt5.last_error()}")
-                return False
-            
-            authorized = mt5.login(
-                login=config.MT5_LOGIN,
-                password=config.MT5_PASSWORD,
-                server=config.MT5_SERVER
-            )
-            
-            if not authorized:
-                print(f"MT5 login failed: {mt5.last_error()}")
-                mt5.shutdown()
-                return False
-            
-            self.connected = True
-            print(" Connected to MetaTrader 5 successfully!")
-            
-            account_info = mt5.account_info()
-            if account_info:
-                print(f"Account: {account_info.login}")
-                print(f"Balance: ${account_info.balance:.2f}")
-                print(f"Equity: ${account_info.equity:.2f}")
-            
-            return True
+            self.connected = self.source.connect()
+            if self.connected:
+                self._register_metadata()
+                metadata.register('account', self.source.account_info, config.ACCOUNT_INFO_TTL_SECONDS)
+            return self.connected
             
         except Exception as e:
-            print(f"Error connecting to MT5: {e}")
+            print(f"Error connecting to {self.source.name} data source: {e}")
             return False
     
+    def _register_metadata(self):
+        """Serve this symbol's specs from the shared metadata cache"""
+        metadata.register(('symbol', self.symbol), lambda: self.source.symbol_info(self.symbol),
+                          config.SYMBOL_INFO_TTL_SECONDS)
+    
+    def for_symbol(self, symbol):
+        """
+        A handler for another symbol on this handler's source
+        
+        It shares the connection (disconnect through this handler) but
+        keeps its own bar buffers, so handlers of different symbols can
+        fetch from separate threads.
+        """
+        handler = DataHandler(self.source, symbol, self.store_fallback)
+        handler.connected = self.connected
+        if handler.connected:
+            handler._register_metadata()
+        self.children.append(handler)
+        return handler
+    
     def disconnect_mt5(self):
-        """Disconnect from MetaTrader 5"""
+        """Disconnect from the market-data source, and the for_symbol handlers with it"""
         if self.connected:
-            mt5.shutdown()
+            for handler in self.children:
+                metadata.unregister(('symbol', handler.symbol))
+                handler.connected = False
+                handler.buffers.clear()
+                handler.resamplers.clear()
+            self.children.clear()
+            metadata.unregister(('symbol', self.symbol))
+            metadata.unregister('account')
+            self.source.disconnect()
             self.connected = False
-            print("Disconnected from MetaTrader 5")
+            self.buffers.clear()
+            self.resamplers.clear()
+            print(f"Disconnected from {self.source.name} data source")
     
-    def get_gold_data(self, timeframe='H4', bars=500):
+    def get_gold_data(self, timeframe='H4', bars=None, columns=None, history=1):
         """
         Fetch OHLCV data for gold
         
+        The first fetch of a timeframe pulls the whole window; later ones
+        only re-fetch the still-forming bar and anything newer, merged into
+        a per-timeframe RateBuffer. new_bars[timeframe] then holds how many
+        bars closed in between (0 = nothing to recompute). Timeframes in
+        RESAMPLED_TIMEFRAMES are built from RESAMPLE_BASE_TIMEFRAME bars
+        instead (see get_frames).
+        
         Args:
             timeframe: 'H4' or 'M15'
-            bars: Number of bars to fetch
+            bars: Number of bars to fetch; None sizes the fetch from the
+                  warm-up of `columns` plus `history` rows
+            columns: Indicator columns that will be computed (None = all)
+            history: Rows of warmed-up indicator output the caller reads
         
         Returns:
-            DataFrame with OHLCV data
+            DataFrame with OHLCV data, or None (also when not connected,
+            unless store_fallback is set)
         """
+        return self.get_frames({timeframe: dict(bars=bars, columns=columns, history=history)})[timeframe]
+    
+    def get_frames(self, requests):
+        """
+        Fetch several timeframes as one consistent snapshot
+        
+        Only the timeframes that can't be resampled are fetched; the
+        higher ones are aggregated locally from the base timeframe's
+        buffer, so e.g. H4 and M15 come from a single terminal call and
+        describe the same moment.
+        
+        Args:
+            requests: dict of timeframe -> get_gold_data keyword arguments
+                      (bars, columns, history)
+        
+        Returns:
+            dict of timeframe -> DataFrame (None where the fetch failed,
+            or everywhere when not connected without store_fallback)
+        """
+        sizes = {}
+        for timeframe, request in requests.items():
+            sizes[timeframe] = request.get('bars') or TechnicalIndicators.required_bars(
+                request.get('columns'), request.get('history', 1))
+        
         if not self.connected:
-            print("Not connected to MT5. Call connect_mt5() first.")
+            if not self.store_fallback:
+                print("Not connected to a data source")
+                return {timeframe: None for timeframe in sizes}
+            print("[WARN] Not connected to a data source, reading the local history store")
+            return {timeframe: self.load_history(timeframe, bars) for timeframe, bars in sizes.items()}
+        
+        base = config.RESAMPLE_BASE_TIMEFRAME
+        derived = [timeframe for timeframe in sizes if self._resampled(timeframe)]
+        fetches = {timeframe: bars for timeframe, bars in sizes.items() if timeframe not in derived}
+        if derived:
+            # a whole extra higher bar, since the oldest period is cut off
+            base_minutes = config.TIMEFRAME_MINUTES[base]
+            fetches[base] = max([fetches.get(base, 0)] + [
+                (sizes[timeframe] + 1) * config.TIMEFRAME_MINUTES[timeframe] // base_minutes
+                for timeframe in derived])
+        
+        buffers = {timeframe: self._fetch(timeframe, bars) for timeframe, bars in fetches.items()}
+        
+        frames = {}
+        for timeframe, bars in sizes.items():
+            try:
+                if timeframe in derived:
+                    buffer = self._resample(timeframe, bars, buffers[base])
+                else:
+                    buffer = buffers[timeframe]
+                
+                if buffer is None:
+                    frames[timeframe] = None
+                    continue
+                
+                df = buffer.to_frame(bars)
+                # Identifies the frame for the shared indicator cache
+                df.attrs['symbol'] = self.symbol
+                df.attrs['timeframe'] = timeframe
+                frames[timeframe] = df
+                
+            except Exception as e:
+                print(f"Error building {timeframe} data: {e}")
+                frames[timeframe] = None
+        
+        return frames
+    
+    def get_range(self, timeframe, start, end=None, columns=None):
+        """
+        Bars between start and end, preceded by the indicator warm-up
+        
+        For backtests: the request is made by date, so its size follows
+        the window instead of how far back start lies. Timeframes in
+        RESAMPLED_TIMEFRAMES are aggregated from the base timeframe's
+        range. A window longer than the source keeps (MT5's "Max. bars in
+        chart") is shortened to the newest bars it can return, with a
+        warning. Without a connection it reads the local history store
+        when store_fallback is set, and returns None otherwise.
+        
+        Args:
+            timeframe: Timeframe name, as for get_gold_data
+            start, end: Window to cover (end default: now)
+            columns: Indicator columns that will be computed (None = all)
+        
+        Returns:
+            DataFrame in get_gold_data layout, or None
+        """
+        end = pd.Timestamp.now() if end is None else pd.Timestamp(end)
+        minutes = config.TIMEFRAME_MINUTES[timeframe]
+        # weekends hold no bars: 7/5 of calendar time per trading bar, plus a day
+        warmup = TechnicalIndicators.required_bars(columns)
+        date_from = pd.Timestamp(start) - pd.Timedelta(minutes=minutes * warmup * 7 / 5 + 24 * 60)
+        
+        if not self.connected:
+            if not self.store_fallback:
+                print("Not connected to a data source")
+                return None
+            print("[WARN] Not connected to a data source, reading the local history store")
+            return self.load_history(timeframe, start=date_from, end=end)
+        
+        fetched = config.RESAMPLE_BASE_TIMEFRAME if self._resampled(timeframe) else timeframe
+        fetched_minutes = config.TIMEFRAME_MINUTES[fetched]
+        limit = self.source.max_bars()
+        expected = int((end - date_from).total_seconds() / 60 * 5 / 7 // fetched_minutes)
+        if limit and expected > limit:
+            date_from = end - pd.Timedelta(minutes=limit * fetched_minutes * 7 / 5)
+            print(f"[WARN] {expected} {fetched} bars requested but the source keeps {limit}; "
+                  f"{timeframe} data starts around {date_from:%Y-%m-%d} instead")
+        
+        try:
+            rates = self.source.rates_range(self.symbol, fetched, _utc(date_from), _utc(end))
+        except Exception as e:
+            print(f"Error fetching data: {e}")
+            return None
+        
+        if rates is None or len(rates) == 0:
+            print(f"No data received for {self.symbol}")
             return None
         
+        if self.source.archive:
+            self._archive(fetched, rates[:-1])  # the last bar may still be forming
+        if fetched != timeframe:
+            # the first period is usually cut off by date_from
+            rates = resample_rates(rates, minutes, config.RESAMPLE_OFFSET_MINUTES)[1:]
+            if self.source.archive:
+                self._archive(timeframe, rates[:-1])
+        
+        df = rates_frame(rates)
+        df.attrs['symbol'] = self.symbol
+        df.attrs['timeframe'] = timeframe
+        print(f"Fetched {len(df)} bars of {timeframe} data for {self.symbol} "
+              f"from {df.index[0]:%Y-%m-%d} to {df.index[-1]:%Y-%m-%d}")
+        return df
+    
+    def _resampled(self, timeframe):
+        """Whether timeframe is built from RESAMPLE_BASE_TIMEFRAME bars"""
+        base_minutes = config.TIMEFRAME_MINUTES[config.RESAMPLE_BASE_TIMEFRAME]
+        minutes = config.TIMEFRAME_MINUTES.get(timeframe, 0)
+        return (timeframe in config.RESAMPLED_TIMEFRAMES and minutes > base_minutes
+                and minutes % base_minutes == 0)
+    
+    def _fetch(self, timeframe, bars):
+        """Top up (or fill) the RateBuffer of a fetched timeframe; None on failure"""
         try:
-            tf_map = {
-                'M1': mt5.TIMEFRAME_M1,
-                'M5': mt5.TIMEFRAME_M5,
-                'M15': mt5.TIMEFRAME_M15,
-                'M30': mt5.TIMEFRAME_M30,
-                'H1': mt5.TIMEFRAME_H1,
-                'H4': mt5.TIMEFRAME_H4,
-                'D1': mt5.TIMEFRAME_D1
-            }
-            
-            mt5_timeframe = tf_map.get(timeframe, mt5.TIMEFRAME_H4)
-            
-            rates = mt5.copy_rates_from_pos(self.symbol, mt5_timeframe, 0, bars)
+            # Top up the buffer from its newest (still-forming) bar on
+            buffer = self.buffers.get(timeframe)
+            rates = None
+            if buffer is not None and buffer.capacity >= bars:
+                date_from = datetime.fromtimestamp(buffer.last_time(), tz=pytz.utc)
+                date_to = datetime.now(pytz.utc) + timedelta(days=1)  # server time may run ahead of UTC
+                rates = self.source.rates_range(self.symbol, timeframe, date_from, date_to)
             
+            # First fetch, a larger window, or the range query failed: pull the whole window
             if rates is None or len(rates) == 0:
-                print(f"No data received for {self.symbol}")
-                return None
-            
-            df = pd.DataFrame(rates)
-            df['time'] = pd.to_datetime(df['time'], unit='s')
+                rates = self.source.rates_from_pos(self.symbol, timeframe, bars)
+                
+                if rates is None or len(rates) == 0:
+                    print(f"No data received for {self.symbol}")
+                    return None
+                
+                buffer = self.buffers[timeframe] = RateBuffer(bars, rates.dtype)
             
-            df.rename(columns={
-                'time': 'Time',
-                'open': 'Open',
-                'high': 'High',
-                'low': 'Low',
-                'close': 'Close',
-                'tick_volume': 'Volume'
-            }, inplace=True)
+            self.new_bars[timeframe] = buffer.merge(rates)
+            if self.source.archive:
+                self._archive(timeframe, rates[:-1])  # the last bar is still forming
             
-            df.set_index('Time', inplace=True)
-            
-            print(f"Fetched {len(df)} bars of {timeframe} data for {self.symbol}")
-            return df
+            print(f"Fetched {len(rates)} bars of {timeframe} data for {self.symbol} "
+                  f"({self.new_bars[timeframe]} new, {min(len(buffer), bars)} in window)")
+            return buffer
             
         except Exception as e:
             print(f"Error fetching data: {e}")
             return None
     
+    def _resample(self, timeframe, bars, base_buffer):
+        """Bring the timeframe's resampler up to date with the base buffer"""
+        if base_buffer is None:
+            return None
+        
+        # A new base window (first fetch or a refill) starts the resampler over
+        source_buffer, resampler = self.resamplers.get(timeframe, (None, None))
+        if source_buffer is not base_buffer or resampler.buffer.capacity < bars:
+            resampler = BarResampler(config.TIMEFRAME_MINUTES[timeframe], bars, config.RESAMPLE_OFFSET_MINUTES)
+            self.resamplers[timeframe] = (base_buffer, resampler)
+        
+        self.new_bars[timeframe] = resampler.update(base_buffer.rows())
+        if self.source.archive:
+            self._archive(timeframe, resampler.buffer.rows()[-self.new_bars[timeframe] - 1:-1])
+        
+        print(f"Resampled {timeframe} from {config.RESAMPLE_BASE_TIMEFRAME} for {self.symbol} "
+              f"({self.new_bars[timeframe]} new, {min(len(resampler.buffer), bars)} in window)")
+        return resampler.buffer
+    
+    def _archive(self, timeframe, rates):
+        """Append closed bars to the history store; a failure never stops a fetch"""
+        try:
+            self.store.append(self.symbol, timeframe, rates)
+        except Exception as e:
+            print(f"Error archiving {timeframe} bars: {e}")
+    
+    def load_history(self, timeframe='H4', bars=None, columns=None, history=1, start=None, end=None):
+        """
+        OHLCV data from the local history store (no MT5 connection needed)
+        
+        Args:
+            timeframe: Timeframe name, as for get_gold_data
+            bars: Newest bars to load; None sizes it like get_gold_data
+                  (and loads the whole range when start is given)
+            columns: Indicator columns that will be computed (None = all)
+            history: Rows of warmed-up indicator output the caller reads
+            start, end: Optional time range (end exclusive)
+        
+        Returns:
+            DataFrame in get_gold_data layout, or None if nothing is stored
+        """
+        if bars is None and start is None:
+            bars = TechnicalIndicators.required_bars(columns, history)
+        
+        try:
+            df = self.store.frame(self.symbol, timeframe, start, end, bars)
+        except Exception as e:
+            print(f"Error reading history store: {e}")
+            return None
+        
+        if df is None:
+            print(f"No stored {timeframe} history for {self.symbol} in {self.store.root}")
+            return None
+        
+        print(f"Loaded {len(df)} bars of {timeframe} data for {self.symbol} from the history store")
+        return df
+    
     def get_current_price(self):
         """Get current bid/ask prices"""
         if not self.connected:
             return None, None
         
         try:
-            tick = mt5.symbol_info_tick(self.symbol)
-            if tick:
-                return tick.bid, tick.ask
-            return None, None
+            return self.source.current_price(self.symbol)
         except Exception as e:
             print(f"Error getting current price: {e}")
             return None, None
     
     def get_symbol_info(self):
-        """Get symbol specifications"""
+        """Get symbol specifications (cached for SYMBOL_INFO_TTL_SECONDS)"""
         if not self.connected:
             return None
         
-        try:
-            info = mt5.symbol_info(self.symbol)
-            if info:
-                return {
-                    'point': info.point,
-                    'digits': info.digits,
-                    'trade_contract_size': info.trade_contract_size,
-                    'volume_min': info.volume_min,
-                    'volume_max': info.volume_max,
-                    'volume_step': info.volume_step
-                }
-            return None
-        except Exception as e:
-            print(f"Error getting symbol info: {e}")
+        return metadata.get(('symbol', self.symbol))
+    
+    def get_account_info(self):
+        """Get balance/equity (cached for ACCOUNT_INFO_TTL_SECONDS), None without an account"""
+        if not self.connected:
             return None
+        
+        return metadata.get('account')
     
     def calculate_pip_value(self, entry_price, lot_size=1.0):
         """
         Calculate pip value for position sizing
         
-        For gold: 1 pip = 0.10 price movement
+        From this symbol's specification (see pip_spec); gold's $10 per
+        lot when not connected
         """
-        symbol_info = self.get_symbol_info()
-        if not symbol_info:
-            return 10.0 * lot_size
-        
-        pip_value = symbol_info['trade_contract_size'] * 0.10
-        return pip_value * lot_size
+        return pip_spec(self.get_symbol_info())[1] * lot_size
     
     def price_to_pips(self, price_diff):
-        """Convert price difference to pips"""
-        return abs(price_diff) / 0.10
+        """Convert price difference to pips of this symbol"""
+        return abs(price_diff) / pip_spec(self.get_symbol_info())[0]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,149 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import os
+import numpy as np
+import pandas as pd
+import config
+from data.rate_buffer import RATE_DTYPE, rates_frame, frame_rates
+
+
+def _epoch_seconds(moment):
+    """Timestamp-like as epoch seconds (tz-aware ones in UTC), None passes through"""
+    if moment is None:
+        return None
+    # pandas reads naive timestamps as UTC here
+    return int(pd.Timestamp(moment).timestamp())
+
+
+class HistoryStore:
+    """
+    On-disk OHLCV history, one memory-mapped .npy file per month
+
+    Layout: <root>/<symbol>/<timeframe>/<YYYY-MM>.npy, each a time-sorted
+    RATE_DTYPE array. Appends only rewrite the months they touch; loads
+    map the files read-only, so a range within one month comes back as a
+    zero-copy view and longer ones cost a single concatenation. Nothing
+    here needs MetaTrader 5.
+    """
+
+    def __init__(self, root=None):
+        """
+        Args:
+            root: Store directory (default: config.HISTORY_STORE_DIR)
+        """
+        self.root = Path(root or config.HISTORY_STORE_DIR)
+
+    def _folder(self, symbol, timeframe):
+        return self.root / symbol / timeframe
+
+    def months(self, symbol, timeframe):
+        """Stored month files of a series, oldest first"""
+        folder = self._folder(symbol, timeframe)
+        return sorted(folder.glob('*.npy')) if folder.is_dir() else []
+
+    def append(self, symbol, timeframe, rates):
+        """
+        Add bars to a series
+
+        Stored bars inside the new bars' time span are replaced (so a
+        re-fetched bar overwrites its old copy); everything else is kept.
+
+        Args:
+            rates: Time-sorted structured rates (copy_rates_* layout) or an
+                   OHLCV DataFrame
+
+        Returns:
+            Number of bars written
+        """
+        if isinstance(rates, pd.DataFrame):
+            rates = frame_rates(rates)
+        if rates is None or len(rates) == 0:
+            return 0
+
+        rates = np.asarray(rates).astype(RATE_DTYPE, copy=False)
+        folder = self._folder(symbol, timeframe)
+        folder.mkdir(parents=True, exist_ok=True)
+
+        month_of = rates['time'].astype('datetime64[s]').astype('datetime64[M]')
+        for month in np.unique(month_of):
+            new = rates[month_of == month]
+            path = folder / f"{month}.npy"
+            if path.exists():
+                old = np.load(path)
+                keep_before = old['time'] < new['time'][0]
+                keep_after = old['time'] > new['time'][-1]
+                new = np.concatenate([old[keep_before], new, old[keep_after]])
+
+            # write aside and swap in, so readers never see a partial file
+            temp = path.with_suffix('.tmp')
+            with open(temp, 'wb') as f:
+                np.save(f, new)
+            os.replace(temp, path)
+
+        return len(rates)
+
+    def load(self, symbol, timeframe, start=None, end=None, bars=None):
+        """
+        Stored bars with start <= time < end
+
+        Args:
+            start, end: Optional bounds (anything pd.Timestamp accepts)
+            bars: Optional cap; keeps the newest `bars` of the range
+
+        Returns:
+            Structured array (read-only; a memory-mapped view when the
+            range sits in one month), empty if nothing is stored
+        """
+        start_s, end_s = _epoch_seconds(start), _epoch_seconds(end)
+        first_month = None if start_s is None else str(np.datetime64(start_s, 's').astype('datetime64[M]'))
+        last_month = None if end_s is None else str(np.datetime64(end_s, 's').astype('datetime64[M]'))
+
+        parts = []
+        found = 0
+        # newest month first, so a `bars` cap stops reading early
+        for path in reversed(self.months(symbol, timeframe)):
+            if last_month is not None and path.stem > last_month:
+                continue
+            if first_month is not None and path.stem < first_month:
+                break
+
+            rows = np.load(path, mmap_mode='r')
+            times = rows['time']
+            lo = 0 if start_s is None else int(np.searchsorted(times, start_s, side='left'))
+            hi = len(rows) if end_s is None else int(np.searchsorted(times, end_s, side='left'))
+            parts.append(rows[lo:hi])
+            found += hi - lo
+            if bars is not None and found >= bars:
+                break
+
+        if not parts:
+            return np.empty(0, dtype=RATE_DTYPE)
+        rows = parts[0] if len(parts) == 1 else np.concatenate(parts[::-1])
+        return rows[-bars:] if bars is not None and bars < len(rows) else rows
+
+    def frame(self, symbol, timeframe, start=None, end=None, bars=None, columns=None, tz=None):
+        """
+        load() as an OHLCV DataFrame in DataHandler layout
+
+        Returns:
+            DataFrame (tagged with symbol/timeframe for the indicator
+            cache), or None if nothing is stored in the range
+        """
+        rows = self.load(symbol, timeframe, start, end, bars)
+        if len(rows) == 0:
+            return None
+
+        df = rates_frame(rows, columns, tz)
+        df.attrs['symbol'] = symbol
+        df.attrs['timeframe'] = timeframe
+        return df
+
+    def last_time(self, symbol, timeframe):
+        """Open time of the newest stored bar as a Timestamp, or None"""
+        months = self.months(symbol, timeframe)
+        if not months:
+            return None
+        rows = np.load(months[-1], mmap_mode='r')
+        return pd.Timestamp(int(rows['time'][-1]), unit='s') if len(rows) else None
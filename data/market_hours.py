@@ -3,13 +3,59 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from datetime import datetime
+import numpy as np
 import pandas as pd
 import pytz
 import config
 
+# Session names get_current_session can return
+SESSION_NAMES = ('London', 'New York', 'London + New York',
+                 'Asian (Pre-London)', 'Between Sessions', 'After Hours')
+
+
 class MarketHours:
     def __init__(self):
         self.gmt = pytz.timezone('GMT')
+        self.holidays = pd.DatetimeIndex(config.MARKET_HOLIDAYS)
+        self.half_days = pd.DatetimeIndex(config.MARKET_HALF_DAYS)
+        self._build_week_tables()
+    
+    def _build_week_tables(self):
+        """
+        Precompute session and trade permission for the 168 hours of a week
+        
+        Slot = weekday * 24 + hour (GMT, Monday 00:00 = 0), matching the
+        rules of get_current_session and should_trade_now.
+        """
+        self.week_sessions = np.empty(7 * 24, dtype=np.int8)
+        self.week_trading = np.zeros(7 * 24, dtype=bool)
+        
+        for slot in range(7 * 24):
+            weekday, hour = divmod(slot, 24)
+            self.week_sessions[slot] = SESSION_NAMES.index(self.session_name(hour))
+            in_session = (config.LONDON_OPEN <= hour < config.LONDON_CLOSE) or \
+                         (config.NY_OPEN <= hour < config.NY_CLOSE)
+            self.week_trading[slot] = in_session and weekday < 5
+    
+    @staticmethod
+    def session_name(hour):
+        """Name of the trading session at a GMT hour"""
+        sessions = []
+        if config.LONDON_OPEN <= hour < config.LONDON_CLOSE:
+            sessions.append("London")
+        if config.NY_OPEN <= hour < config.NY_CLOSE:
+            sessions.append("New York")
+        
+        if sessions:
+            return " + ".join(sessions)
+        
+        # Determine which session we're closest to
+        if hour < config.LONDON_OPEN:
+            return "Asian (Pre-London)"
+        elif hour >= config.NY_CLOSE:
+            return "After Hours"
+        else:
+            return "Between Sessions"
     
     def get_current_hour_gmt(self):
         """Get current hour in GMT"""
@@ -39,24 +85,38 @@ class MarketHours:
     
     def get_current_session(self):
         """Get name of current trading session"""
-        hour = self.get_current_hour_gmt()
+        return self.session_name(self.get_current_hour_gmt())
+    
+    def session_table(self, index):
+        """
+        Session name and trade permission of every timestamp at once
         
-        sessions = []
-        if self.is_london_session():
-            sessions.append("London")
-        if self.is_ny_session():
-            sessions.append("New York")
+        One hour-of-week table lookup per bar instead of should_trade_now's
+        per-timestamp timezone handling. Naive timestamps are taken as GMT.
         
-        if sessions:
-            return " + ".join(sessions)
+        Args:
+            index: DatetimeIndex (or anything pd.DatetimeIndex accepts)
         
-        # Determine which session we're closest to
-        if hour < config.LONDON_OPEN:
-            return "Asian (Pre-London)"
-        elif hour >= config.NY_CLOSE:
-            return "After Hours"
-        else:
-            return "Between Sessions"
+        Returns: (sessions, allowed) arrays aligned to index; sessions
+                 holds SESSION_NAMES strings, allowed matches
+                 should_trade_now
+        """
+        index = pd.DatetimeIndex(index)
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        
+        hours = np.asarray(index.hour)
+        slots = np.asarray(index.dayofweek) * 24 + hours
+        sessions = np.asarray(SESSION_NAMES, dtype=object)[self.week_sessions[slots]]
+        allowed = self.week_trading[slots]
+        
+        # Trading calendar: holidays closed, half days closed from HALF_DAY_CLOSE
+        if len(self.holidays) or len(self.half_days):
+            days = index.normalize()
+            allowed &= ~np.asarray(days.isin(self.holidays))
+            allowed &= ~(np.asarray(days.isin(self.half_days)) & (hours >= config.HALF_DAY_CLOSE))
+        
+        return sessions, allowed
     
     def get_asian_range(self, df):
         """
@@ -80,20 +140,88 @@ class MarketHours:
             return None, None
     
     def get_previous_day_levels(self, df):
-        """Get previous day's high and low"""
+        """Get previous day's high, low and close from intraday bars"""
         try:
-            # Get yesterday's data
-            yesterday = df.iloc[-2] if len(df) > 1 else df.iloc[-1]
+            # Get yesterday's bars (the last date before the newest bar's)
+            days = df.index.normalize()
+            earlier = days[days < days[-1]]
+            if len(earlier) == 0:
+                return None
+            yesterday = df[days == earlier[-1]]
             
             return {
-                'pdh': yesterday['High'],  # Previous Day High
-                'pdl': yesterday['Low'],   # Previous Day Low
-                'pdc': yesterday['Close']  # Previous Day Close
+                'pdh': yesterday['High'].max(),     # Previous Day High
+                'pdl': yesterday['Low'].min(),      # Previous Day Low
+                'pdc': yesterday['Close'].iloc[-1]  # Previous Day Close
             }
         except Exception as e:
             print(f" Error getting previous day levels: {e}")
             return None
     
+    def next_session_open(self, after, horizon_days=14):
+        """
+        Start of the first tradeable hour after `after`
+        
+        Args:
+            after: tz-aware Timestamp
+            horizon_days: How far ahead to look
+        
+        Returns: tz-aware UTC Timestamp, or None if nothing opens in the horizon
+        """
+        hours = pd.date_range(pd.Timestamp(after).tz_convert('UTC').floor('h') + pd.Timedelta(hours=1),
+                              periods=horizon_days * 24, freq='h')
+        allowed = self.session_table(hours)[1]
+        return hours[allowed.argmax()] if allowed.any() else None
+    
+    @staticmethod
+    def _scan_clock(now, interval_minutes, settle_seconds):
+        now = pd.Timestamp.now(tz='UTC') if now is None else pd.Timestamp(now).tz_convert('UTC')
+        step = pd.Timedelta(minutes=interval_minutes or config.SCAN_INTERVAL_MINUTES)
+        settle = pd.Timedelta(seconds=config.SCAN_SETTLE_SECONDS if settle_seconds is None else settle_seconds)
+        return now, step, settle
+    
+    def last_bar_open(self, now=None, interval_minutes=None, settle_seconds=None):
+        """
+        Open time of the newest closed bar, i.e. the bar a scan at `now`
+        evaluates (same arguments as next_scan_time)
+        
+        Returns: tz-aware UTC Timestamp
+        """
+        now, step, settle = self._scan_clock(now, interval_minutes, settle_seconds)
+        return (now - settle).floor(step) - step
+    
+    def next_scan_time(self, now=None, interval_minutes=None, settle_seconds=None):
+        """
+        When the next scan should run
+        
+        Scans run `settle_seconds` after each bar close (bars of
+        `interval_minutes`, aligned to midnight GMT) whose bar opened when
+        should_trade_now allows trading, as backtests judge a bar by its
+        open time. The last bar of a session is still scanned at the
+        session close; outside sessions the next scan is the first bar
+        close of the next trading window.
+        
+        Args:
+            now: tz-aware Timestamp (default: current time)
+            interval_minutes: Bar length (default: SCAN_INTERVAL_MINUTES)
+            settle_seconds: Delay after the close (default: SCAN_SETTLE_SECONDS)
+        
+        Returns: tz-aware UTC Timestamp
+        """
+        now, step, settle = self._scan_clock(now, interval_minutes, settle_seconds)
+        
+        # first bar close whose scan is still ahead of now
+        close = (now - settle).floor(step) + step
+        while True:
+            if self.session_table([close - step])[1][0]:
+                return close + settle
+            
+            opens = self.next_session_open(close - step)
+            if opens is None:
+                # nothing tradeable soon (e.g. a long holiday list): check back later
+                return close + settle
+            close = max(opens.ceil(step) + step, close + step)
+    
     def should_trade_now(self, timestamp=None):
         """
         Determine if we should scan for trades now
@@ -132,6 +260,13 @@ class MarketHours:
         if now.weekday() >= 5:  # Saturday = 5, Sunday = 6
             return False, "Weekend - Market closed"
         
+        # Check the trading calendar
+        day = pd.Timestamp(now.year, now.month, now.day)
+        if day in self.holidays:
+            return False, "Holiday - Market closed"
+        if day in self.half_days and hour >= config.HALF_DAY_CLOSE:
+            return False, f"Half day - Market closed from {config.HALF_DAY_CLOSE}:00 GMT"
+        
         # Determine session name
         sessions = []
         if config.LONDON_OPEN <= hour < config.LONDON_CLOSE:
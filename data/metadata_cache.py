@@ -0,0 +1,137 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import threading
+import time
+import config
+
+
+class MetadataCache:
+    """
+    Symbol and account metadata shared across the process, with TTLs
+
+    A connected DataHandler registers a loader per entry ('account',
+    ('symbol', name)); get() serves the cached value until its TTL runs
+    out and reloads it after. The optional refresher thread reloads
+    entries before they expire, so readers on the signal-to-order path
+    never wait on the terminal. invalidate() forces the next read to
+    reload, e.g. after an order changes the balance.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key -> (loader, ttl seconds)
+        self._loaders = {}
+        # key -> (value, monotonic expiry)
+        self._values = {}
+        self._stop = None
+
+    def register(self, key, loader, ttl):
+        """Load `key` with loader() (None = unavailable), cached for ttl seconds"""
+        with self._lock:
+            self._loaders[key] = (loader, ttl)
+            self._values.pop(key, None)
+
+    def unregister(self, key=None):
+        """Drop an entry and its loader (default: all of them)"""
+        with self._lock:
+            if key is None:
+                self._loaders.clear()
+                self._values.clear()
+            else:
+                self._loaders.pop(key, None)
+                self._values.pop(key, None)
+
+    def invalidate(self, key=None):
+        """Expire an entry (default: all), keeping its loader"""
+        with self._lock:
+            if key is None:
+                self._values.clear()
+            else:
+                self._values.pop(key, None)
+
+    def _load(self, key):
+        loader, ttl = self._loaders[key]
+        try:
+            value = loader()
+        except Exception as e:
+            print(f"Error loading {key} metadata: {e}")
+            value = None
+        if value is not None:
+            with self._lock:
+                if key in self._loaders:
+                    self._values[key] = (value, time.monotonic() + ttl)
+        return value
+
+    def get(self, key):
+        """
+        Cached value of `key`, reloaded when expired
+
+        Returns:
+            The value, or None if nothing is registered or the load failed
+        """
+        with self._lock:
+            cached = self._values.get(key)
+            registered = key in self._loaders
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+        return self._load(key) if registered else None
+
+    def refresh(self, margin=0.0):
+        """Reload every entry expiring within `margin` seconds"""
+        deadline = time.monotonic() + margin
+        with self._lock:
+            due = [key for key in self._loaders
+                   if key not in self._values or self._values[key][1] <= deadline]
+        for key in due:
+            self._load(key)
+
+    def start_refresher(self, interval=None):
+        """Reload entries in a daemon thread every `interval` seconds"""
+        interval = interval or config.METADATA_REFRESH_SECONDS
+        if self._stop is not None or interval <= 0:
+            return
+        self._stop = threading.Event()
+
+        def run(stop):
+            while not stop.wait(interval):
+                self.refresh(margin=interval)
+
+        threading.Thread(target=run, args=(self._stop,), name='metadata-refresher', daemon=True).start()
+
+    def stop_refresher(self):
+        """Stop the refresher thread, if running"""
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+
+
+# The process-wide cache DataHandler, SignalGenerator and LiveTrader share
+metadata = MetadataCache()
+
+
+def pip_spec(symbol_info=None):
+    """
+    (pip size, pip value per lot) of a contract specification
+
+    A pip is ten points: 0.10 on 2-digit gold, 0.01 on 3-digit silver,
+    0.0001 on 5-digit FX. Its value in account currency follows the tick
+    value, or the contract size when the source reports none (quote
+    currency = account currency).
+
+    Args:
+        symbol_info: Symbol dict as from DataHandler.get_symbol_info; None
+                     gives config.PIP_SIZE / config.PIP_VALUE (gold)
+
+    Returns: (pip_size, pip_value)
+    """
+    if not symbol_info:
+        return config.PIP_SIZE, config.PIP_VALUE
+
+    pip_size = symbol_info['point'] * 10
+    tick_size = symbol_info.get('trade_tick_size')
+    tick_value = symbol_info.get('trade_tick_value')
+    if tick_size and tick_value:
+        return pip_size, tick_value * pip_size / tick_size
+    return pip_size, symbol_info['trade_contract_size'] * pip_size
@@ -0,0 +1,86 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+from data.rate_buffer import RATE_DTYPE, RateBuffer
+
+
+def resample_rates(rows, minutes, offset_minutes=0):
+    """
+    Aggregate time-sorted rates into `minutes` bars
+
+    Bars open on multiples of the period (shifted by offset_minutes) in
+    the rates' own clock; MT5 stamps bars in server time, so H4 and D1
+    line up with the broker's own bars. Periods without rates are left
+    out, like gaps in broker history.
+
+    Returns:
+        RATE_DTYPE rows, one per period with data
+    """
+    if not len(rows):
+        return np.empty(0, dtype=RATE_DTYPE)
+
+    period = minutes * 60
+    offset = offset_minutes * 60
+    times = rows['time']
+    starts = (times - offset) // period * period + offset
+    firsts = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    lasts = np.r_[firsts[1:], len(rows)] - 1
+
+    bars = np.zeros(len(firsts), dtype=RATE_DTYPE)
+    bars['time'] = starts[firsts]
+    bars['open'] = rows['open'][firsts]
+    bars['high'] = np.maximum.reduceat(rows['high'], firsts)
+    bars['low'] = np.minimum.reduceat(rows['low'], firsts)
+    bars['close'] = rows['close'][lasts]
+    bars['tick_volume'] = np.add.reduceat(rows['tick_volume'], firsts)
+    bars['spread'] = np.minimum.reduceat(rows['spread'], firsts)
+    bars['real_volume'] = np.add.reduceat(rows['real_volume'], firsts)
+    return bars
+
+
+class BarResampler:
+    """
+    A higher timeframe kept current from a lower one's rates
+
+    Each update re-aggregates only the newest (still-forming) period and
+    anything after it, merging the result into a RateBuffer, so a scan
+    costs O(new base bars) however long the window is.
+    """
+
+    def __init__(self, minutes, capacity, offset_minutes=0):
+        """
+        Args:
+            minutes: Bar length of the higher timeframe
+            capacity: Higher-timeframe bars kept
+            offset_minutes: Shift of the bar grid (brokers whose H4 opens at 01:00)
+        """
+        self.minutes = minutes
+        self.offset_minutes = offset_minutes
+        self.buffer = RateBuffer(capacity, RATE_DTYPE)
+
+    def update(self, rows):
+        """
+        Fold base rates in (they may overlap earlier updates)
+
+        The first update drops the oldest period, which the base window
+        usually cuts off part way. Later ones must reach back to the open
+        of the newest bar built so far, which is re-aggregated whole.
+
+        Returns:
+            Number of higher-timeframe bars that closed since the last update
+
+        Raises:
+            ValueError: When rows start after that bar's open
+        """
+        last = self.buffer.last_time()
+        if last is not None:
+            if len(rows) and rows['time'][0] > last:
+                raise ValueError(f"base rates start after the open of the forming {self.minutes}-minute bar")
+            rows = rows[int(np.searchsorted(rows['time'], last)):]
+
+        bars = resample_rates(rows, self.minutes, self.offset_minutes)
+        if last is None:
+            bars = bars[1:]
+        return self.buffer.merge(bars)
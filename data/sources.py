@@ -0,0 +1,413 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import threading
+import zlib
+from abc import ABC, abstractmethod
+import numpy as np
+import pandas as pd
+import config
+from data.rate_buffer import RATE_DTYPE, frame_rates
+from data.history_store import HistoryStore, _epoch_seconds
+from data.resampler import resample_rates
+
+try:
+    import MetaTrader5 as mt5
+except ImportError:  # Linux/CI: use the replay or synthetic source
+    mt5 = None
+
+# Contract specification served by the offline sources (XAUUSD-style gold)
+DEFAULT_SYMBOL_INFO = {
+    'point': 0.01,
+    'digits': 2,
+    'trade_contract_size': 100.0,
+    'trade_tick_size': 0.01,
+    'trade_tick_value': 1.0,
+    'volume_min': 0.01,
+    'volume_max': 100.0,
+    'volume_step': 0.01,
+    'trade_mode': 4  # SYMBOL_TRADE_MODE_FULL
+}
+
+
+class MarketDataSource(ABC):
+    """
+    Where DataHandler gets bars, prices and the contract specification
+
+    The calls mirror the MetaTrader 5 ones DataHandler used to make, so a
+    source can stand in for the terminal: rates are structured arrays in
+    copy_rates_* layout (RATE_DTYPE fields), oldest first, the newest bar
+    still forming. Subclasses implement the abstract methods (a source
+    missing one can't be instantiated); the others default to "not
+    available".
+    """
+
+    name = None
+    # Whether DataHandler archives the bars to the history store
+    archive = False
+
+    @abstractmethod
+    def connect(self):
+        """Open the source; returns True when it can serve data"""
+
+    def disconnect(self):
+        """Release the source"""
+
+    @abstractmethod
+    def rates_from_pos(self, symbol, timeframe, count):
+        """The newest `count` bars of a timeframe, or None"""
+
+    @abstractmethod
+    def rates_range(self, symbol, timeframe, date_from, date_to):
+        """Bars opened between date_from and date_to (inclusive), or None"""
+
+    @abstractmethod
+    def current_price(self, symbol):
+        """(bid, ask), or (None, None)"""
+
+    @abstractmethod
+    def symbol_info(self, symbol):
+        """Contract specification dict (see DataHandler.get_symbol_info), or None"""
+
+    def account_info(self):
+        """Account dict (login, balance, equity, margin_free), or None without an account"""
+        return None
+
+    def ticks_range(self, symbol, date_from, date_to):
+        """Ticks between date_from and date_to (copy_ticks_* layout), or None without ticks"""
+        return None
+
+    def max_bars(self):
+        """Most bars of one timeframe the source keeps, or None without a limit"""
+        return None
+
+
+class MT5Source(MarketDataSource):
+    """
+    The MetaTrader 5 terminal (Windows only)
+
+    The MetaTrader5 module drives a single terminal over IPC, so calls made
+    from scan threads are serialized.
+    """
+
+    name = 'mt5'
+    archive = True
+    _lock = threading.Lock()
+
+    def connect(self):
+        """Initialize the terminal and log in with the configured account"""
+        if mt5 is None:
+            print("MetaTrader5 package not installed; use MARKET_DATA_SOURCE=replay or synthetic")
+            return False
+
+        if not mt5.initialize():
+            print(f"MT5 initialization failed: {mt5.last_error()}")
+            return False
+
+        authorized = mt5.login(
+            login=config.MT5_LOGIN,
+            password=config.MT5_PASSWORD,
+            server=config.MT5_SERVER
+        )
+
+        if not authorized:
+            print(f"MT5 login failed: {mt5.last_error()}")
+            mt5.shutdown()
+            return False
+
+        print(" Connected to MetaTrader 5 successfully!")
+
+        account_info = mt5.account_info()
+        if account_info:
+            print(f"Account: {account_info.login}")
+            print(f"Balance: ${account_info.balance:.2f}")
+            print(f"Equity: ${account_info.equity:.2f}")
+
+        return True
+
+    def disconnect(self):
+        mt5.shutdown()
+
+    def _timeframe(self, timeframe):
+        tf_map = {
+            'M1': mt5.TIMEFRAME_M1,
+            'M5': mt5.TIMEFRAME_M5,
+            'M15': mt5.TIMEFRAME_M15,
+            'M30': mt5.TIMEFRAME_M30,
+            'H1': mt5.TIMEFRAME_H1,
+            'H4': mt5.TIMEFRAME_H4,
+            'D1': mt5.TIMEFRAME_D1
+        }
+        return tf_map.get(timeframe, mt5.TIMEFRAME_H4)
+
+    def rates_from_pos(self, symbol, timeframe, count):
+        with self._lock:
+            return mt5.copy_rates_from_pos(symbol, self._timeframe(timeframe), 0, count)
+
+    def rates_range(self, symbol, timeframe, date_from, date_to):
+        with self._lock:
+            return mt5.copy_rates_range(symbol, self._timeframe(timeframe), date_from, date_to)
+
+    def current_price(self, symbol):
+        with self._lock:
+            tick = mt5.symbol_info_tick(symbol)
+        if tick:
+            return tick.bid, tick.ask
+        return None, None
+
+    def symbol_info(self, symbol):
+        with self._lock:
+            info = mt5.symbol_info(symbol)
+        if info:
+            return {
+                'point': info.point,
+                'digits': info.digits,
+                'trade_contract_size': info.trade_contract_size,
+                'trade_tick_size': info.trade_tick_size,
+                'trade_tick_value': info.trade_tick_value,
+                'volume_min': info.volume_min,
+                'volume_max': info.volume_max,
+                'volume_step': info.volume_step,
+                'trade_mode': info.trade_mode
+            }
+        return None
+
+    def ticks_range(self, symbol, date_from, date_to):
+        with self._lock:
+            return mt5.copy_ticks_range(symbol, date_from, date_to, mt5.COPY_TICKS_ALL)
+
+    def max_bars(self):
+        """The terminal's "Max. bars in chart" setting"""
+        with self._lock:
+            info = mt5.terminal_info()
+        return info.maxbars if info else None
+
+    def account_info(self):
+        with self._lock:
+            info = mt5.account_info()
+        if info:
+            return {
+                'login': info.login,
+                'balance': info.balance,
+                'equity': info.equity,
+                'margin_free': info.margin_free
+            }
+        return None
+
+
+class ReplaySource(MarketDataSource):
+    """
+    Bars replayed from local files, held in memory
+
+    Each timeframe is read once, from <root>/<symbol>_<timeframe>.csv or
+    .parquet when present, otherwise from the HistoryStore under root.
+    A clock (`now`, epoch seconds) decides what is visible: bars opened at
+    or before it, the newest one standing in for the forming bar. The
+    clock defaults to the end of the data; step it with advance() to
+    replay a session bar by bar.
+    """
+
+    name = 'replay'
+
+    def __init__(self, root=None, now=None, symbol_info=None):
+        """
+        Args:
+            root: Data directory (default: REPLAY_DATA_DIR, else HISTORY_STORE_DIR)
+            now: Optional start of the replay clock
+            symbol_info: Contract specification (default: DEFAULT_SYMBOL_INFO)
+        """
+        self.root = Path(root or config.REPLAY_DATA_DIR or config.HISTORY_STORE_DIR)
+        self.now = None if now is None else _epoch_seconds(now)
+        self.info = dict(symbol_info or DEFAULT_SYMBOL_INFO)
+        self._rates = {}
+
+    def connect(self):
+        if not self.root.is_dir():
+            print(f"Replay data directory {self.root} not found")
+            return False
+        print(f" Replaying market data from {self.root}")
+        return True
+
+    def disconnect(self):
+        self._rates.clear()
+
+    def _load(self, symbol, timeframe):
+        """All bars of a series (cached), or an empty array"""
+        key = (symbol, timeframe)
+        if key not in self._rates:
+            rows = np.empty(0, dtype=RATE_DTYPE)
+            for suffix, reader in (('.csv', pd.read_csv), ('.parquet', pd.read_parquet)):
+                path = self.root / f"{symbol}_{timeframe}{suffix}"
+                if path.exists():
+                    df = reader(path)
+                    time_column = next((column for column in df.columns if column.lower() == 'time'), df.columns[0])
+                    df = df.set_index(pd.to_datetime(df.pop(time_column)))
+                    rows = frame_rates(df.sort_index())
+                    break
+            else:
+                rows = np.array(HistoryStore(self.root).load(symbol, timeframe))
+            self._rates[key] = rows
+        return self._rates[key]
+
+    def _visible(self, symbol, timeframe):
+        rows = self._load(symbol, timeframe)
+        if self.now is None:
+            return rows
+        return rows[:int(np.searchsorted(rows['time'], self.now, side='right'))]
+
+    def advance(self, seconds):
+        """Move the replay clock forward (starting it at the data's start if unset)"""
+        if self.now is None:
+            starts = [rows['time'][0] for rows in self._rates.values() if len(rows)]
+            self.now = int(min(starts)) if starts else 0
+        self.now += int(seconds)
+
+    def rates_from_pos(self, symbol, timeframe, count):
+        rows = self._visible(symbol, timeframe)
+        return rows[-count:] if len(rows) else None
+
+    def rates_range(self, symbol, timeframe, date_from, date_to):
+        rows = self._visible(symbol, timeframe)
+        times = rows['time']
+        lo = int(np.searchsorted(times, _epoch_seconds(date_from), side='left'))
+        hi = int(np.searchsorted(times, _epoch_seconds(date_to), side='right'))
+        return rows[lo:hi] if hi > lo else None
+
+    def current_price(self, symbol):
+        """Close of the newest visible bar, widened by its spread"""
+        for timeframe in sorted(config.TIMEFRAME_MINUTES, key=config.TIMEFRAME_MINUTES.get):
+            rows = self._visible(symbol, timeframe)
+            if len(rows):
+                half_spread = float(rows['spread'][-1]) * self.info['point'] / 2
+                close = float(rows['close'][-1])
+                return close - half_spread, close + half_spread
+        return None, None
+
+    def symbol_info(self, symbol):
+        return dict(self.info)
+
+
+class SyntheticSource(ReplaySource):
+    """
+    Seeded random-walk bars, generated in memory
+
+    One M1 path (weekdays only) is drawn per symbol and every timeframe is
+    aggregated from it, so H4, M15 and the current price always agree.
+    The path is drawn a UTC day at a time, each day from its own seed, and
+    grows as the clock moves (advance(), or the wall clock when `now` is
+    unset), so new bars keep arriving while the ones already served never
+    change. The same seed and symbol give the same data on every run.
+    """
+
+    name = 'synthetic'
+
+    def __init__(self, seed=7, days=400, start_price=2000.0, volatility=0.0003, now=None, spread=20):
+        """
+        Args:
+            seed: Random seed
+            days: Calendar days of history before the first clock reading
+            start_price: Price of the first bar
+            volatility: Standard deviation of one-minute log returns
+            now: Start of the clock (default: follow the current minute)
+            spread: Spread in points on every bar
+        """
+        super().__init__(root='.', now=now)
+        self.seed = seed
+        self.days = days
+        self.start_price = start_price
+        self.volatility = volatility
+        self.spread = spread
+        # First day (epoch day number) of every path
+        self._origin = None
+        # symbol -> [M1 rows drawn so far, next day to draw]
+        self._minutes = {}
+
+    def connect(self):
+        print(f" Serving synthetic market data (seed {self.seed})")
+        return True
+
+    def _clock(self):
+        """Current time in epoch seconds: `now`, else the current minute"""
+        return self.now if self.now is not None else _epoch_seconds(pd.Timestamp.now(tz='UTC').floor('min'))
+
+    def advance(self, seconds):
+        """Move the clock forward (starting it at the current minute if unset)"""
+        self.now = self._clock() + int(seconds)
+
+    def _day_bars(self, symbol, day, open_price):
+        """One UTC day (epoch day number) of the M1 path, empty at weekends"""
+        if (day + 3) % 7 >= 5:  # the epoch was a Thursday
+            return np.empty(0, dtype=RATE_DTYPE)
+
+        times = np.arange(day * 86400, (day + 1) * 86400, 60, dtype=np.int64)
+        rng = np.random.default_rng([self.seed, zlib.crc32(symbol.encode()), day])
+        close = open_price * np.exp(np.cumsum(rng.normal(0, self.volatility, len(times))))
+        open_ = np.r_[open_price, close[:-1]]
+        wick = np.abs(rng.normal(0, self.volatility, len(times))) * close
+
+        rows = np.zeros(len(times), dtype=RATE_DTYPE)
+        rows['time'] = times
+        rows['open'] = open_
+        rows['high'] = np.maximum(open_, close) + wick
+        rows['low'] = np.minimum(open_, close) - wick
+        rows['close'] = close
+        rows['tick_volume'] = 1
+        rows['spread'] = self.spread
+        return rows
+
+    def _minute_bars(self, symbol, until):
+        """The M1 path of a symbol, drawn at least through the day holding `until`"""
+        if self._origin is None:
+            self._origin = until // 86400 - self.days
+        if symbol not in self._minutes:
+            self._minutes[symbol] = [np.empty(0, dtype=RATE_DTYPE), self._origin]
+
+        rows, day = self._minutes[symbol]
+        if day <= until // 86400:
+            price = float(rows['close'][-1]) if len(rows) else self.start_price
+            days = [rows]
+            for day in range(day, until // 86400 + 1):
+                days.append(self._day_bars(symbol, day, price))
+                if len(days[-1]):
+                    price = float(days[-1]['close'][-1])
+            rows = np.concatenate(days)
+            self._minutes[symbol] = [rows, day + 1]
+        return rows
+
+    def _load(self, symbol, timeframe):
+        """
+        Bars of a series up to the clock, the newest one still forming
+
+        Cached per series; when the clock moves only the bars from the
+        last served one on are re-aggregated.
+        """
+        now = self._clock()
+        minutes = config.TIMEFRAME_MINUTES.get(timeframe, 240)
+        path = self._minute_bars(symbol, now)
+        times = path['time']
+        hi = int(np.searchsorted(times, now, side='right'))
+
+        key = (symbol, timeframe)
+        until, rows = self._rates.get(key, (None, None))
+        if until == now:
+            return rows
+        if until is None or now < until or not len(rows):
+            rows = resample_rates(path[:hi], minutes)
+        else:
+            lo = int(np.searchsorted(times, rows['time'][-1], side='left'))
+            rows = np.concatenate([rows[:-1], resample_rates(path[lo:hi], minutes)])
+        self._rates[key] = (now, rows)
+        return rows
+
+
+SOURCES = {source.name: source for source in (MT5Source, ReplaySource, SyntheticSource)}
+
+
+def create_source(name=None):
+    """The market-data source called `name` (default: config.MARKET_DATA_SOURCE)"""
+    name = name or config.MARKET_DATA_SOURCE
+    if name not in SOURCES:
+        print(f"Unknown market data source '{name}', using MetaTrader 5")
+        name = 'mt5'
+    return SOURCES[name]()
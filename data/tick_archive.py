@@ -0,0 +1,208 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import json
+import os
+import numpy as np
+import config
+
+# Row layout of mt5.copy_ticks_* results
+TICK_DTYPE = np.dtype([
+    ('time', '<i8'), ('bid', '<f8'), ('ask', '<f8'), ('last', '<f8'), ('volume', '<u8'),
+    ('time_msc', '<i8'), ('flags', '<u4'), ('volume_real', '<f8')
+])
+
+MSC_PER_DAY = 86400 * 1000
+
+# Fields that tell two ticks of the same millisecond apart
+TICK_KEY = ('time_msc', 'bid', 'ask', 'flags')
+
+
+def tick_keys(ticks):
+    """TICK_KEY tuples of structured ticks, for de-duplication"""
+    return list(zip(*(ticks[field].tolist() for field in TICK_KEY)))
+
+
+def _epoch_msc(moment):
+    """Timestamp-like (or epoch ms int) as epoch milliseconds, None passes through"""
+    if moment is None or isinstance(moment, (int, np.integer)):
+        return moment
+    import pandas as pd
+    return int(pd.Timestamp(moment).timestamp() * 1000)
+
+
+class TickArchive:
+    """
+    Compressed, append-only tick history
+
+    Layout: <root>/<symbol>/<YYYY-MM-DD>/<first time_msc>[-n].npz chunks, each
+    column zlib-compressed on its own, plus <root>/<symbol>/index.json
+    listing every chunk's day, file, first/last time_msc and tick count.
+    Range reads open only the chunks the index says overlap. Needs numpy
+    only (pandas for frame()).
+    """
+
+    def __init__(self, root=None):
+        """
+        Args:
+            root: Archive directory (default: config.TICK_ARCHIVE_DIR)
+        """
+        self.root = Path(root or config.TICK_ARCHIVE_DIR)
+        self._indexes = {}
+
+    def _folder(self, symbol):
+        return self.root / symbol
+
+    def index(self, symbol):
+        """Chunk entries [day, file, first_msc, last_msc, count], oldest first"""
+        path = self._folder(symbol) / 'index.json'
+        mtime = path.stat().st_mtime_ns if path.exists() else None
+        cached = self._indexes.get(symbol)
+        if cached is None or cached[0] != mtime:
+            chunks = json.loads(path.read_text())['chunks'] if mtime is not None else []
+            cached = self._indexes[symbol] = (mtime, chunks)
+        return cached[1]
+
+    def _write_index(self, symbol, chunks):
+        # write aside and swap in, so readers never see a partial index
+        path = self._folder(symbol) / 'index.json'
+        temp = path.with_suffix('.tmp')
+        temp.write_text(json.dumps({'chunks': chunks}))
+        os.replace(temp, path)
+        self._indexes.pop(symbol, None)
+
+    def _write_chunk(self, symbol, day, ticks):
+        folder = self._folder(symbol) / day
+        folder.mkdir(parents=True, exist_ok=True)
+        # named by the first tick; never over an existing file (a merge, or
+        # ticks continuing the previous chunk's last millisecond)
+        stem = f"{day}/{int(ticks['time_msc'][0])}"
+        name, copy = f"{stem}.npz", 0
+        while (self._folder(symbol) / name).exists():
+            copy += 1
+            name = f"{stem}-{copy}.npz"
+        temp = self._folder(symbol) / f"{name}.tmp"
+        with open(temp, 'wb') as f:
+            np.savez_compressed(f, **{field: ticks[field] for field in TICK_DTYPE.names})
+        os.replace(temp, self._folder(symbol) / name)
+        return [day, name, int(ticks['time_msc'][0]), int(ticks['time_msc'][-1]), len(ticks)]
+
+    def _read_chunk(self, symbol, name):
+        with np.load(self._folder(symbol) / name) as columns:
+            ticks = np.empty(len(columns['time_msc']), dtype=TICK_DTYPE)
+            for field in TICK_DTYPE.names:
+                ticks[field] = columns[field]
+        return ticks
+
+    def last_msc(self, symbol):
+        """time_msc of the newest archived tick, or None"""
+        chunks = self.index(symbol)
+        return chunks[-1][3] if chunks else None
+
+    def append(self, symbol, ticks):
+        """
+        Archive ticks newer than the newest stored one
+
+        Ticks of the newest stored millisecond are kept unless the same
+        tick (TICK_KEY) is already stored, since a millisecond can hold
+        several ticks that arrive over two fetches.
+
+        Args:
+            ticks: Time-sorted structured ticks (copy_ticks_* layout)
+
+        Returns:
+            Number of ticks written
+        """
+        if ticks is None or len(ticks) == 0:
+            return 0
+
+        ticks = np.asarray(ticks).astype(TICK_DTYPE, copy=False)
+        chunks = list(self.index(symbol))
+        if chunks:
+            last = chunks[-1][3]
+            ticks = ticks[ticks['time_msc'] >= last]
+            boundary = ticks['time_msc'] == last
+            if boundary.any():
+                stored = self._read_chunk(symbol, chunks[-1][1])
+                seen = set(tick_keys(stored[stored['time_msc'] == last]))
+                repeat = np.zeros(len(ticks), dtype=bool)
+                repeat[boundary] = [key in seen for key in tick_keys(ticks[boundary])]
+                ticks = ticks[~repeat]
+        if not len(ticks):
+            return 0
+
+        days = ticks['time_msc'] // MSC_PER_DAY
+        for day in np.unique(days):
+            name = str(np.datetime64(int(day), 'D'))
+            chunks.append(self._write_chunk(symbol, name, ticks[days == day]))
+        self._write_index(symbol, chunks)
+        return len(ticks)
+
+    def compact(self, symbol, day):
+        """
+        Merge a day's chunks into one file (cheaper reads once the day is over)
+
+        The merged file gets a new name and the index switches to it before
+        the parts are deleted, so a failure at any step leaves a readable
+        archive (at worst with orphaned files).
+        """
+        chunks = self.index(symbol)
+        parts = [chunk for chunk in chunks if chunk[0] == day]
+        if len(parts) < 2:
+            return
+
+        merged = self._write_chunk(symbol, day, np.concatenate(
+            [self._read_chunk(symbol, chunk[1]) for chunk in parts]))
+        kept = [chunk for chunk in chunks if chunk[0] != day]
+        self._write_index(symbol, sorted(kept + [merged], key=lambda chunk: chunk[2]))
+        for chunk in parts:
+            (self._folder(symbol) / chunk[1]).unlink(missing_ok=True)
+
+    def load(self, symbol, start=None, end=None):
+        """
+        Archived ticks with start <= time < end
+
+        Args:
+            start, end: Optional bounds (epoch ms ints, or anything
+                        pd.Timestamp accepts)
+
+        Returns:
+            Structured array in TICK_DTYPE, empty if nothing is stored
+        """
+        parts = list(self.iter_chunks(symbol, start, end))
+        if not parts:
+            return np.empty(0, dtype=TICK_DTYPE)
+        return np.concatenate(parts) if len(parts) > 1 else parts[0]
+
+    def iter_chunks(self, symbol, start=None, end=None):
+        """
+        load() one chunk at a time, oldest first
+
+        Only one chunk's ticks are in memory at once, for streaming a long
+        archive.
+
+        Yields:
+            Non-empty TICK_DTYPE arrays with start <= time < end
+        """
+        start_msc, end_msc = _epoch_msc(start), _epoch_msc(end)
+        for day, name, first, last, count in self.index(symbol):
+            if (start_msc is not None and last < start_msc) or (end_msc is not None and first >= end_msc):
+                continue
+            ticks = self._read_chunk(symbol, name)
+            times = ticks['time_msc']
+            lo = 0 if start_msc is None else int(np.searchsorted(times, start_msc, side='left'))
+            hi = len(ticks) if end_msc is None else int(np.searchsorted(times, end_msc, side='left'))
+            if hi > lo:
+                yield ticks[lo:hi]
+
+    def frame(self, symbol, start=None, end=None):
+        """load() as a DataFrame indexed by tick time, or None if empty"""
+        import pandas as pd
+
+        ticks = self.load(symbol, start, end)
+        if not len(ticks):
+            return None
+        index = pd.DatetimeIndex(pd.to_datetime(ticks['time_msc'], unit='ms'), name='Time')
+        return pd.DataFrame({field: ticks[field] for field in TICK_DTYPE.names if field not in ('time', 'time_msc')},
+                            index=index)
@@ -0,0 +1,135 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import threading
+import time
+from datetime import datetime, timedelta
+import numpy as np
+import pytz
+import config
+from data.tick_archive import TickArchive, MSC_PER_DAY, tick_keys
+
+
+class TickRecorder:
+    """
+    Streams ticks from a MarketDataSource into a TickArchive
+
+    A daemon thread asks the source for every tick since the newest one
+    seen (copy_ticks_range on MT5), keeps them in memory and writes them
+    out as one chunk per symbol every flush interval. When a day ends its
+    chunks are merged into one file. Sources without ticks (replay,
+    synthetic) simply record nothing.
+    """
+
+    def __init__(self, source, symbols=None, archive=None, poll_seconds=None, flush_seconds=None):
+        """
+        Args:
+            source: Connected MarketDataSource
+            symbols: Symbols to record (default: config.SYMBOLS)
+            archive: TickArchive to write (default: one at config.TICK_ARCHIVE_DIR)
+            poll_seconds: Seconds between polls (default: config.TICK_POLL_SECONDS)
+            flush_seconds: Seconds between archive writes (default: config.TICK_FLUSH_SECONDS)
+        """
+        self.source = source
+        self.symbols = list(symbols or config.SYMBOLS)
+        self.archive = archive or TickArchive()
+        self.poll_seconds = poll_seconds or config.TICK_POLL_SECONDS
+        self.flush_seconds = flush_seconds or config.TICK_FLUSH_SECONDS
+        # symbol -> time_msc of the newest tick seen, and the keys of the
+        # ticks seen at that millisecond (more may follow in the next poll)
+        self.last = {symbol: self.archive.last_msc(symbol) for symbol in self.symbols}
+        self.seen = {symbol: set() for symbol in self.symbols}
+        # symbol -> tick arrays not yet written
+        self.pending = {symbol: [] for symbol in self.symbols}
+        self._stop = None
+        self._thread = None
+
+    def poll(self):
+        """Fetch the ticks that arrived since the last poll; returns how many"""
+        date_to = datetime.now(pytz.utc) + timedelta(days=1)  # server time may run ahead of UTC
+        received = 0
+        for symbol in self.symbols:
+            last = self.last[symbol]
+            if last is None:
+                date_from = datetime.now(pytz.utc) - timedelta(minutes=config.TICK_BACKFILL_MINUTES)
+            else:
+                date_from = datetime.fromtimestamp(last // 1000, tz=pytz.utc)
+
+            try:
+                ticks = self.source.ticks_range(symbol, date_from, date_to)
+            except Exception as e:
+                print(f"Error fetching {symbol} ticks: {e}")
+                continue
+            if ticks is None or len(ticks) == 0:
+                continue
+
+            if last is not None:
+                ticks = ticks[ticks['time_msc'] >= last]
+                boundary = ticks['time_msc'] == last
+                if boundary.any():
+                    repeat = np.zeros(len(ticks), dtype=bool)
+                    repeat[boundary] = [key in self.seen[symbol] for key in tick_keys(ticks[boundary])]
+                    ticks = ticks[~repeat]
+            if len(ticks):
+                self.pending[symbol].append(ticks)
+                newest = int(ticks['time_msc'][-1])
+                keys = set(tick_keys(ticks[ticks['time_msc'] == newest]))
+                self.seen[symbol] = self.seen[symbol] | keys if newest == last else keys
+                self.last[symbol] = newest
+                received += len(ticks)
+        return received
+
+    def flush(self):
+        """Write pending ticks to the archive; returns how many"""
+        written = 0
+        for symbol in self.symbols:
+            if not self.pending[symbol]:
+                continue
+            ticks = np.concatenate(self.pending[symbol])
+
+            previous = self.archive.last_msc(symbol)
+            try:
+                written += self.archive.append(symbol, ticks)
+            except Exception as e:
+                # kept pending, so the next flush retries them
+                print(f"Error archiving {symbol} ticks: {e}")
+                self.pending[symbol] = [ticks]
+                continue
+            self.pending[symbol] = []
+
+            # the first ticks of a new day close the previous one
+            if previous is not None and ticks['time_msc'][-1] // MSC_PER_DAY > previous // MSC_PER_DAY:
+                day = str(np.datetime64(int(previous // MSC_PER_DAY), 'D'))
+                try:
+                    self.archive.compact(symbol, day)
+                except Exception as e:
+                    print(f"Error compacting {symbol} ticks of {day}: {e}")
+        return written
+
+    def start(self):
+        """Record in a daemon thread until stop()"""
+        if self._thread is not None:
+            return self
+        self._stop = threading.Event()
+
+        def run(stop):
+            next_flush = time.monotonic() + self.flush_seconds
+            while not stop.wait(self.poll_seconds):
+                self.poll()
+                if time.monotonic() >= next_flush:
+                    self.flush()
+                    next_flush = time.monotonic() + self.flush_seconds
+
+        self._thread = threading.Thread(target=run, args=(self._stop,), name='tick-recorder', daemon=True)
+        self._thread.start()
+        print(f" Recording ticks for {', '.join(self.symbols)} to {self.archive.root}")
+        return self
+
+    def stop(self):
+        """Stop the thread and write what is still pending"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
@@ -2,9 +2,18 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
-import MetaTrader5 as mt5
+try:
+    import MetaTrader5 as mt5
+except ImportError:  # replay/synthetic data sources: no orders can be placed
+    mt5 = None
 from datetime import datetime
 import config
+from data.metadata_cache import metadata, pip_spec
+from data.sources import MT5Source
+
+# The MetaTrader5 module drives one terminal: share the data source's lock
+# so orders never interleave with scan-thread fetches
+mt5_lock = MT5Source._lock
 
 class LiveTrader:
     def __init__(self):
@@ -18,31 +27,43 @@ class LiveTrader:
         WARNING: This places REAL trades!
         Only use when you're confident in the bot.
         """
+        if mt5 is None:
+            print(" MetaTrader5 package not installed, can't place trades")
+            return False
+        
+        symbol = signal.get('symbol', self.symbol)
+        
         try:
-            symbol_info = mt5.symbol_info(self.symbol)
+            # Cached by the connected DataHandler; only the price needs a fresh tick
+            symbol_info = metadata.get(('symbol', symbol))
             if symbol_info is None:
-                print(f" Symbol {self.symbol} not found")
+                print(f" Symbol {symbol} not found")
                 return False
             
-            if not symbol_info.trade_mode == mt5.SYMBOL_TRADE_MODE_FULL:
-                print(f" Trading not allowed for {self.symbol}")
+            if not symbol_info['trade_mode'] == mt5.SYMBOL_TRADE_MODE_FULL:
+                print(f" Trading not allowed for {symbol}")
                 return False
             
-            lot_size = signal['lot_size']
+            # Snapped to the lots this symbol accepts
+            step = symbol_info['volume_step']
+            lot_size = round(round(signal['lot_size'] / step) * step, 8)
+            lot_size = min(max(lot_size, symbol_info['volume_min']), symbol_info['volume_max'])
             entry_price = signal['entry_price']
             stop_loss = signal['stop_loss']
             take_profit = signal['take_profit_1']  
             
+            with mt5_lock:
+                tick = mt5.symbol_info_tick(symbol)
             if signal['signal'] == 'LONG':
                 order_type = mt5.ORDER_TYPE_BUY
-                price = mt5.symbol_info_tick(self.symbol).ask
+                price = tick.ask
             else:
                 order_type = mt5.ORDER_TYPE_SELL
-                price = mt5.symbol_info_tick(self.symbol).bid
+                price = tick.bid
             
             request = {
                 "action": mt5.TRADE_ACTION_DEAL,
-                "symbol": self.symbol,
+                "symbol": symbol,
                 "volume": lot_size,
                 "type": order_type,
                 "price": price,
@@ -56,10 +77,12 @@ class LiveTrader:
             }
             
             print(f" Sending {signal['signal']} order...")
-            result = mt5.order_send(request)
+            with mt5_lock:
+                result = mt5.order_send(request)
+                error = mt5.last_error() if result is None else None
             
             if result is None:
-                print(f" Order send failed: {mt5.last_error()}")
+                print(f" Order send failed: {error}")
                 return False
             
             if result.retcode != mt5.TRADE_RETCODE_DONE:
@@ -67,6 +90,8 @@ class LiveTrader:
                 print(f"   Comment: {result.comment}")
                 return False
             
+            metadata.invalidate('account')  # balance/margin changed
+            
             print(f"   Order executed successfully!")
             print(f"   Ticket: {result.order}")
             print(f"   Volume: {result.volume}")
@@ -81,23 +106,26 @@ class LiveTrader:
     def close_position(self, position_id):
         """Close a specific position"""
         try:
-            position = mt5.positions_get(ticket=position_id)
+            with mt5_lock:
+                position = mt5.positions_get(ticket=position_id)
             if not position:
                 print(f" Position {position_id} not found")
                 return False
             
             position = position[0]
+            with mt5_lock:
+                tick = mt5.symbol_info_tick(position.symbol)
             
             if position.type == mt5.ORDER_TYPE_BUY:
                 order_type = mt5.ORDER_TYPE_SELL
-                price = mt5.symbol_info_tick(self.symbol).bid
+                price = tick.bid
             else:
                 order_type = mt5.ORDER_TYPE_BUY
-                price = mt5.symbol_info_tick(self.symbol).ask
+                price = tick.ask
             
             request = {
                 "action": mt5.TRADE_ACTION_DEAL,
-                "symbol": self.symbol,
+                "symbol": position.symbol,
                 "volume": position.volume,
                 "type": order_type,
                 "position": position_id,
@@ -109,9 +137,11 @@ class LiveTrader:
                 "type_filling": mt5.ORDER_FILLING_IOC,
             }
             
-            result = mt5.order_send(request)
+            with mt5_lock:
+                result = mt5.order_send(request)
             
             if result and result.retcode == mt5.TRADE_RETCODE_DONE:
+                metadata.invalidate('account')  # balance/margin changed
                 print(f" Position closed: {position_id}")
                 return True
             else:
@@ -122,10 +152,11 @@ class LiveTrader:
             print(f" Error closing position: {e}")
             return False
     
-    def get_open_positions(self):
-        """Get all open positions from this bot"""
+    def get_open_positions(self, symbol=None):
+        """Get all open positions from this bot (on `symbol`, default: SYMBOL)"""
         try:
-            positions = mt5.positions_get(symbol=self.symbol)
+            with mt5_lock:
+                positions = mt5.positions_get(symbol=symbol or self.symbol)
             if positions is None:
                 return []
             
@@ -139,18 +170,20 @@ class LiveTrader:
     def check_position_status(self, position_id):
         """Check if position hit TP1 and move SL to breakeven"""
         try:
-            position = mt5.positions_get(ticket=position_id)
+            with mt5_lock:
+                position = mt5.positions_get(ticket=position_id)
             if not position:
                 return None
             
             position = position[0]
             current_price = position.price_current
             entry_price = position.price_open
+            pip_size = pip_spec(metadata.get(('symbol', position.symbol)))[0]
             
             if position.type == mt5.ORDER_TYPE_BUY:
-                profit_pips = (current_price - entry_price) / 0.10
+                profit_pips = (current_price - entry_price) / pip_size
             else:
-                profit_pips = (entry_price - current_price) / 0.10
+                profit_pips = (entry_price - current_price) / pip_size
             
             return {
                 'ticket': position_id,
@@ -166,7 +199,8 @@ class LiveTrader:
     def modify_stop_loss(self, position_id, new_sl):
         """Modify stop loss (e.g., move to breakeven)"""
         try:
-            position = mt5.positions_get(ticket=position_id)
+            with mt5_lock:
+                position = mt5.positions_get(ticket=position_id)
             if not position:
                 return False
             
@@ -174,13 +208,14 @@ class LiveTrader:
             
             request = {
                 "action": mt5.TRADE_ACTION_SLTP,
-                "symbol": self.symbol,
+                "symbol": position.symbol,
                 "position": position_id,
                 "sl": new_sl,
                 "tp": position.tp
             }
             
-            result = mt5.order_send(request)
+            with mt5_lock:
+                result = mt5.order_send(request)
             
             if result and result.retcode == mt5.TRADE_RETCODE_DONE:
                 print(f" Stop loss modified to ${new_sl:.2f}")
@@ -89,6 +89,7 @@ class MultiUserTelegramBot:
         message = f"""
 *NIXIE'S GOLD TRADING SIGNAL*
 
+*Symbol:* {signal.get('symbol', config.SYMBOL)}
 *Direction:* {signal['signal']}
 *Confidence:* {signal['confidence']}%
 
@@ -0,0 +1,187 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from collections import deque
+from datetime import time, timedelta
+import pandas as pd
+from indicators.rolling import RollingMax, RollingMin
+from indicators.structural import StructuralLevels
+from indicators.level_index import LevelIndex
+from indicators.pivots import FractalPivotTracker
+from indicators.calendar_levels import CalendarLevelTracker
+
+# Asian session as filtered by MarketHours.get_asian_range (both ends included)
+ASIAN_START = time(0, 0)
+ASIAN_END = time(8, 0)
+
+
+class StructuralLevelTracker:
+    """
+    Bar-by-bar version of StructuralLevels.identify_key_levels
+
+    Feed closed bars in time order; every level is kept current with O(1)
+    amortized work per bar instead of filtering and resampling the whole
+    history on each evaluation. levels() equals identify_key_levels on the
+    last `history` bars fed.
+
+    Levels that moved are returned from update() and, if given, passed to
+    on_change(timestamp, changes).
+    """
+
+    def __init__(self, history=None, on_change=None, structural=None):
+        """
+        Args:
+            history: Bars the levels cover (default: what
+                     identify_key_levels reads on H4)
+            on_change: Optional callback(timestamp, {level: new value})
+            structural: StructuralLevels whose settings (pivot order, pip
+                        size) to follow (default: a new one)
+        """
+        self.structural = structural or StructuralLevels()
+        self.history = history or self.structural.history_bars('H4')
+        self.on_change = on_change
+        self.reset()
+
+    def reset(self):
+        """Drop all bars and levels"""
+        structural = self.structural
+        self.swing_window = min(structural.SWING_LOOKBACK, self.history)
+        self.fib_window = min(structural.FIBONACCI_LOOKBACK, self.history)
+        self.swing_high = RollingMax(self.swing_window, min_periods=1)
+        self.swing_low = RollingMin(self.swing_window, min_periods=1)
+        self.range_high = RollingMax(self.fib_window, min_periods=1)
+        self.range_low = RollingMin(self.fib_window, min_periods=1)
+
+        # one tracker for the swing order and the extra pivot levels; only
+        # the newest pivot of each side is ever read
+        orders = set(structural.pivot_orders) | ({structural.pivot_order} if structural.pivot_order else set())
+        self.pivots = FractalPivotTracker(orders, history=1) if orders else None
+
+        # monotonic (position, price) deques over the Asian-session bars in the window
+        self.asian_highs = deque()
+        self.asian_lows = deque()
+
+        self.calendar = CalendarLevelTracker(self.history)
+        self.week_start = None
+        self.weekly_open = None
+        self.current = {}
+        self._index = None
+        self.last_timestamp = None
+        self.bars_seen = 0
+
+    def update(self, timestamp, bar):
+        """
+        Feed one closed bar
+
+        Args:
+            timestamp: Bar open time
+            bar: Mapping with Open, High, Low, Close
+
+        Returns:
+            dict of the levels whose value changed (empty if none)
+        """
+        open_ = float(bar['Open'])
+        high = float(bar['High'])
+        low = float(bar['Low'])
+        close = float(bar['Close'])
+        stamp = pd.Timestamp(timestamp)
+        position = self.bars_seen
+        self.bars_seen += 1
+        self.last_timestamp = timestamp
+
+        if ASIAN_START <= stamp.time() <= ASIAN_END:
+            self._push(self.asian_highs, position, high, lambda kept: kept <= high)
+            self._push(self.asian_lows, position, low, lambda kept: kept >= low)
+        for candidates in (self.asian_highs, self.asian_lows):
+            while candidates and candidates[0][0] <= position - self.history:
+                candidates.popleft()
+
+        # weeks start Monday 00:00, as in resample('W-MON', closed='left')
+        day = stamp.normalize()
+        week_start = day - timedelta(days=day.weekday())
+        if week_start != self.week_start:
+            self.week_start = week_start
+            self.weekly_open = open_
+
+        swing_high = self.swing_high.update(high)
+        swing_low = self.swing_low.update(low)
+        range_high = self.range_high.update(high)
+        range_low = self.range_low.update(low)
+        if self.pivots is not None:
+            self.pivots.update(high, low)
+        if self.structural.pivot_order:
+            swing_high, swing_low = self._pivot_swing(self.swing_window, swing_high, swing_low)
+            range_high, range_low = self._pivot_swing(self.fib_window, range_high, range_low)
+
+        levels = self.calendar.update(timestamp, open_, high, low, close)
+        if self.asian_highs and self.asian_lows:
+            asian_high = self.asian_highs[0][1]
+            asian_low = self.asian_lows[0][1]
+            if asian_high and asian_low:
+                levels['asian_high'] = asian_high
+                levels['asian_low'] = asian_low
+        levels['weekly_open'] = self.weekly_open
+        levels['swing_high'] = swing_high
+        levels['swing_low'] = swing_low
+        for order in self.structural.pivot_orders:
+            pivot_high, pivot_low = self.pivots.latest(order, self.swing_window)
+            if pivot_high:
+                levels[f'swing_high_{order}'] = pivot_high[1]
+            if pivot_low:
+                levels[f'swing_low_{order}'] = pivot_low[1]
+        levels['fibonacci'] = self.structural.fibonacci_from_range(range_high, range_low)
+        levels['round_numbers'] = self.structural.get_round_number_levels(close)
+
+        changes = {name: value for name, value in levels.items() if self.current.get(name) != value}
+        changes.update({name: None for name in self.current if name not in levels})
+        self.current = levels
+
+        if changes:
+            self._index = None
+            if self.on_change is not None:
+                self.on_change(timestamp, changes)
+        return changes
+
+    def _pivot_swing(self, window, range_high, range_low):
+        """Newest pivot high/low within `window` bars, the range where there is none"""
+        pivot_high, pivot_low = self.pivots.latest(self.structural.pivot_order, window)
+        return (pivot_high[1] if pivot_high else range_high,
+                pivot_low[1] if pivot_low else range_low)
+
+    @staticmethod
+    def _push(candidates, position, price, dominated):
+        while candidates and dominated(candidates[-1][1]):
+            candidates.pop()
+        candidates.append((position, price))
+
+    def extend(self, df):
+        """
+        Feed every bar of df newer than the last one seen
+
+        Returns:
+            Number of bars consumed
+        """
+        if self.last_timestamp is not None:
+            df = df[df.index > self.last_timestamp]
+
+        for timestamp, o, h, l, c in df[['Open', 'High', 'Low', 'Close']].itertuples(name=None):
+            self.update(timestamp, {'Open': o, 'High': h, 'Low': l, 'Close': c})
+
+        return len(df)
+
+    def seed(self, df):
+        """Reset and replay the last `history` bars of df"""
+        self.reset()
+        self.extend(df.iloc[-self.history:])
+        return self
+
+    def levels(self):
+        """Current levels in identify_key_levels layout"""
+        return dict(self.current)
+
+    def level_index(self):
+        """Current levels as a LevelIndex, rebuilt only after a change"""
+        if self._index is None:
+            self._index = LevelIndex.from_levels(self.current)
+        return self._index
@@ -0,0 +1,225 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import math
+from collections import deque
+import numpy as np
+
+NAN = float('nan')
+
+# Rows per re-centred segment in the batch mean/variance pass
+_MOMENT_CHUNK = 1024
+
+
+def _as_array(values):
+    return np.ascontiguousarray(np.asarray(values, dtype=np.float64))
+
+
+# ---------------------------------------------------------------------------
+# Batch kernels: whole series in O(n), independent of the window length
+# ---------------------------------------------------------------------------
+
+def _rolling_extreme(values, window, min_periods, ufunc, pad):
+    """
+    Trailing max/min with the van Herk / Gil-Werman block scheme
+
+    The series is cut into blocks of `window`; a prefix scan inside each
+    block and a suffix scan from each block's end cover any window with two
+    lookups, so the cost doesn't depend on the window length. NaN inside a
+    window gives NaN, like pandas.
+    """
+    x = _as_array(values)
+    length = len(x)
+    min_periods = window if min_periods is None else max(1, min_periods)
+    out = np.full(length, np.nan)
+
+    if length >= window:
+        padded = np.full(-(-length // window) * window, pad)
+        padded[:length] = x
+        blocks = padded.reshape(-1, window)
+        prefix = ufunc.accumulate(blocks, axis=1).ravel()
+        suffix = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+        out[window - 1:] = ufunc(suffix[:length - window + 1], prefix[window - 1:length])
+
+    # windows that aren't full yet: running extreme from bar 0
+    head = min(window - 1, length)
+    if min_periods < window and head:
+        out[:head] = ufunc.accumulate(x[:head])
+    out[:min(min_periods - 1, length)] = np.nan
+    return out
+
+
+def rolling_max(values, window, min_periods=None):
+    """Trailing max; NaN until `min_periods` (default: window) values are in"""
+    return _rolling_extreme(values, window, min_periods, np.maximum, -np.inf)
+
+
+def rolling_min(values, window, min_periods=None):
+    """Trailing min; NaN until `min_periods` (default: window) values are in"""
+    return _rolling_extreme(values, window, min_periods, np.minimum, np.inf)
+
+
+def rolling_mean_var(values, window, ddof=0):
+    """
+    Trailing mean and variance in one O(n) pass
+
+    Windowed sums come from prefix sums, taken over segments re-centred on
+    their own mean so the subtraction doesn't cancel away the variance of
+    price-level data (e.g. gold around 2000).
+
+    Returns: (mean, var), NaN until the window is full
+    """
+    x = _as_array(values)
+    length = len(x)
+    mean = np.full(length, np.nan)
+    var = np.full(length, np.nan)
+    if length < window:
+        return mean, var
+
+    missing = np.isnan(x)
+    for start in range(window - 1, length, _MOMENT_CHUNK):
+        stop = min(start + _MOMENT_CHUNK, length)
+        segment = x[start - window + 1:stop]
+        gaps = missing[start - window + 1:stop]
+        center = segment[~gaps].mean() if not gaps.all() else 0.0
+        shifted = np.where(gaps, 0.0, segment - center)
+
+        sums = np.concatenate(([0.0], np.cumsum(shifted)))
+        squares = np.concatenate(([0.0], np.cumsum(shifted * shifted)))
+        window_sum = sums[window:] - sums[:-window]
+        window_squares = squares[window:] - squares[:-window]
+
+        local_mean = window_sum / window
+        chunk_mean = local_mean + center
+        chunk_var = np.maximum(window_squares - window_sum * local_mean, 0.0) / (window - ddof)
+
+        if gaps.any():
+            counts = np.concatenate(([0], np.cumsum(gaps)))
+            incomplete = (counts[window:] - counts[:-window]) > 0
+            chunk_mean[incomplete] = np.nan
+            chunk_var[incomplete] = np.nan
+
+        mean[start:stop] = chunk_mean
+        var[start:stop] = chunk_var
+
+    return mean, var
+
+
+def rolling_mean(values, window):
+    """Trailing mean; NaN until the window is full"""
+    return rolling_mean_var(values, window)[0]
+
+
+def rolling_std(values, window, ddof=0):
+    """Trailing standard deviation (population by default, like ta)"""
+    return np.sqrt(rolling_mean_var(values, window, ddof)[1])
+
+
+# ---------------------------------------------------------------------------
+# Streaming kernels: one value at a time, O(1) amortized per update
+# ---------------------------------------------------------------------------
+
+class RollingExtreme:
+    """
+    Trailing max (or min) over a fixed window with a monotonic deque
+
+    Each value enters and leaves the deque once, so updates are O(1)
+    amortized. Returns NaN until `min_periods` (default: window) values are
+    in, or while a NaN is in the window.
+    """
+    __slots__ = ('window', 'maximum', 'min_periods', 'candidates', 'count', 'last_nan')
+
+    def __init__(self, window, maximum=True, min_periods=None):
+        self.window = window
+        self.maximum = maximum
+        self.min_periods = window if min_periods is None else max(1, min_periods)
+        self.candidates = deque()  # (position, value), values monotonic
+        self.count = 0
+        self.last_nan = -window
+
+    def update(self, x):
+        position = self.count
+        self.count += 1
+
+        if x != x:
+            self.last_nan = position
+        else:
+            candidates = self.candidates
+            if self.maximum:
+                while candidates and candidates[-1][1] <= x:
+                    candidates.pop()
+            else:
+                while candidates and candidates[-1][1] >= x:
+                    candidates.pop()
+            candidates.append((position, x))
+
+        while self.candidates and self.candidates[0][0] <= position - self.window:
+            self.candidates.popleft()
+
+        if self.count < self.min_periods or position - self.last_nan < self.window:
+            return NAN
+        return self.candidates[0][1]
+
+
+class RollingMax(RollingExtreme):
+    __slots__ = ()
+
+    def __init__(self, window, min_periods=None):
+        super().__init__(window, maximum=True, min_periods=min_periods)
+
+
+class RollingMin(RollingExtreme):
+    __slots__ = ()
+
+    def __init__(self, window, min_periods=None):
+        super().__init__(window, maximum=False, min_periods=min_periods)
+
+
+class RollingMeanVar:
+    """
+    Trailing mean and variance with Welford add/remove updates
+
+    The running moments are rebuilt from the window every `resync` updates
+    so rounding from the removals can't drift over a long live session.
+    """
+    __slots__ = ('window', 'ddof', 'resync', 'values', 'mean', 'm2', 'updates')
+
+    def __init__(self, window, ddof=0, resync=1000):
+        self.window = window
+        self.ddof = ddof
+        self.resync = resync
+        self.values = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.updates = 0
+
+    def update(self, x):
+        """Returns: (mean, var), NaN until the window is full"""
+        values = self.values
+        values.append(x)
+
+        if len(values) > self.window:
+            old = values.popleft()
+            # replace `old` by `x` in one step (count unchanged)
+            delta = x - old
+            old_mean = self.mean
+            self.mean += delta / self.window
+            self.m2 += delta * (x - self.mean + old - old_mean)
+        else:
+            delta = x - self.mean
+            self.mean += delta / len(values)
+            self.m2 += delta * (x - self.mean)
+
+        self.updates += 1
+        if self.updates % self.resync == 0 or self.mean != self.mean:
+            self._rebuild()
+
+        if len(values) < self.window or self.mean != self.mean:
+            return NAN, NAN
+        return self.mean, max(self.m2, 0.0) / (self.window - self.ddof)
+
+    def _rebuild(self):
+        count = len(self.values)
+        self.mean = math.fsum(self.values) / count
+        self.m2 = math.fsum((v - self.mean) ** 2 for v in self.values)
@@ -8,42 +8,75 @@ from ta.trend import EMAIndicator, ADXIndicator, MACD
 from ta.momentum import RSIIndicator, StochasticOscillator
 from ta.volatility import BollingerBands, AverageTrueRange
 import config
+from indicators import vectorized
+from indicators.cache import frame_key, indicator_cache
+from data.bar_series import BarSeries
 
 class TechnicalIndicators:
-    def __init__(self):
-        pass
+    # add_* method behind each group of columns (ta backend)
+    TA_GROUPS = [
+        ('add_emas', ('EMA_20', 'EMA_50')),
+        ('add_adx', ('ADX', 'ADX_POS', 'ADX_NEG')),
+        ('add_bollinger_bands', ('BB_upper', 'BB_middle', 'BB_lower', 'BB_width')),
+        ('add_rsi', ('RSI',)),
+        ('add_stochastic', ('Stoch_K', 'Stoch_D')),
+        ('add_macd', ('MACD', 'MACD_signal', 'MACD_diff')),
+        ('add_atr', ('ATR',)),
+        ('add_volume_analysis', ('Volume_MA', 'Volume_Ratio', 'PVT')),
+        ('add_divergence', ('RSI_div', 'MACD_div'))
+    ]
     
-    def calculate_all(self, df):
+    # RSI_div / MACD_div encoding
+    DIVERGENCE_LABELS = {1.0: 'bullish', -1.0: 'bearish'}
+    
+    def __init__(self, backend=None, cache=indicator_cache):
+        # 'numpy' = fused vectorized kernel, 'ta' = one ta object per indicator
+        self.backend = backend or config.INDICATOR_BACKEND
+        # Shared LRU of finished frames; None disables caching
+        self.cache = cache
+    
+    def calculate_all(self, df, columns=None):
         """
-        Calculate all technical indicators on a dataframe
+        Calculate technical indicators on a dataframe
         
         Args:
             df: DataFrame with OHLCV data
+            columns: Optional indicator columns the caller reads (e.g.
+                     SignalGenerator.M15_COLUMNS). Only those and their
+                     dependencies are computed; None computes everything.
         
         Returns:
-            DataFrame with added indicator columns
+            DataFrame with added indicator columns, starting after the
+            warm-up rows (their count is in result.attrs['warmup']). Later
+            rows where a value is undefined (NaN or inf, e.g. Stoch_K over
+            a flat range) are left out, as dropna() used to. The result is
+            normally a view of one float64 block and may come from the
+            shared cache, so treat it as read-only.
         """
+        key = None
         try:
-            df = df.copy()
-            
-            df = self.add_emas(df)
-            
-            df = self.add_adx(df)
-            
-            df = self.add_bollinger_bands(df)
-            
-
-            df = self.add_rsi(df)
-            
-            df = self.add_stochastic(df)
+            if self.cache is not None:
+                key = frame_key(df, columns, self.backend)
+                if key is not None:
+                    cached = self.cache.get(key)
+                    if cached is not None:
+                        return cached
             
-            df = self.add_macd(df)
+            if self.backend == 'numpy':
+                df = self.add_all_vectorized(df, columns)
+            else:
+                df = self.add_all_ta(df.copy(), columns)
             
-            df = self.add_atr(df)
+            warmup = self.warmup_length(df)
+            attrs = dict(df.attrs, warmup=warmup)
+            df = df.iloc[warmup:]
+            valid = self.valid_rows(df)
+            if not valid.all():
+                df = df[valid]
+            df.attrs = attrs
             
-            df = self.add_volume_analysis(df)
-            
-            df = df.dropna()
+            if key is not None:
+                self.cache.put(key, df)
             
             return df
             
@@ -51,6 +84,101 @@ class TechnicalIndicators:
             print(f"Error calculating indicators: {e}")
             return df
     
+    def create_stream(self, df=None, max_history=500):
+        """
+        Create an incremental indicator stream (O(1) work per new bar)
+        
+        Args:
+            df: Optional OHLCV DataFrame to seed the stream with
+            max_history: Number of warmed-up rows the stream keeps
+        
+        Returns:
+            IndicatorStream producing the same columns as calculate_all
+        """
+        from indicators.streaming import IndicatorStream
+        
+        stream = IndicatorStream(max_history=max_history)
+        if df is not None:
+            stream.seed(df)
+        return stream
+    
+    def add_all_vectorized(self, df, columns=None):
+        """
+        Build a new frame of df's columns plus indicator columns from the
+        fused NumPy kernel
+
+        Numeric input columns and indicators share one preallocated float64
+        block, and the kernel writes straight into it. df is left untouched.
+        """
+        names = [name for name in vectorized.INDICATOR_COLUMNS if columns is None or name in columns]
+        if columns is not None:
+            vectorized.resolve(columns)  # rejects unknown column names
+        
+        inputs = [name for name in df.columns if name not in names]
+        numeric = [name for name in inputs if pd.api.types.is_numeric_dtype(df[name])]
+        
+        # one row per column so every column is contiguous
+        block = np.empty((len(numeric) + len(names), len(df)))
+        for row, name in enumerate(numeric):
+            block[row] = df[name].to_numpy(dtype=float)
+        
+        rows = dict(zip(numeric + names, block))
+        vectorized.compute(rows['High'], rows['Low'], rows['Close'], rows['Volume'],
+                           names, out={name: rows[name] for name in names})
+        
+        result = pd.DataFrame(block.T, index=df.index, columns=numeric + names, copy=False)
+        for position, name in enumerate(inputs):
+            if name not in rows:
+                result.insert(position, name, df[name])
+        result.attrs = dict(df.attrs)
+        
+        return result
+    
+    @staticmethod
+    def required_bars(columns=None, history=1, tolerance=None):
+        """
+        Bars to fetch so the last `history` rows of `columns` are warmed up
+        
+        Args:
+            columns: Indicator columns that will be read; None means all
+            history: Rows of warmed-up output the caller reads
+            tolerance: EMA/Wilder convergence tolerance
+                       (default config.INDICATOR_CONVERGENCE_TOLERANCE)
+        """
+        return vectorized.warmup_bars(columns, tolerance) + history
+    
+    @staticmethod
+    def warmup_length(df):
+        """Number of leading rows where any column is still NaN"""
+        warmup = 0
+        for name in df.columns:
+            valid = df[name].notna().to_numpy()
+            warmup = max(warmup, int(valid.argmax()) if valid.any() else len(df))
+        return warmup
+    
+    @staticmethod
+    def valid_rows(df):
+        """Mask of rows with no NaN and no inf in any column"""
+        numeric = df.select_dtypes('number').to_numpy(dtype=float)
+        return np.isfinite(numeric).all(axis=1) & df.notna().all(axis=1).to_numpy()
+    
+    def add_all_ta(self, df, columns=None):
+        """Add indicator columns with the ta library, one indicator group at a time"""
+        wanted = set(vectorized.INDICATOR_COLUMNS if columns is None else columns)
+        required = set(vectorized.resolve(wanted))  # also rejects unknown column names
+        
+        for method, group in self.TA_GROUPS:
+            if required.intersection(group):
+                df = getattr(self, method)(df)
+        
+        # dependencies (e.g. RSI for RSI_div) only stay if asked for
+        unused = [name for _, group in self.TA_GROUPS for name in group
+                  if name in df.columns and name not in wanted]
+        if unused:
+            df = df.drop(columns=unused)
+        
+        return df
+    
     def add_emas(self, df):
         """Add Exponential Moving Averages"""
         ema_fast = EMAIndicator(close=df['Close'], window=config.EMA_FAST)
@@ -151,57 +279,54 @@ class TechnicalIndicators:
         
         return df
     
-    def check_rsi_divergence(self, df, lookback=14):
+    def add_divergence(self, df):
+        """Add RSI_div / MACD_div (1 bullish, -1 bearish, 0 none) for every bar"""
+        for column, source in (('RSI_div', 'RSI'), ('MACD_div', 'MACD')):
+            if source in df.columns:
+                df[column] = vectorized.divergence(
+                    df['Low'], df['High'], df[source],
+                    config.DIVERGENCE_LOOKBACK, config.DIVERGENCE_PIVOT_WINDOW
+                )
+        
+        return df
+    
+    def divergence_label(self, df, column):
+        """'bullish', 'bearish' or None from the last value of RSI_div / MACD_div"""
+        value = df.last(column) if isinstance(df, BarSeries) else df[column].iloc[-1]
+        return self.DIVERGENCE_LABELS.get(value)
+    
+    def check_rsi_divergence(self, df, lookback=None):
         """
         Check for RSI divergence (bullish or bearish)
         Returns: 'bullish', 'bearish', or None
+        
+        Reads the RSI_div column when calculate_all produced it with the
+        same lookback (config.DIVERGENCE_LOOKBACK, the default); otherwise
+        runs the same whole-series check on df.
         """
-        try:
-            recent_df = df.tail(lookback)
-            
-            price_lower_low = recent_df['Low'].iloc[-1] < recent_df['Low'].iloc[0]
-            rsi_higher_low = recent_df['RSI'].iloc[-1] > recent_df['RSI'].iloc[0]
-            
-            if price_lower_low and rsi_higher_low:
-                return 'bullish'
-            
-            price_higher_high = recent_df['High'].iloc[-1] > recent_df['High'].iloc[0]
-            rsi_lower_high = recent_df['RSI'].iloc[-1] < recent_df['RSI'].iloc[0]
-            
-            if price_higher_high and rsi_lower_high:
-                return 'bearish'
-            
-            return None
-            
-        except Exception as e:
-            return None
+        return self._last_divergence(df, 'RSI_div', 'RSI', lookback)
     
-    def check_macd_divergence(self, df, lookback=14):
+    def check_macd_divergence(self, df, lookback=None):
         """
         Check for MACD divergence
         Returns: 'bullish', 'bearish', or None
         """
+        return self._last_divergence(df, 'MACD_div', 'MACD', lookback)
+    
+    def _last_divergence(self, df, column, source, lookback):
         try:
-            recent_df = df.tail(lookback)
-            
-            price_lower_low = recent_df['Low'].iloc[-1] < recent_df['Low'].iloc[0]
-            macd_higher_low = recent_df['MACD'].iloc[-1] > recent_df['MACD'].iloc[0]
-            
-            if price_lower_low and macd_higher_low:
-                return 'bullish'
-            
-            price_higher_high = recent_df['High'].iloc[-1] > recent_df['High'].iloc[0]
-            macd_lower_high = recent_df['MACD'].iloc[-1] < recent_df['MACD'].iloc[0]
+            lookback = lookback or config.DIVERGENCE_LOOKBACK
+            if column in df.columns and lookback == config.DIVERGENCE_LOOKBACK:
+                return self.divergence_label(df, column)
             
-            if price_higher_high and macd_lower_high:
-                return 'bearish'
-            
-            return None
+            flags = vectorized.divergence(
+                df['Low'], df['High'], df[source], lookback, config.DIVERGENCE_PIVOT_WINDOW
+            )
+            return self.DIVERGENCE_LABELS.get(flags[-1])
             
         except Exception as e:
             return None
 
-
 if __name__ == "__main__":
     from data.data_handler import DataHandler
     
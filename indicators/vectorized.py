@@ -0,0 +1,625 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import math
+import numpy as np
+import config
+from indicators.rolling import rolling_mean, rolling_std, rolling_max, rolling_min
+from indicators.pivots import pivot_positions
+
+# Largest power of the decay factor a recurrence block may divide by;
+# keeps the blocked scan well inside float64 range.
+_MAX_BLOCK_GROWTH = 1e30
+
+
+def _as_array(values):
+    """Contiguous float64 view of a Series/array (no copy when possible)"""
+    return np.ascontiguousarray(np.asarray(values, dtype=np.float64))
+
+
+def linear_recurrence(x, decay, gain, start, init):
+    """
+    Evaluate y[t] = decay * y[t-1] + gain * x[t] without a Python loop per bar
+
+    The series is processed in blocks; inside a block the recurrence is a
+    scaled cumulative sum, so each block is a handful of NumPy calls.
+
+    Args:
+        x: Input array, 1-D (time) or 2-D (time x parameter)
+        decay, gain: Scalars or one value per column
+        start: Index holding the seed value; earlier entries are NaN
+        init: Seed value y[start] (scalar or one per column)
+
+    Returns:
+        Array shaped like x
+    """
+    x = np.asarray(x, dtype=np.float64)
+    one_d = x.ndim == 1
+    x2 = x.reshape(len(x), -1)
+    width = x2.shape[1]
+
+    decay = np.broadcast_to(np.asarray(decay, dtype=np.float64), (width,))
+    gain = np.broadcast_to(np.asarray(gain, dtype=np.float64), (width,))
+
+    y = np.full(x2.shape, np.nan)
+    length = len(x2)
+    if start >= length:
+        return y[:, 0] if one_d else y
+
+    y[start] = init
+    smallest = float(decay.min())
+    if smallest <= 0.0:
+        block = 1
+    elif smallest >= 1.0:
+        block = length
+    else:
+        block = max(1, int(math.log(_MAX_BLOCK_GROWTH) / -math.log(smallest)))
+
+    t = start
+    while t + 1 < length:
+        stop = min(t + 1 + block, length)
+        powers = decay ** np.arange(1, stop - t, dtype=np.float64)[:, None]
+        y[t + 1:stop] = powers * (y[t] + gain * np.cumsum(x2[t + 1:stop] / powers, axis=0))
+        t = stop - 1
+
+    return y[:, 0] if one_d else y
+
+
+def ema(values, window):
+    """EMA with ta/pandas semantics (adjust=False, min_periods=window)"""
+    x = _as_array(values)
+    valid = np.flatnonzero(~np.isnan(x))
+    if len(valid) == 0:
+        return np.full(len(x), np.nan)
+
+    first = valid[0]
+    alpha = 2.0 / (window + 1)
+    out = linear_recurrence(x, 1 - alpha, alpha, first, x[first])
+    out[:first + window - 1] = np.nan
+    return out
+
+
+def true_range(high, low, close):
+    """
+    True range; element 0 is High - Low (as in ta's ATR)
+
+    From bar 1 on this equals max(High, prev Close) - min(Low, prev Close),
+    which is what ta's ADX uses, so ATR and ADX can share it.
+    """
+    prev_close = np.empty_like(close)
+    prev_close[0] = np.nan
+    prev_close[1:] = close[:-1]
+
+    tr = np.fmax(high, prev_close) - np.fmin(low, prev_close)
+    return tr
+
+
+def atr(tr, window):
+    """Wilder ATR seeded with the mean of the first `window` true ranges"""
+    out = np.zeros(len(tr))
+    if len(tr) < window:
+        return out
+
+    seed = tr[:window].mean()
+    out[window - 1:] = linear_recurrence(tr[window - 1:], (window - 1) / window, 1.0 / window, 0, seed)
+    return out
+
+
+def rsi(close, window):
+    """Wilder RSI (ta's RSIIndicator)"""
+    diff = np.empty_like(close)
+    diff[0] = 0.0
+    diff[1:] = close[1:] - close[:-1]
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+
+    alpha = 1.0 / window
+    avg_up = linear_recurrence(up, 1 - alpha, alpha, 0, up[0])
+    avg_down = linear_recurrence(down, 1 - alpha, alpha, 0, down[0])
+    avg_up[:window - 1] = np.nan
+    avg_down[:window - 1] = np.nan
+
+    out = np.where(avg_down == 0, 100.0, 100 - (100 / (1 + avg_up / avg_down)))
+    return out
+
+
+def adx(tr, high, low, window):
+    """
+    ADX, +DI and -DI (ta's ADXIndicator)
+
+    Returns: (adx, adx_pos, adx_neg); warm-up bars are 0.0 like ta
+    """
+    length = len(tr)
+    adx_out = np.zeros(length)
+    pos_out = np.zeros(length)
+    neg_out = np.zeros(length)
+    if length < 2 * window:
+        return adx_out, pos_out, neg_out
+
+    diff_up = np.zeros(length)
+    diff_down = np.zeros(length)
+    diff_up[1:] = high[1:] - high[:-1]
+    diff_down[1:] = low[:-1] - low[1:]
+    pos = np.where((diff_up > diff_down) & (diff_up > 0), diff_up, 0.0)
+    neg = np.where((diff_down > diff_up) & (diff_down > 0), diff_down, 0.0)
+
+    # Wilder sums of TR / +DM / -DM, all smoothed together from bar `window`
+    stacked = np.column_stack((tr, pos, neg))
+    del diff_up, diff_down, pos, neg
+    seed = stacked[1:window + 1].sum(axis=0)
+    sums = linear_recurrence(stacked[window:], 1 - 1.0 / window, 1.0, 0, seed)
+    del stacked
+    tr_sum, pos_sum, neg_sum = sums[:, 0], sums[:, 1], sums[:, 2]
+
+    nonzero = tr_sum != 0
+    di_pos = np.where(nonzero, 100 * (pos_sum / np.where(nonzero, tr_sum, 1.0)), 0.0)
+    di_neg = np.where(nonzero, 100 * (neg_sum / np.where(nonzero, tr_sum, 1.0)), 0.0)
+    di_total = di_pos + di_neg
+    dx = np.where(di_total != 0, 100 * np.abs((di_pos - di_neg) / np.where(di_total != 0, di_total, 1.0)), 0.0)
+
+    adx_seed = dx[:window].mean()
+    adx_out[2 * window - 1:] = linear_recurrence(dx[window - 1:], (window - 1) / window, 1.0 / window, 0, adx_seed)
+
+    pos_out[window + 1:] = di_pos[1:]
+    neg_out[window + 1:] = di_neg[1:]
+    return adx_out, pos_out, neg_out
+
+
+def _pvt(close, volume):
+    """Cumulative price-volume trend; NaN on the first bar"""
+    out = np.full(len(close), np.nan)
+    if len(close) > 1:
+        out[1:] = np.cumsum((close[1:] - close[:-1]) / close[:-1] * volume[1:])
+    return out
+
+
+def _pivot_divergence(price, oscillator, window, lookback, lows):
+    """
+    Flag bars whose two latest confirmed swing pivots diverge
+
+    A pivot is the extreme of the `window` bars either side of it, so it
+    is only known `window` bars later; the flag holds from that bar until
+    the next pivot, for as long as the pivot is within `lookback` bars.
+    """
+    length = len(price)
+    flags = np.zeros(length, dtype=bool)
+    if length < 2 * window + 1:
+        return flags
+
+    pivots = pivot_positions(price, window, highs=not lows)
+    if len(pivots) < 2:
+        return flags
+
+    previous, latest = pivots[:-1], pivots[1:]
+    if lows:
+        diverges = (price[latest] < price[previous]) & (oscillator[latest] > oscillator[previous])
+    else:
+        diverges = (price[latest] > price[previous]) & (oscillator[latest] < oscillator[previous])
+
+    # index into `latest` of the newest pair confirmed at each bar
+    pair = np.full(length, -1)
+    pair[latest + window] = np.arange(len(latest))
+    pair = np.maximum.accumulate(pair)
+
+    bars = np.flatnonzero(pair >= 0)
+    current = pair[bars]
+    flags[bars] = diverges[current] & (bars - latest[current] <= lookback)
+    return flags
+
+
+def divergence(low, high, oscillator, lookback=14, pivot_window=0):
+    """
+    Price/oscillator divergence at every bar
+
+    pivot_window 0 compares each bar with the one `lookback` - 1 earlier
+    (the old tail(lookback) check). pivot_window N > 0 compares the last two
+    swing lows/highs with N bars on each side instead.
+
+    Returns:
+        float array: 1.0 bullish, -1.0 bearish (bullish wins ties), 0.0 none
+    """
+    low, high, oscillator = _as_array(low), _as_array(high), _as_array(oscillator)
+
+    if pivot_window > 0:
+        bullish = _pivot_divergence(low, oscillator, pivot_window, lookback, lows=True)
+        bearish = _pivot_divergence(high, oscillator, pivot_window, lookback, lows=False)
+    else:
+        reference = np.maximum(np.arange(len(low)) - (lookback - 1), 0)
+        bullish = (low < low[reference]) & (oscillator > oscillator[reference])
+        bearish = (high > high[reference]) & (oscillator < oscillator[reference])
+
+    return np.where(bullish, 1.0, np.where(bearish, -1.0, 0.0))
+
+
+INPUT_COLUMNS = ('High', 'Low', 'Close', 'Volume')
+
+# Every output column (and shared intermediate) as a node: (dependencies, kernel).
+# Names starting with '_' are intermediates that never reach the DataFrame.
+INDICATOR_GRAPH = {
+    '_TR': (('High', 'Low', 'Close'), lambda v: true_range(v['High'], v['Low'], v['Close'])),
+
+    'EMA_20': (('Close',), lambda v: ema(v['Close'], config.EMA_FAST)),
+    'EMA_50': (('Close',), lambda v: ema(v['Close'], config.EMA_SLOW)),
+
+    '_ADX': (('_TR', 'High', 'Low'), lambda v: adx(v['_TR'], v['High'], v['Low'], 14)),
+    'ADX': (('_ADX',), lambda v: v['_ADX'][0]),
+    'ADX_POS': (('_ADX',), lambda v: v['_ADX'][1]),
+    'ADX_NEG': (('_ADX',), lambda v: v['_ADX'][2]),
+
+    '_BB_std': (('Close',), lambda v: rolling_std(v['Close'], 20)),
+    'BB_middle': (('Close',), lambda v: rolling_mean(v['Close'], 20)),
+    'BB_upper': (('BB_middle', '_BB_std'), lambda v: v['BB_middle'] + 2 * v['_BB_std']),
+    'BB_lower': (('BB_middle', '_BB_std'), lambda v: v['BB_middle'] - 2 * v['_BB_std']),
+    'BB_width': (('BB_upper', 'BB_lower', 'BB_middle'),
+                 lambda v: ((v['BB_upper'] - v['BB_lower']) / v['BB_middle']) * 100),
+
+    'RSI': (('Close',), lambda v: rsi(v['Close'], config.RSI_PERIOD)),
+
+    '_Stoch_low': (('Low',), lambda v: rolling_min(v['Low'], config.STOCH_PERIOD)),
+    '_Stoch_high': (('High',), lambda v: rolling_max(v['High'], config.STOCH_PERIOD)),
+    'Stoch_K': (('Close', '_Stoch_low', '_Stoch_high'),
+                lambda v: 100 * (v['Close'] - v['_Stoch_low']) / (v['_Stoch_high'] - v['_Stoch_low'])),
+    'Stoch_D': (('Stoch_K',), lambda v: rolling_mean(v['Stoch_K'], config.STOCH_SMOOTH_K)),
+
+    'MACD': (('Close',), lambda v: ema(v['Close'], config.MACD_FAST) - ema(v['Close'], config.MACD_SLOW)),
+    'MACD_signal': (('MACD',), lambda v: ema(v['MACD'], config.MACD_SIGNAL)),
+    'MACD_diff': (('MACD', 'MACD_signal'), lambda v: v['MACD'] - v['MACD_signal']),
+
+    'ATR': (('_TR',), lambda v: atr(v['_TR'], config.ATR_PERIOD)),
+
+    'Volume_MA': (('Volume',), lambda v: rolling_mean(v['Volume'], 20)),
+    'Volume_Ratio': (('Volume', 'Volume_MA'), lambda v: v['Volume'] / v['Volume_MA']),
+    'PVT': (('Close', 'Volume'), lambda v: _pvt(v['Close'], v['Volume'])),
+
+    'RSI_div': (('Low', 'High', 'RSI'), lambda v: divergence(
+        v['Low'], v['High'], v['RSI'], config.DIVERGENCE_LOOKBACK, config.DIVERGENCE_PIVOT_WINDOW)),
+    'MACD_div': (('Low', 'High', 'MACD'), lambda v: divergence(
+        v['Low'], v['High'], v['MACD'], config.DIVERGENCE_LOOKBACK, config.DIVERGENCE_PIVOT_WINDOW)),
+}
+
+def _ema_decay(window):
+    return 1 - 2.0 / (window + 1)
+
+
+def _wilder_decay(window):
+    return 1 - 1.0 / window
+
+
+def _divergence_warmup():
+    window = config.DIVERGENCE_PIVOT_WINDOW
+    if window > 0:
+        # room for the two pivots the flag compares, the newest within lookback
+        return config.DIVERGENCE_LOOKBACK + 2 * (2 * window + 1), ()
+    return config.DIVERGENCE_LOOKBACK - 1, ()
+
+
+# Warm-up of every graph node, counted from the bar where all its
+# dependencies are usable: (bars until its first real value, decay factors
+# of the recursive smoothing stages whose seed still has to die out).
+WARMUP = {
+    '_TR': lambda: (0, ()),
+    'EMA_20': lambda: (config.EMA_FAST - 1, (_ema_decay(config.EMA_FAST),)),
+    'EMA_50': lambda: (config.EMA_SLOW - 1, (_ema_decay(config.EMA_SLOW),)),
+    '_ADX': lambda: (2 * 14 - 1, (_wilder_decay(14), _wilder_decay(14))),
+    'ADX': lambda: (0, ()),
+    'ADX_POS': lambda: (0, ()),
+    'ADX_NEG': lambda: (0, ()),
+    '_BB_std': lambda: (20 - 1, ()),
+    'BB_middle': lambda: (20 - 1, ()),
+    'BB_upper': lambda: (0, ()),
+    'BB_lower': lambda: (0, ()),
+    'BB_width': lambda: (0, ()),
+    'RSI': lambda: (config.RSI_PERIOD - 1, (_wilder_decay(config.RSI_PERIOD),)),
+    '_Stoch_low': lambda: (config.STOCH_PERIOD - 1, ()),
+    '_Stoch_high': lambda: (config.STOCH_PERIOD - 1, ()),
+    'Stoch_K': lambda: (0, ()),
+    'Stoch_D': lambda: (config.STOCH_SMOOTH_K - 1, ()),
+    'MACD': lambda: (config.MACD_SLOW - 1, (_ema_decay(max(config.MACD_FAST, config.MACD_SLOW)),)),
+    'MACD_signal': lambda: (config.MACD_SIGNAL - 1, (_ema_decay(config.MACD_SIGNAL),)),
+    'MACD_diff': lambda: (0, ()),
+    'ATR': lambda: (config.ATR_PERIOD - 1, (_wilder_decay(config.ATR_PERIOD),)),
+    'Volume_MA': lambda: (20 - 1, ()),
+    'Volume_Ratio': lambda: (0, ()),
+    'PVT': lambda: (1, ()),
+    'RSI_div': _divergence_warmup,
+    'MACD_div': _divergence_warmup,
+}
+
+
+# Public columns in calculate_all order
+INDICATOR_COLUMNS = [
+    'EMA_20', 'EMA_50',
+    'ADX', 'ADX_POS', 'ADX_NEG',
+    'BB_upper', 'BB_middle', 'BB_lower', 'BB_width',
+    'RSI',
+    'Stoch_K', 'Stoch_D',
+    'MACD', 'MACD_signal', 'MACD_diff',
+    'ATR',
+    'Volume_MA', 'Volume_Ratio', 'PVT',
+    'RSI_div', 'MACD_div'
+]
+
+
+def resolve(columns):
+    """
+    Order the graph nodes needed for `columns`, dependencies first
+
+    Raises:
+        KeyError: for a column the graph does not know
+    """
+    order = []
+
+    def visit(name):
+        if name in INPUT_COLUMNS or name in order:
+            return
+        if name not in INDICATOR_GRAPH:
+            raise KeyError(f"Unknown indicator column: {name}")
+        for dependency in INDICATOR_GRAPH[name][0]:
+            visit(dependency)
+        order.append(name)
+
+    for column in columns:
+        visit(column)
+    return order
+
+
+def convergence_bars(decay, tolerance):
+    """Bars until a seed error scaled by decay per bar falls below tolerance"""
+    if tolerance >= 1 or decay <= 0:
+        return 0
+    return int(math.ceil(math.log(tolerance) / math.log(decay)))
+
+
+def warmup_bars(columns=None, tolerance=None):
+    """
+    Leading bars to discard before `columns` are valid and converged
+
+    Fixed windows count until their first value; EMA / Wilder stages add
+    the bars their seed needs to decay below `tolerance` (default
+    config.INDICATOR_CONVERGENCE_TOLERANCE). Chained stages add up along
+    the dependency graph, e.g. MACD_signal waits for MACD first. PVT is a
+    running sum, so only its first bar is counted.
+
+    Raises:
+        KeyError: for a column the graph does not know
+    """
+    tolerance = config.INDICATOR_CONVERGENCE_TOLERANCE if tolerance is None else tolerance
+    wanted = INDICATOR_COLUMNS if columns is None else list(columns)
+
+    start = dict.fromkeys(INPUT_COLUMNS, 0)
+    for name in resolve(wanted):
+        lookback, decays = WARMUP[name]()
+        ready = max(start[dependency] for dependency in INDICATOR_GRAPH[name][0])
+        start[name] = ready + lookback + sum(convergence_bars(decay, tolerance) for decay in decays)
+
+    return max((start[name] for name in wanted), default=0)
+
+
+def compute(high, low, close, volume, columns=None, out=None):
+    """
+    Compute only the requested indicator columns (and what they depend on)
+
+    Args:
+        high, low, close, volume: Price/volume arrays or Series
+        columns: Iterable of output column names; None means all of them
+        out: Optional dict of column name -> preallocated float64 array
+             (e.g. rows of a column block). Outputs are written there, and
+             intermediates are released as soon as nothing else reads them.
+
+    Returns:
+        dict of column name -> ndarray, in calculate_all column order
+    """
+    wanted = INDICATOR_COLUMNS if columns is None else list(columns)
+    order = resolve(wanted)
+    values = {
+        'High': _as_array(high),
+        'Low': _as_array(low),
+        'Close': _as_array(close),
+        'Volume': _as_array(volume)
+    }
+
+    # position of the last node reading each intermediate
+    last_use = {}
+    for position, name in enumerate(order):
+        for dependency in INDICATOR_GRAPH[name][0]:
+            last_use[dependency] = position
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for position, name in enumerate(order):
+            dependencies, build = INDICATOR_GRAPH[name]
+            result = build(values)
+            if out is not None and name in out:
+                out[name][:] = result
+                result = out[name]
+            values[name] = result
+
+            for dependency in dependencies:
+                if dependency.startswith('_') and last_use[dependency] == position:
+                    del values[dependency]
+
+    return {name: values[name] for name in INDICATOR_COLUMNS if name in wanted}
+
+
+def compute_all(high, low, close, volume):
+    """
+    Compute every calculate_all column in one pass over float64 arrays
+
+    True range is built once and shared by ATR and ADX; the EMA, RSI and
+    Wilder recurrences run as blocked NumPy scans.
+
+    Returns:
+        dict of column name -> ndarray, in calculate_all column order
+    """
+    return compute(high, low, close, volume)
+
+
+# ---------------------------------------------------------------------------
+# Parameter grids: one indicator at many periods in a single pass.
+# Each returns a (time x period) array whose column j matches the
+# single-period kernel above at periods[j].
+# ---------------------------------------------------------------------------
+
+def _periods(periods):
+    periods = np.asarray(list(periods), dtype=np.int64)
+    if periods.ndim != 1 or len(periods) == 0 or periods.min() < 1:
+        raise ValueError("periods must be a non-empty list of positive integers")
+    return periods
+
+
+def ema_grid(values, periods):
+    """EMA of one series for every period; columns follow `periods`"""
+    x = _as_array(values)
+    periods = _periods(periods)
+    valid = np.flatnonzero(~np.isnan(x))
+    if len(valid) == 0:
+        return np.full((len(x), len(periods)), np.nan)
+
+    first = valid[0]
+    alpha = 2.0 / (periods + 1)
+    out = linear_recurrence(np.repeat(x[:, None], len(periods), axis=1), 1 - alpha, alpha, first, x[first])
+    out[np.arange(len(x))[:, None] < first + periods - 1] = np.nan
+    return out
+
+
+def rsi_grid(close, periods):
+    """Wilder RSI for every period; up/down averages run as one 2-D scan"""
+    close = _as_array(close)
+    periods = _periods(periods)
+    count = len(periods)
+
+    diff = np.empty_like(close)
+    diff[0] = 0.0
+    diff[1:] = close[1:] - close[:-1]
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+
+    alpha = np.tile(1.0 / periods, 2)
+    x = np.hstack((np.repeat(up[:, None], count, axis=1), np.repeat(down[:, None], count, axis=1)))
+    seed = np.r_[np.full(count, up[0]), np.full(count, down[0])]
+    averages = linear_recurrence(x, 1 - alpha, alpha, 0, seed)
+    del x
+
+    averages[np.arange(len(close))[:, None] < np.tile(periods, 2) - 1] = np.nan
+    avg_up, avg_down = averages[:, :count], averages[:, count:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(avg_down == 0, 100.0, 100 - (100 / (1 + avg_up / avg_down)))
+
+
+def atr_grid(high, low, close, periods):
+    """
+    Wilder ATR for every period
+
+    Each column has its own seed bar, so the seed is injected as an input
+    pulse at that bar and a single scan from bar 0 serves all periods.
+    """
+    tr = true_range(_as_array(high), _as_array(low), _as_array(close))
+    periods = _periods(periods)
+    length = len(tr)
+    out = np.zeros((length, len(periods)))
+
+    fits = periods <= length
+    if not fits.any():
+        return out
+
+    windows = periods[fits]
+    gain = 1.0 / windows
+    seed = np.cumsum(tr)[windows - 1] / windows
+
+    before_seed = np.arange(length)[:, None] < windows - 1
+    x = np.repeat(tr[:, None], len(windows), axis=1)
+    x[before_seed] = 0.0
+    x[windows - 1, np.arange(len(windows))] = seed / gain
+
+    smoothed = linear_recurrence(x, 1 - gain, gain, 0, np.where(windows == 1, seed, 0.0))
+    smoothed[before_seed] = 0.0
+    out[:, fits] = smoothed
+    return out
+
+
+def _rolling_extreme_grid(values, periods, reduce):
+    """
+    Trailing min/max for every period in one sweep over window sizes
+
+    Growing the window by one bar is a single element-wise reduce, so all
+    periods together cost the same as the largest one alone.
+    """
+    x = _as_array(values)
+    periods = _periods(periods)
+    length = len(x)
+    # filled period-major so each copy is contiguous; returned transposed
+    out = np.full((len(periods), length), np.nan)
+
+    current = x.copy()
+    for size in range(1, min(int(periods.max()), length) + 1):
+        if size > 1:
+            reduce(current[size - 1:], x[:length - size + 1], out=current[size - 1:])
+        out[periods == size, size - 1:] = current[size - 1:]
+    return out.T
+
+
+def rolling_min_grid(values, periods):
+    return _rolling_extreme_grid(values, periods, np.minimum)
+
+
+def rolling_max_grid(values, periods):
+    return _rolling_extreme_grid(values, periods, np.maximum)
+
+
+def stoch_grid(high, low, close, periods, smooth_window=None):
+    """
+    Stochastic %K and %D for every lookback period
+
+    Returns: (stoch_k, stoch_d), each (time x period)
+    """
+    smooth_window = smooth_window or config.STOCH_SMOOTH_K
+    close = _as_array(close)
+    lowest = rolling_min_grid(low, periods)
+    highest = rolling_max_grid(high, periods)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stoch_k = 100 * (close[:, None] - lowest) / (highest - lowest)
+
+    # %D as a sum of shifted slices; a strided window view is far slower on 2-D
+    length = len(close)
+    stoch_d = np.full_like(stoch_k, np.nan)
+    if length >= smooth_window:
+        total = stoch_k[:length - smooth_window + 1].copy()
+        for offset in range(1, smooth_window):
+            total += stoch_k[offset:length - smooth_window + 1 + offset]
+        stoch_d[smooth_window - 1:] = total / smooth_window
+    return stoch_k, stoch_d
+
+
+def compute_grid(high, low, close, periods):
+    """
+    Indicator grids for a parameter sweep, one pass per indicator
+
+    Args:
+        high, low, close: Price arrays or Series
+        periods: dict of indicator -> list of periods, using any of
+                 'EMA' (covers EMA_FAST/EMA_SLOW), 'RSI', 'Stoch', 'ATR'
+
+    Returns:
+        dict of column name -> (time x period) ndarray; 'Stoch' yields
+        'Stoch_K' and 'Stoch_D'
+
+    Example:
+        grids = compute_grid(df['High'], df['Low'], df['Close'],
+                             {'RSI': range(7, 22), 'EMA': range(10, 60)})
+        grids['RSI'][:, 7]   # RSI with period 14
+    """
+    unknown = set(periods) - {'EMA', 'RSI', 'Stoch', 'ATR'}
+    if unknown:
+        raise KeyError(f"No grid for: {', '.join(sorted(unknown))}")
+
+    grids = {}
+    if 'EMA' in periods:
+        grids['EMA'] = ema_grid(close, periods['EMA'])
+    if 'RSI' in periods:
+        grids['RSI'] = rsi_grid(close, periods['RSI'])
+    if 'Stoch' in periods:
+        grids['Stoch_K'], grids['Stoch_D'] = stoch_grid(high, low, close, periods['Stoch'])
+    if 'ATR' in periods:
+        grids['ATR'] = atr_grid(high, low, close, periods['ATR'])
+    return grids
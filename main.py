@@ -3,11 +3,12 @@ Nixie's Gold Bot - Main Execution Script
 This brings everything together!
 """
 
-import schedule
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import sys
 import logging
+import pandas as pd
 from colorama import Fore, Style, init
 
 import sys
@@ -26,7 +27,10 @@ init(autoreset=True)
 import config
 from data.data_handler import DataHandler
 from data.market_hours import MarketHours
+from data.metadata_cache import metadata
+from data.tick_recorder import TickRecorder
 from indicators.technical import TechnicalIndicators
+from indicators.level_tracker import StructuralLevelTracker
 from strategy.signal_generator import SignalGenerator
 from execution.telegram_bot import TelegramNotifier, send_text_sync
 from execution.telegram_multi_user import MultiUserTelegramBot, send_signal_to_all
@@ -44,6 +48,65 @@ logging.basicConfig(
     ]
 )
 
+class SymbolScanner:
+    """Scan state of one symbol: its data handler, level tracker and signal counters"""
+    
+    def __init__(self, handler, h4_history):
+        """
+        Args:
+            handler: Connected DataHandler of the symbol
+            h4_history: H4 bars the key levels cover
+        
+        Raises:
+            RuntimeError: When the source has no contract specification for
+                          the symbol (pips and lots would be guesses)
+        """
+        self.symbol = handler.symbol
+        self.handler = handler
+        symbol_info = handler.get_symbol_info()
+        if symbol_info is None:
+            raise RuntimeError(f"No contract specification for {self.symbol}")
+        # Own generator: its level and calendar caches, pip size and pip value are per symbol
+        self.signal_generator = SignalGenerator(symbol_info)
+        # Key levels kept current from closed H4 bars between scans
+        self.level_tracker = StructuralLevelTracker(history=h4_history,
+                                                    structural=self.signal_generator.structural)
+        self.signals_today = 0
+        self.signal_day = None
+        self.last_signal_time = None
+    
+    def daily_limit_reached(self, now=None):
+        """True once MAX_SIGNALS_PER_DAY signals went out today (the count restarts each day)"""
+        today = (now or datetime.now()).date()
+        if today != self.signal_day:
+            self.signal_day = today
+            self.signals_today = 0
+        return bool(config.MAX_SIGNALS_PER_DAY) and self.signals_today >= config.MAX_SIGNALS_PER_DAY
+    
+    def record_signal(self, now=None):
+        """Count a sent signal towards today's limit and start the cooldown"""
+        now = now or datetime.now()
+        self.daily_limit_reached(now)  # a new day starts from zero
+        self.signals_today += 1
+        self.last_signal_time = now
+    
+    def cooling_down(self, now=None):
+        """True while the last signal is within SIGNAL_COOLDOWN_MINUTES"""
+        if not config.SIGNAL_COOLDOWN_MINUTES or self.last_signal_time is None:
+            return False
+        now = now or datetime.now()
+        return now - self.last_signal_time < timedelta(minutes=config.SIGNAL_COOLDOWN_MINUTES)
+    
+    def update_levels(self, df_h4):
+        """Feed newly closed H4 bars to the level tracker (reseeds after a gap)"""
+        closed = df_h4.iloc[:-1]  # last bar is still forming
+        if self.level_tracker.last_timestamp in closed.index:
+            self.level_tracker.extend(closed)
+        else:
+            self.level_tracker.seed(closed)
+        return self.level_tracker.level_index()
+
+
 class NixieGoldBot:
     def __init__(self):
         self.handler = DataHandler()
@@ -56,6 +119,20 @@ class NixieGoldBot:
         self.trade_logger = TradeLogger()
         self.live_trader = LiveTrader()
         
+        # Only the indicator columns the strategy and ML filter read get computed
+        self.h4_columns = sorted(set(SignalGenerator.H4_COLUMNS) | set(MLSignalFilter.H4_COLUMNS))
+        self.m15_columns = sorted(set(SignalGenerator.M15_COLUMNS) | set(MLSignalFilter.M15_COLUMNS))
+        # Warmed-up rows read per timeframe; fetch sizes add the indicator warm-up
+        self.h4_history = max(self.signal_generator.history_bars('H4'), MLSignalFilter.HISTORY_BARS['H4'])
+        self.m15_history = max(self.signal_generator.history_bars('M15'), MLSignalFilter.HISTORY_BARS['M15'])
+        # One scanner per configured symbol, built once connected
+        self.scanners = {}
+        # Background tick capture (TICK_RECORDER_ENABLED), started once connected
+        self.tick_recorder = None
+        # Bounded pool: symbols are fetched and evaluated concurrently
+        self.scan_workers = max(1, min(config.SCAN_WORKERS, len(config.SYMBOLS)))
+        self.executor = ThreadPoolExecutor(max_workers=self.scan_workers, thread_name_prefix='scan')
+        
         self.signals_today = 0
         self.last_signal_time = None
         self.running = False
@@ -77,12 +154,25 @@ class NixieGoldBot:
                 print(Fore.RED + "[FAIL] Configuration validation failed!")
                 return False
             
-            # Connect to MT5
-            print(Fore.YELLOW + "[CONNECT] Connecting to MetaTrader 5...")
+            # Connect to the market-data source (MT5 unless MARKET_DATA_SOURCE says otherwise)
+            print(Fore.YELLOW + f"[CONNECT] Connecting to {self.handler.source.name} data source...")
             if not self.handler.connect_mt5():
-                print(Fore.RED + "[FAIL] Failed to connect to MT5")
+                print(Fore.RED + "[FAIL] Failed to connect to the data source")
                 return False
             
+            # Every symbol shares the connection just opened
+            self.scanners = {
+                symbol: SymbolScanner(self.handler if symbol == self.handler.symbol
+                                      else self.handler.for_symbol(symbol), self.h4_history)
+                for symbol in config.SYMBOLS
+            }
+            
+            # Keep symbol/account metadata warm off the signal-to-order path
+            metadata.start_refresher()
+            
+            if config.TICK_RECORDER_ENABLED:
+                self.tick_recorder = TickRecorder(self.handler.source, list(self.scanners)).start()
+            
             # Load ML model if available
             if config.USE_ML_FILTER:
                 print(Fore.YELLOW + "[BOT] Loading ML model...")
@@ -102,71 +192,125 @@ class NixieGoldBot:
             return False
     
     def scan_for_signals(self):
-        """Main scanning function - looks for trading opportunities"""
+        """Main scanning function - evaluates every symbol concurrently, then acts on the signals"""
         try:
             timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             print(Fore.CYAN + f"\n{'=' * 60}")
             print(Fore.CYAN + f" Scanning for signals at {timestamp}")
             print(Fore.CYAN + f"{'=' * 60}")
             
-            # Check if we should trade now
-            should_trade, reason = self.market_hours.should_trade_now()
+            # Session rules apply to the bar that just closed, as in backtests,
+            # so the bar closing at the end of a session is still evaluated
+            bar_open = self.market_hours.last_bar_open().tz_localize(None)
+            should_trade, reason = self.market_hours.should_trade_now(bar_open)
             if not should_trade:
                 print(Fore.YELLOW + f"  {reason}")
                 return
             
-            # Fetch market data
-            print(Fore.YELLOW + " Fetching market data...")
-            df_h4 = self.handler.get_gold_data('H4', 200)
-            df_m15 = self.handler.get_gold_data('M15', 500)
-            
-            if df_h4 is None or df_m15 is None:
-                print(Fore.RED + " Failed to fetch market data")
-                return
-            
-            # Calculate indicators
-            print(Fore.YELLOW + " Calculating technical indicators...")
-            df_h4 = self.technical.calculate_all(df_h4)
-            df_m15 = self.technical.calculate_all(df_m15)
-            
-            # Generate signal
-            print(Fore.YELLOW + " Analyzing market conditions...")
-            signal = self.signal_generator.generate_signal(df_h4, df_m15)
-            
-            if signal:
-                # Apply ML filter
-                if config.USE_ML_FILTER:
-                    print(Fore.YELLOW + "[BOT] Applying ML filter...")
-                    passes_ml, ml_confidence = self.ml_filter.should_take_signal(
-                        df_h4, df_m15, signal
-                    )
-                    
-                    if not passes_ml:
-                        print(Fore.RED + f"[FAIL] Signal rejected by ML filter (confidence: {ml_confidence:.2%})")
-                        return
-                    
-                    # Update signal with ML confidence
-                    signal['ml_confidence'] = round(ml_confidence * 100, 1)
-                
-                # Signal approved! Send to Telegram
-                self._process_signal(signal, df_h4, df_m15)
-            else:
-                print(Fore.BLUE + "  No trading signal at this time")
-                print(Fore.BLUE + "   Waiting for next scan...")
+            scanners = []
+            for scanner in self.scanners.values():
+                if scanner.daily_limit_reached():
+                    print(Fore.BLUE + f"  [{scanner.symbol}] Daily limit of {config.MAX_SIGNALS_PER_DAY} signal(s) reached")
+                elif scanner.cooling_down():
+                    print(Fore.BLUE + f"  [{scanner.symbol}] Cooling down after the last signal")
+                else:
+                    scanners.append(scanner)
+            
+            # Fetch, indicators, signal and ML filter run in the pool; sending
+            # and trading stay on this thread, one signal at a time
+            started = time.monotonic()
+            futures = [self.executor.submit(self._evaluate_symbol, scanner, bar_open) for scanner in scanners]
+            results = []
+            for scanner, future in zip(scanners, futures):
+                try:
+                    results.append((scanner, future.result()))
+                except Exception as e:
+                    self._report_error(f"Error scanning {scanner.symbol}: {e}")
+            print(Fore.CYAN + f" Scanned {len(scanners)} symbol(s) in {time.monotonic() - started:.2f}s")
+            
+            for scanner, result in results:
+                if result is not None:
+                    self._process_signal(scanner, *result)
             
         except Exception as e:
-            error_msg = f"Error in scan_for_signals: {e}"
-            print(Fore.RED + f"[FAIL] {error_msg}")
-            logging.error(error_msg)
-            
-            # Send error to Telegram
-            try:
-                import asyncio
-                asyncio.run(self.telegram.send_error(error_msg))
-            except:
-                pass
+            self._report_error(f"Error in scan_for_signals: {e}")
+    
+    def _report_error(self, error_msg):
+        """Print, log and send a scan error to Telegram"""
+        print(Fore.RED + f"[FAIL] {error_msg}")
+        logging.error(error_msg)
+        
+        # Send error to Telegram
+        try:
+            import asyncio
+            asyncio.run(self.telegram.send_error(error_msg))
+        except:
+            pass
+    
+    def _evaluate_symbol(self, scanner, bar_open=None):
+        """
+        Fetch and analyze one symbol (runs in the scan pool)
+        
+        Args:
+            scanner: The symbol's SymbolScanner
+            bar_open: Open time (naive GMT) of the bar being evaluated,
+                      for the session check
+        
+        Returns:
+            (signal, df_h4, df_m15) for an approved signal, else None
+        """
+        symbol = scanner.symbol
+        handler = scanner.handler
+        
+        # Fetch market data
+        print(Fore.YELLOW + f" [{symbol}] Fetching market data...")
+        # One snapshot: H4 is resampled from the same M15 fetch
+        frames = handler.get_frames({
+            'H4': dict(columns=self.h4_columns, history=self.h4_history),
+            'M15': dict(columns=self.m15_columns, history=self.m15_history)
+        })
+        df_h4, df_m15 = frames['H4'], frames['M15']
+        
+        if df_h4 is None or df_m15 is None:
+            print(Fore.RED + f" [{symbol}] Failed to fetch market data")
+            return None
+        
+        # No M15 bar closed since the last scan: everything below would come out the same
+        if handler.new_bars.get('M15') == 0:
+            print(Fore.BLUE + f"  [{symbol}] No new M15 bar since the last scan")
+            return None
+        
+        levels = scanner.update_levels(df_h4)
+        
+        # Calculate indicators
+        df_h4 = self.technical.calculate_all(df_h4, self.h4_columns)
+        df_m15 = self.technical.calculate_all(df_m15, self.m15_columns)
+        
+        # Generate signal
+        signal = scanner.signal_generator.generate_signal(df_h4, df_m15, bar_open, levels=levels)
+        
+        if not signal:
+            print(Fore.BLUE + f"  [{symbol}] No trading signal at this time")
+            return None
+        
+        signal['symbol'] = symbol
+        
+        # Apply ML filter
+        if config.USE_ML_FILTER:
+            passes_ml, ml_confidence = self.ml_filter.should_take_signal(
+                df_h4, df_m15, signal
+            )
+            
+            if not passes_ml:
+                print(Fore.RED + f"[FAIL] [{symbol}] Signal rejected by ML filter (confidence: {ml_confidence:.2%})")
+                return None
+            
+            # Update signal with ML confidence
+            signal['ml_confidence'] = round(ml_confidence * 100, 1)
+        
+        return signal, df_h4, df_m15
     
-    def _process_signal(self, signal, df_h4, df_m15):
+    def _process_signal(self, scanner, signal, df_h4, df_m15):
         """Process and send approved signal"""
         try:
             print(Fore.GREEN + "\n" + "=" * 60)
@@ -174,6 +318,7 @@ class NixieGoldBot:
             print(Fore.GREEN + "=" * 60)
             
             # Display signal details
+            print(Fore.WHITE + f"\nSymbol: {scanner.symbol}")
             print(Fore.WHITE + f"\nDirection: {Fore.GREEN if signal['signal'] == 'LONG' else Fore.RED}{signal['signal']}")
             print(Fore.WHITE + f"Entry: ${signal['entry_price']:.2f}")
             print(Fore.WHITE + f"Stop Loss: ${signal['stop_loss']:.2f}")
@@ -200,6 +345,7 @@ class NixieGoldBot:
                     print(Fore.GREEN + f" Signal sent to {success} subscriber(s)!")
                     self.signals_today += 1
                     self.last_signal_time = datetime.now()
+                    scanner.record_signal(self.last_signal_time)
                     
                     # Auto-execute trade if enabled
                     if self.auto_trade_enabled:
@@ -215,7 +361,7 @@ class NixieGoldBot:
                 print(Fore.YELLOW + "   Set ENVIRONMENT=production in .env to enable live signals")
             
             # Log signal
-            logging.info(f"Signal generated: {signal['signal']} at {signal['entry_price']}")
+            logging.info(f"Signal generated: {scanner.symbol} {signal['signal']} at {signal['entry_price']}")
             
         except Exception as e:
             print(Fore.RED + f" Error processing signal: {e}")
@@ -231,13 +377,11 @@ class NixieGoldBot:
             
             self.running = True
             
-            # Schedule scanning
-            schedule.every(config.SCAN_INTERVAL_MINUTES).minutes.do(self.scan_for_signals)
-            
             print(Fore.GREEN + f"\n Bot is now running!")
-            print(Fore.CYAN + f" Scanning every {config.SCAN_INTERVAL_MINUTES} minutes")
+            print(Fore.CYAN + f" Scanning {config.SCAN_SETTLE_SECONDS}s after each "
+                              f"{config.SCAN_INTERVAL_MINUTES}-minute bar close in trading sessions")
             print(Fore.CYAN + f" Risk per trade: {config.RISK_PERCENT}%")
-            print(Fore.CYAN + f" Symbol: {config.SYMBOL}")
+            print(Fore.CYAN + f" Symbols: {', '.join(self.scanners)} ({self.scan_workers} scan workers)")
             print(Fore.CYAN + f" ML Filter: {'Enabled' if config.USE_ML_FILTER else 'Disabled'}")
             
             if config.DRY_RUN:
@@ -250,10 +394,13 @@ class NixieGoldBot:
             # Run first scan immediately
             self.scan_for_signals()
             
-            # Main loop
+            # Main loop: sleep until the next bar close inside a trading window
             while self.running:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
+                next_scan = self.market_hours.next_scan_time()
+                print(Fore.CYAN + f" Next scan at {next_scan:%Y-%m-%d %H:%M:%S} GMT")
+                self._sleep_until(next_scan)
+                if self.running:
+                    self.scan_for_signals()
             
         except KeyboardInterrupt:
             print(Fore.YELLOW + "\n\n  Bot stopped by user")
@@ -263,12 +410,25 @@ class NixieGoldBot:
             logging.error(f"Fatal error: {e}")
             self.shutdown()
     
+    def _sleep_until(self, moment):
+        """Sleep until a tz-aware moment, re-checking the clock after each wake-up"""
+        while self.running:
+            remaining = (moment - pd.Timestamp.now(tz='UTC')).total_seconds()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+    
     def shutdown(self):
         """Clean shutdown"""
         try:
             print(Fore.YELLOW + "\n[SHUTDOWN] Shutting down...")
             
             # Disconnect from MT5
+            metadata.stop_refresher()
+            if self.tick_recorder is not None:
+                self.tick_recorder.stop()
+            self.executor.shutdown(wait=True)
+            # also unregisters every scanner's symbol from the metadata cache
             self.handler.disconnect_mt5()
             
             # Send shutdown message
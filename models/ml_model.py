@@ -11,8 +11,16 @@ import xgboost as xgb
 import pickle
 import os
 import config
+from data.bar_series import BarSeries
 
 class MLSignalFilter:
+    # Indicator columns extract_features reads from each timeframe
+    H4_COLUMNS = ('RSI', 'ADX', 'MACD', 'MACD_diff', 'ATR', 'Volume_Ratio',
+                  'EMA_20', 'EMA_50', 'BB_upper', 'BB_lower')
+    M15_COLUMNS = ('RSI', 'Stoch_K', 'Stoch_D', 'MACD_diff', 'Volume_Ratio', 'ATR')
+    # Rows of history extract_features reads (M15 momentum looks 5 bars back)
+    HISTORY_BARS = {'H4': 1, 'M15': 6}
+    
     def __init__(self):
         self.model = None
         self.feature_names = []
@@ -25,34 +33,36 @@ class MLSignalFilter:
         Returns: Feature vector (numpy array)
         """
         try:
+            df_h4 = BarSeries.wrap(df_h4)
+            df_m15 = BarSeries.wrap(df_m15)
             features = []
             
-            features.append(df_h4['RSI'].iloc[-1])
-            features.append(df_h4['ADX'].iloc[-1])
-            features.append(df_h4['MACD'].iloc[-1])
-            features.append(df_h4['MACD_diff'].iloc[-1])
-            features.append(df_h4['ATR'].iloc[-1])
-            features.append(df_h4['Volume_Ratio'].iloc[-1])
+            features.append(df_h4.last('RSI'))
+            features.append(df_h4.last('ADX'))
+            features.append(df_h4.last('MACD'))
+            features.append(df_h4.last('MACD_diff'))
+            features.append(df_h4.last('ATR'))
+            features.append(df_h4.last('Volume_Ratio'))
             
-            features.append(1 if df_h4['EMA_20'].iloc[-1] > df_h4['EMA_50'].iloc[-1] else 0)
+            features.append(1 if df_h4.last('EMA_20') > df_h4.last('EMA_50') else 0)
             
-            bb_position = (df_h4['Close'].iloc[-1] - df_h4['BB_lower'].iloc[-1]) / \
-                         (df_h4['BB_upper'].iloc[-1] - df_h4['BB_lower'].iloc[-1])
+            bb_position = (df_h4.last('Close') - df_h4.last('BB_lower')) / \
+                         (df_h4.last('BB_upper') - df_h4.last('BB_lower'))
             features.append(bb_position)
             
-            features.append(df_m15['RSI'].iloc[-1])
-            features.append(df_m15['Stoch_K'].iloc[-1])
-            features.append(df_m15['Stoch_D'].iloc[-1])
-            features.append(df_m15['MACD_diff'].iloc[-1])
-            features.append(df_m15['Volume_Ratio'].iloc[-1])
+            features.append(df_m15.last('RSI'))
+            features.append(df_m15.last('Stoch_K'))
+            features.append(df_m15.last('Stoch_D'))
+            features.append(df_m15.last('MACD_diff'))
+            features.append(df_m15.last('Volume_Ratio'))
             
-            stoch_cross = 1 if df_m15['Stoch_K'].iloc[-1] > df_m15['Stoch_D'].iloc[-1] else 0
+            stoch_cross = 1 if df_m15.last('Stoch_K') > df_m15.last('Stoch_D') else 0
             features.append(stoch_cross)
             
-            price_momentum = (df_m15['Close'].iloc[-1] - df_m15['Close'].iloc[-6]) / df_m15['Close'].iloc[-6]
+            price_momentum = (df_m15.last('Close') - df_m15.value('Close', -6)) / df_m15.value('Close', -6)
             features.append(price_momentum)
             
-            volatility_pct = df_m15['ATR'].iloc[-1] / df_m15['Close'].iloc[-1]
+            volatility_pct = df_m15.last('ATR') / df_m15.last('Close')
             features.append(volatility_pct)
             
             if signal_data:
@@ -231,8 +241,8 @@ class MLSignalFilter:
             
             from indicators.technical import TechnicalIndicators
             tech = TechnicalIndicators()
-            df_h4 = tech.calculate_all(df_h4)
-            df_m15 = tech.calculate_all(df_m15)
+            df_h4 = tech.calculate_all(df_h4, self.H4_COLUMNS)
+            df_m15 = tech.calculate_all(df_m15, self.M15_COLUMNS)
             
             features = self.extract_features(df_h4, df_m15)
             if features is not None:
@@ -47,6 +47,32 @@ MACD_FAST = 12
 MACD_SLOW = 26
 MACD_SIGNAL = 9
 ATR_PERIOD = 14
+# Divergence: bars back to compare; pivot window 0 = compare the bar
+# DIVERGENCE_LOOKBACK-1 back, N = last two swing pivots with N bars each side
+DIVERGENCE_LOOKBACK = 14
+DIVERGENCE_PIVOT_WINDOW = int(os.getenv('DIVERGENCE_PIVOT_WINDOW', 0))
+# Swing levels: 0 = highest high/lowest low of the lookback, N = newest
+# fractal pivot with N bars each side (the range if none in the lookback)
+SWING_PIVOT_ORDER = int(os.getenv('SWING_PIVOT_ORDER', 0))
+# Extra swing levels (swing_high_N / swing_low_N): the newest fractal pivot
+# of each order N within the swing lookback, all orders from one tracker
+SWING_PIVOT_ORDERS = [int(order) for order in os.getenv('SWING_PIVOT_ORDERS', '3,5,10').split(',') if order.strip()]
+
+# 'numpy' = fused vectorized kernel, 'ta' = original ta-library classes
+INDICATOR_BACKEND = os.getenv('INDICATOR_BACKEND', 'numpy')
+# Byte budget of the shared calculate_all result cache
+INDICATOR_CACHE_MB = int(os.getenv('INDICATOR_CACHE_MB', 64))
+# A bar counts as warmed up once EMA/Wilder seeds have decayed below this
+# fraction of their starting error (sizes history fetches and buffers)
+INDICATOR_CONVERGENCE_TOLERANCE = float(os.getenv('INDICATOR_CONVERGENCE_TOLERANCE', 1e-3))
+
+# On-disk OHLCV history (symbol/timeframe/month .npy files); empty = off.
+# The signal processor warms its buffers up from it and archives closed bars
+HISTORY_STORE_DIR = os.getenv('HISTORY_STORE_DIR', '')
+
+# Recorded MT5 ticks (symbol/day .npz chunks, see TickArchive); empty = off.
+# Tick ingestion replays them instead of polling Alpha Vantage when set
+TICK_ARCHIVE_DIR = os.getenv('TICK_ARCHIVE_DIR', '')
 
 # --- Risk ---
 MIN_RISK_REWARD = 1.5
@@ -63,10 +89,17 @@ LONDON_OPEN = 8
 LONDON_CLOSE = 16
 NY_OPEN = 13
 NY_CLOSE = 21
+# Trading calendar (GMT dates, comma-separated YYYY-MM-DD): holidays are
+# closed all day, half days stop taking trades from HALF_DAY_CLOSE
+MARKET_HOLIDAYS = [day.strip() for day in os.getenv('MARKET_HOLIDAYS', '').split(',') if day.strip()]
+MARKET_HALF_DAYS = [day.strip() for day in os.getenv('MARKET_HALF_DAYS', '').split(',') if day.strip()]
+HALF_DAY_CLOSE = int(os.getenv('HALF_DAY_CLOSE', 17))
 
 # --- Timeframes ---
 TIMEFRAME_H4 = 'H4'
 TIMEFRAME_M15 = 'M15'
+# Bar length in minutes per timeframe name
+TIMEFRAME_MINUTES = {'M1': 1, 'M5': 5, 'M15': 15, 'M30': 30, 'H1': 60, 'H4': 240, 'D1': 1440}
 
 # --- Signal processor ---
 MIN_H4_BARS = 100   # minimum H4 bars before generating signals
@@ -0,0 +1,140 @@
+"""
+BarSeries: struct-of-arrays bar container with zero-copy slicing views.
+"""
+import numpy as np
+import pandas as pd
+
+
+class BarSeries:
+    """
+    Struct-of-arrays bar container: one NumPy array per column
+
+    A cheap stand-in for the OHLCV/indicator DataFrames in hot paths.
+    Slicing only moves the start/stop bounds over the shared arrays, so
+    bars[:i + 1] is a view that costs the same at any length, and
+    bars.last('RSI') is a plain array lookup. The arrays are shared with
+    the DataFrame they came from; treat them as read-only.
+    """
+    __slots__ = ('_index', '_times', '_columns', '_start', '_stop', 'attrs')
+
+    def __init__(self, index, columns, attrs=None, start=0, stop=None):
+        """
+        Args:
+            index: pandas DatetimeIndex (or anything pd.Index accepts)
+            columns: dict of column name -> 1-D array, same length as index
+            attrs: Optional metadata (symbol, timeframe, ...)
+        """
+        self._index = index if isinstance(index, pd.Index) else pd.Index(index)
+        times = self._index
+        if getattr(times, 'tz', None) is not None:
+            times = times.tz_convert('UTC').tz_localize(None)
+        self._times = times.to_numpy()  # naive (UTC) datetime64 for bisecting
+        self._columns = {name: np.asarray(values) for name, values in columns.items()}
+        self._start = start
+        self._stop = len(self._index) if stop is None else stop
+        self.attrs = dict(attrs or {})
+
+    @classmethod
+    def from_frame(cls, df):
+        """Wrap a DataFrame's columns without copying them"""
+        columns = {name: df[name].to_numpy() for name in df.columns}
+        return cls(df.index, columns, df.attrs)
+
+    @classmethod
+    def wrap(cls, data):
+        """Return data if it already is a BarSeries, else wrap the DataFrame"""
+        return data if isinstance(data, cls) else cls.from_frame(data)
+
+    def to_frame(self, columns=None):
+        """DataFrame of the current view, optionally only some columns (copies the data)"""
+        names = self._columns if columns is None else columns
+        df = pd.DataFrame(
+            {name: self._columns[name][self._start:self._stop] for name in names},
+            index=self._index[self._start:self._stop]
+        )
+        df.attrs = dict(self.attrs)
+        return df
+
+    def _view(self, start, stop):
+        view = object.__new__(BarSeries)
+        view._index = self._index
+        view._times = self._times
+        view._columns = self._columns
+        view._start = start
+        view._stop = stop
+        view.attrs = self.attrs
+        return view
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    def __getitem__(self, key):
+        """Column name -> array view; slice -> BarSeries view"""
+        if isinstance(key, str):
+            return self._columns[key][self._start:self._stop]
+
+        if isinstance(key, slice):
+            positions = range(self._start, self._stop)[key]
+            if positions.step == 1:
+                return self._view(positions.start, max(positions.start, positions.stop))
+            picked = np.asarray(positions, dtype=np.intp)
+            return BarSeries(self._index[picked],
+                             {name: values[picked] for name, values in self._columns.items()},
+                             self.attrs)
+
+        raise TypeError(f"BarSeries indices must be column names or slices, not {type(key).__name__}")
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    @property
+    def index(self):
+        return self._index[self._start:self._stop]
+
+    def last(self, name):
+        """Value of column `name` on the newest bar"""
+        if self._stop == self._start:
+            raise IndexError("last() on an empty BarSeries")
+        return self._columns[name][self._stop - 1]
+
+    def value(self, name, position):
+        """Value of column `name` at a position (negative counts from the end)"""
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError(f"position out of range for {len(self)} bars")
+        return self._columns[name][self._start + position]
+
+    def timestamp(self, position=-1):
+        """Bar time at a position (negative counts from the end)"""
+        if position < 0:
+            position += len(self)
+        return self._index[self._start + position]
+
+    def tail(self, count):
+        return self[-count:] if count > 0 else self[:0]
+
+    def searchsorted(self, timestamp, side='right'):
+        """Position of `timestamp` within this view (bisect on the index)"""
+        stamp = pd.Timestamp(timestamp)
+        if getattr(self._index, 'tz', None) is not None and stamp.tzinfo is None:
+            stamp = stamp.tz_localize(self._index.tz)
+        if stamp.tzinfo is not None:
+            stamp = stamp.tz_convert('UTC').tz_localize(None)
+        return int(np.searchsorted(self._times[self._start:self._stop], stamp.to_datetime64(), side=side))
+
+    def until(self, timestamp):
+        """View of the bars at or before `timestamp`"""
+        return self[:self.searchsorted(timestamp, 'right')]
+
+    def after(self, timestamp):
+        """View of the bars strictly after `timestamp`"""
+        return self[self.searchsorted(timestamp, 'right'):]
+
+    def __repr__(self):
+        span = f"{self._index[self._start]} .. {self._index[self._stop - 1]}" if len(self) else "empty"
+        return f"BarSeries({len(self)} bars, {span}, columns={self.columns})"
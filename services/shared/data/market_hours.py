@@ -1,12 +1,43 @@
 from datetime import datetime
+import numpy as np
 import pandas as pd
 import pytz
 import config
 
 
+SESSION_NAMES = ('London', 'New York', 'London + New York',
+                 'Asian (Pre-London)', 'Between Sessions', 'After Hours')
+
+
 class MarketHours:
     def __init__(self):
         self.gmt = pytz.timezone('GMT')
+        self.holidays = pd.DatetimeIndex(config.MARKET_HOLIDAYS)
+        self.half_days = pd.DatetimeIndex(config.MARKET_HALF_DAYS)
+        # session and trade permission per hour of the week (slot = weekday * 24 + hour, GMT)
+        self.week_sessions = np.empty(7 * 24, dtype=np.int8)
+        self.week_trading = np.zeros(7 * 24, dtype=bool)
+        for slot in range(7 * 24):
+            weekday, hour = divmod(slot, 24)
+            self.week_sessions[slot] = SESSION_NAMES.index(self.session_name(hour))
+            in_session = (config.LONDON_OPEN <= hour < config.LONDON_CLOSE) or \
+                         (config.NY_OPEN <= hour < config.NY_CLOSE)
+            self.week_trading[slot] = in_session and weekday < 5
+
+    @staticmethod
+    def session_name(hour):
+        sessions = []
+        if config.LONDON_OPEN <= hour < config.LONDON_CLOSE:
+            sessions.append('London')
+        if config.NY_OPEN <= hour < config.NY_CLOSE:
+            sessions.append('New York')
+        if sessions:
+            return ' + '.join(sessions)
+        if hour < config.LONDON_OPEN:
+            return 'Asian (Pre-London)'
+        elif hour >= config.NY_CLOSE:
+            return 'After Hours'
+        return 'Between Sessions'
 
     def get_current_hour_gmt(self):
         return datetime.now(self.gmt).hour
@@ -24,19 +55,22 @@ class MarketHours:
         return self.is_london_session() and self.is_ny_session()
 
     def get_current_session(self):
-        sessions = []
-        if self.is_london_session():
-            sessions.append('London')
-        if self.is_ny_session():
-            sessions.append('New York')
-        if sessions:
-            return ' + '.join(sessions)
-        hour = self.get_current_hour_gmt()
-        if hour < config.LONDON_OPEN:
-            return 'Asian (Pre-London)'
-        elif hour >= config.NY_CLOSE:
-            return 'After Hours'
-        return 'Between Sessions'
+        return self.session_name(self.get_current_hour_gmt())
+
+    def session_table(self, index):
+        """(sessions, allowed) arrays for every timestamp via the hour-of-week table; naive = GMT."""
+        index = pd.DatetimeIndex(index)
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        hours = np.asarray(index.hour)
+        slots = np.asarray(index.dayofweek) * 24 + hours
+        sessions = np.asarray(SESSION_NAMES, dtype=object)[self.week_sessions[slots]]
+        allowed = self.week_trading[slots]
+        if len(self.holidays) or len(self.half_days):
+            days = index.normalize()
+            allowed &= ~np.asarray(days.isin(self.holidays))
+            allowed &= ~(np.asarray(days.isin(self.half_days)) & (hours >= config.HALF_DAY_CLOSE))
+        return sessions, allowed
 
     def get_asian_range(self, df):
         try:
@@ -49,8 +83,12 @@ class MarketHours:
 
     def get_previous_day_levels(self, df):
         try:
-            yesterday = df.iloc[-2] if len(df) > 1 else df.iloc[-1]
-            return {'pdh': yesterday['High'], 'pdl': yesterday['Low'], 'pdc': yesterday['Close']}
+            days = df.index.normalize()
+            earlier = days[days < days[-1]]
+            if not len(earlier):
+                return None
+            yesterday = df[days == earlier[-1]]
+            return {'pdh': yesterday['High'].max(), 'pdl': yesterday['Low'].min(), 'pdc': yesterday['Close'].iloc[-1]}
         except Exception:
             return None
 
@@ -76,6 +114,11 @@ class MarketHours:
             return False, f'Outside trading hours (current hour: {hour} GMT)'
         if now.weekday() >= 5:
             return False, 'Weekend - Market closed'
+        day = pd.Timestamp(now.year, now.month, now.day)
+        if day in self.holidays:
+            return False, 'Holiday - Market closed'
+        if day in self.half_days and hour >= config.HALF_DAY_CLOSE:
+            return False, f'Half day - Market closed from {config.HALF_DAY_CLOSE}:00 GMT'
 
         sessions = []
         if config.LONDON_OPEN <= hour < config.LONDON_CLOSE:
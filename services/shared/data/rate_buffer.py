@@ -0,0 +1,149 @@
+"""
+RateBuffer: MT5 rate rows in a fixed-capacity ring, plus rate/DataFrame conversion.
+"""
+import numpy as np
+import pandas as pd
+
+# Row layout of mt5.copy_rates_* results
+RATE_DTYPE = np.dtype([
+    ('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'),
+    ('tick_volume', '<u8'), ('spread', '<i4'), ('real_volume', '<u8')
+])
+
+# MT5 rate fields -> DataFrame columns (other fields keep their names)
+RATE_COLUMNS = {
+    'open': 'Open',
+    'high': 'High',
+    'low': 'Low',
+    'close': 'Close',
+    'tick_volume': 'Volume'
+}
+
+
+def rates_frame(rows, columns=None, tz=None):
+    """
+    Rate rows as an OHLCV DataFrame
+
+    Args:
+        rows: Structured array of rates
+        columns: Optional DataFrame columns to keep (default: every field)
+        tz: Optional timezone to localize the Time index to
+
+    Returns:
+        DataFrame with a Time index and renamed price/volume columns
+    """
+    index = pd.DatetimeIndex(pd.to_datetime(rows['time'], unit='s'), name='Time')
+    if tz is not None:
+        index = index.tz_localize(tz)
+    data = {RATE_COLUMNS.get(name, name): rows[name] for name in rows.dtype.names if name != 'time'}
+    if columns is not None:
+        data = {name: data[name] for name in columns}
+    return pd.DataFrame(data, index=index)
+
+
+def frame_rates(df):
+    """
+    OHLCV DataFrame as RATE_DTYPE rows (inverse of rates_frame)
+
+    Timestamps are stored as epoch seconds (tz-aware ones in UTC); fields
+    the frame lacks are zero.
+    """
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+
+    rows = np.zeros(len(df), dtype=RATE_DTYPE)
+    rows['time'] = index.as_unit('s').asi8
+    columns = {column: field for field, column in RATE_COLUMNS.items()}
+    for column in df.columns:
+        field = columns.get(column, column)
+        if field in RATE_DTYPE.names and field != 'time':
+            values = np.asarray(df[column], dtype=np.float64)
+            rows[field] = np.round(values) if rows.dtype[field].kind in 'iu' else values
+    return rows
+
+
+class RateBuffer:
+    """
+    Fixed-capacity ring of MT5 rate rows, updated in place
+
+    Rows live in a structured array twice the capacity; new rows are
+    written after the newest one and the live window is slid back to the
+    front only when the array fills, so appends are amortized O(1) and
+    the window is always one contiguous view.
+    """
+
+    def __init__(self, capacity, dtype):
+        """
+        Args:
+            capacity: Rows kept (the newest ones)
+            dtype: Structured dtype of the rates (as from copy_rates_*)
+        """
+        self.capacity = capacity
+        self._rows = np.empty(2 * capacity, dtype=dtype)
+        self._start = 0
+        self._stop = 0
+        self._frame = None
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def rows(self):
+        """The buffered rates, oldest first (a view, don't modify)"""
+        return self._rows[self._start:self._stop]
+
+    def last_time(self):
+        """Open time (epoch seconds) of the newest row, or None when empty"""
+        return int(self._rows['time'][self._stop - 1]) if len(self) else None
+
+    def merge(self, rates):
+        """
+        Overwrite the rows from rates' first bar on and append the rest
+
+        The first fetched bar is normally the still-forming one, which gets
+        replaced; every later bar is new.
+
+        Returns:
+            Number of bars newer than the previous newest row, i.e. bars
+            that closed since the last merge
+        """
+        if rates is None or len(rates) == 0:
+            return 0
+
+        previous_last = self.last_time()
+        # counted before trimming: bars pushed straight through a small
+        # window still closed
+        closed = len(rates) if previous_last is None else int((rates['time'] > previous_last).sum())
+        rates = rates[-self.capacity:]
+        cut = self._start + int(np.searchsorted(self.rows()['time'], rates['time'][0]))
+        unchanged = (previous_last is not None and cut == self._stop - 1 and len(rates) == 1
+                     and self._rows[cut] == rates[0])
+
+        self._stop = cut
+        if self._stop + len(rates) > len(self._rows):
+            # slide the rows that stay in the window back to the front
+            kept = self._rows[max(self._start, self._stop - (self.capacity - len(rates))):self._stop].copy()
+            self._rows[:len(kept)] = kept
+            self._start, self._stop = 0, len(kept)
+        self._rows[self._stop:self._stop + len(rates)] = rates
+        self._stop += len(rates)
+        self._start = max(self._start, self._stop - self.capacity)
+
+        if not unchanged:
+            self._frame = None
+        return closed
+
+    def to_frame(self, bars=None):
+        """
+        The newest `bars` rows (default: all) as an OHLCV DataFrame
+
+        Same layout as a fresh copy_rates_* frame: Time index, renamed
+        price and volume columns. The frame is rebuilt only after the
+        rows change, so treat it as read-only.
+        """
+        if self._frame is None:
+            self._frame = rates_frame(self.rows())
+
+        if bars is None or bars >= len(self._frame):
+            return self._frame
+        return self._frame.iloc[-bars:]
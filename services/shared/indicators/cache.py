@@ -0,0 +1,158 @@
+"""
+Shared LRU cache of calculate_all results, keyed by frame identity and indicator params.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+import config
+
+# config values that change what calculate_all produces
+INDICATOR_PARAMETERS = (
+    'EMA_FAST', 'EMA_SLOW', 'RSI_PERIOD', 'STOCH_PERIOD', 'STOCH_SMOOTH_K',
+    'MACD_FAST', 'MACD_SLOW', 'MACD_SIGNAL', 'ATR_PERIOD',
+    'DIVERGENCE_LOOKBACK', 'DIVERGENCE_PIVOT_WINDOW'
+)
+
+
+def parameter_hash(columns=None, backend=None):
+    """Short hash of the indicator parameters, requested columns and backend"""
+    params = [(name, getattr(config, name)) for name in INDICATOR_PARAMETERS]
+    wanted = None if columns is None else tuple(sorted(columns))
+    return hashlib.sha1(repr((params, wanted, backend)).encode()).hexdigest()[:16]
+
+
+def frame_key(df, columns=None, backend=None, symbol=None, timeframe=None):
+    """
+    Cache key describing a bar frame and how its indicators would be computed
+
+    Symbol and timeframe default to df.attrs (set by DataHandler). The last
+    bar's OHLCV is part of the key so a still-forming bar never hits a stale
+    entry.
+
+    Returns:
+        Hashable tuple, or None when the frame can't be keyed
+    """
+    if df is None or len(df) == 0:
+        return None
+
+    try:
+        last_bar = tuple(float(df[name].iat[-1]) for name in ('Open', 'High', 'Low', 'Close', 'Volume'))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    return (
+        symbol or df.attrs.get('symbol'),
+        timeframe or df.attrs.get('timeframe'),
+        df.index[0],
+        df.index[-1],
+        len(df),
+        last_bar,
+        parameter_hash(columns, backend)
+    )
+
+
+def _owned_arrays(frame):
+    """The arrays that actually hold frame's data (views resolved to their base)"""
+    arrays = {}
+    for values in [frame.index.to_numpy()] + [frame[name].to_numpy() for name in frame.columns]:
+        while isinstance(values.base, np.ndarray):
+            values = values.base
+        arrays[id(values)] = values
+    return list(arrays.values())
+
+
+def _block_arrays(frame):
+    """The arrays frame's blocks hold (views included) and every array they view"""
+    arrays = {}
+    # a column's to_numpy() is a fresh view, so freezing it would leave the block writeable
+    for values in frame._mgr.arrays:
+        while isinstance(values, np.ndarray):
+            arrays[id(values)] = values
+            values = values.base
+    return list(arrays.values())
+
+
+class IndicatorCache:
+    """
+    LRU cache of indicator frames with a byte budget
+
+    Entries are charged for the whole blocks they keep alive (calculate_all
+    returns a warm-up-trimmed view of a larger block). The stored blocks
+    and every view of them are made read-only and get() hands out shallow
+    copies: added columns stay the caller's, and writes into cached values
+    either raise or, under copy-on-write, land in the caller's own copy.
+    Either way the next caller sees what was stored.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Cached frame for key, or None"""
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._frames.move_to_end(key)
+            self.hits += 1
+            return entry[0].copy(deep=False)
+
+    def put(self, key, frame):
+        """Store frame, evicting least-recently-used entries over budget"""
+        arrays = _owned_arrays(frame)
+        size = sum(values.nbytes for values in arrays)
+        if size > self.max_bytes:
+            return
+
+        for values in _block_arrays(frame):
+            if values.dtype.kind == 'f':  # the indicator block, never the caller's input columns
+                values.flags.writeable = False
+        frame = frame.copy(deep=False)
+
+        with self._lock:
+            old = self._frames.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+
+            self._frames[key] = (frame, size)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._frames.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Counters for logging / metrics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._frames),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0
+            }
+
+    def __len__(self):
+        return len(self._frames)
+
+
+# Process-wide cache shared by every TechnicalIndicators instance
+indicator_cache = IndicatorCache(config.INDICATOR_CACHE_MB * 1024 * 1024)
@@ -0,0 +1,177 @@
+"""
+Calendar levels (previous day/week, monthly open) aggregated from intraday bars.
+"""
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+
+# Previous-period levels: period -> (high, low, close) keys
+PREVIOUS_PERIOD_LEVELS = {
+    'day': ('pdh', 'pdl', 'pdc'),
+    'week': ('pwh', 'pwl', 'pwc')
+}
+CALENDAR_LEVELS = PREVIOUS_PERIOD_LEVELS['day'] + PREVIOUS_PERIOD_LEVELS['week'] + ('monthly_open',)
+
+
+def period_starts(index, period):
+    """Start of the day, Monday-based week or month each timestamp falls in"""
+    days = index.normalize()
+    if period == 'day':
+        return days
+    if period == 'week':
+        return days - pd.to_timedelta(index.dayofweek, unit='D')
+    return days - pd.to_timedelta(index.day - 1, unit='D')
+
+
+def calendar_level_series(index, open_, high, low, close, window=None):
+    """
+    Calendar levels as of every bar, aggregated from the bars themselves
+
+    pdh/pdl/pdc and pwh/pwl/pwc are the high, low and close of the
+    previous day and week with data; monthly_open opens the current month.
+    A period only counts once an earlier bar is in the data (within
+    `window` bars when given), so one cut off by the start of the history
+    never passes for a whole one.
+
+    Returns:
+        dict of level -> float array, NaN where the period isn't covered
+    """
+    length = len(index)
+    if not length:
+        return {name: np.empty(0) for name in CALENDAR_LEVELS}
+
+    positions = np.arange(length)
+    oldest = np.maximum(positions - window + 1, 0) if window else np.zeros(length, dtype=np.intp)
+    columns = {}
+
+    for period in ('day', 'week', 'month'):
+        starts = np.asarray(period_starts(index, period))
+        new_period = np.ones(length, dtype=bool)
+        new_period[1:] = starts[1:] != starts[:-1]
+        firsts = np.flatnonzero(new_period)
+        group = np.cumsum(new_period) - 1
+
+        if period == 'month':
+            first = firsts[group]
+            columns['monthly_open'] = np.where(first > oldest, open_[first], np.nan)
+            continue
+
+        # aggregate each period, then look up the one before each bar's
+        previous = np.maximum(group - 1, 0)
+        covered = (group >= 1) & (firsts[previous] > oldest)
+        aggregates = (np.maximum.reduceat(high, firsts),
+                      np.minimum.reduceat(low, firsts),
+                      close[np.r_[firsts[1:], length] - 1])
+        for name, values in zip(PREVIOUS_PERIOD_LEVELS[period], aggregates):
+            columns[name] = np.where(covered, values[previous], np.nan)
+
+    return {name: columns[name] for name in CALENDAR_LEVELS}
+
+
+def previous_day_from_daily(df_daily, day):
+    """pdh/pdl/pdc from the last daily bar before `day`, or {} if there is none"""
+    earlier = df_daily[df_daily.index < day]
+    if not len(earlier):
+        return {}
+    yesterday = earlier.iloc[-1]
+    return {'pdh': yesterday['High'], 'pdl': yesterday['Low'], 'pdc': yesterday['Close']}
+
+
+class CalendarLevels:
+    """
+    Daily, weekly and monthly levels built from already-loaded intraday bars
+
+    Nothing extra is fetched: the day/week/month bars are aggregated from
+    the M15/H4 frame in hand. The result only depends on the newest bar's
+    day and the first day of the frame, so it is rebuilt once per day
+    boundary and served from cache on every other scan.
+    """
+
+    def __init__(self):
+        self._key = None
+        self._levels = {}
+
+    def levels(self, df):
+        """
+        Calendar levels as of df's newest bar
+
+        Args:
+            df: DataFrame with Open, High, Low, Close and a DatetimeIndex
+
+        Returns:
+            dict in identify_key_levels layout; uncovered levels left out
+        """
+        if not len(df):
+            return {}
+
+        index = df.index
+        key = (index[-1].normalize(), index[0].normalize())
+        if key != self._key:
+            series = calendar_level_series(index, *(np.asarray(df[column], dtype=np.float64)
+                                                    for column in ('Open', 'High', 'Low', 'Close')))
+            self._levels = {name: values[-1] for name, values in series.items() if values[-1] == values[-1]}
+            self._key = key
+
+        return dict(self._levels)
+
+
+class CalendarLevelTracker:
+    """
+    calendar_level_series one bar at a time
+
+    Keeps the running and the previous bar of each period, so a new bar is
+    O(1) work.
+    """
+
+    def __init__(self, history=None):
+        """
+        Args:
+            history: Bars the levels may reach back over (default: all)
+        """
+        self.history = history
+        self.reset()
+
+    def reset(self):
+        """Drop all bars"""
+        self.position = -1
+        # period -> [start, first position, open, high, low, close]
+        self.current = {}
+        # period -> (first position, high, low, close)
+        self.previous = {}
+
+    def update(self, timestamp, open_, high, low, close):
+        """
+        Feed one bar
+
+        Returns:
+            dict of the covered calendar levels, as CalendarLevels.levels
+        """
+        self.position += 1
+        day = pd.Timestamp(timestamp).normalize()
+        starts = {
+            'day': day,
+            'week': day - timedelta(days=day.weekday()),
+            'month': day - timedelta(days=day.day - 1)
+        }
+
+        for period, start in starts.items():
+            running = self.current.get(period)
+            if running is not None and running[0] == start:
+                running[3] = max(running[3], high)
+                running[4] = min(running[4], low)
+                running[5] = close
+                continue
+            if running is not None:
+                self.previous[period] = (running[1], running[3], running[4], running[5])
+            self.current[period] = [start, self.position, open_, high, low, close]
+
+        oldest = max(self.position - self.history + 1, 0) if self.history else 0
+        levels = {}
+        for period, names in PREVIOUS_PERIOD_LEVELS.items():
+            previous = self.previous.get(period)
+            if previous is not None and previous[0] > oldest:
+                levels.update(zip(names, previous[1:]))
+        month = self.current['month']
+        if month[1] > oldest:
+            levels['monthly_open'] = month[2]
+        return levels
@@ -0,0 +1,145 @@
+"""
+LevelIndex: flat, price-sorted structural levels with bisect-based proximity queries.
+"""
+import numpy as np
+
+# Default pip (XAUUSD); nearest/within take a symbol's own
+PIP_SIZE = 0.10
+
+# Level family of each identify_key_levels key
+LEVEL_KINDS = {
+    'pdh': 'previous_day',
+    'pdl': 'previous_day',
+    'pdc': 'previous_day',
+    'pwh': 'previous_week',
+    'pwl': 'previous_week',
+    'pwc': 'previous_week',
+    'asian_high': 'session',
+    'asian_low': 'session',
+    'weekly_open': 'weekly',
+    'monthly_open': 'monthly',
+    'swing_high': 'swing',
+    'swing_low': 'swing',
+    'fibonacci': 'fibonacci',
+    'round_numbers': 'round_number'
+}
+
+
+def level_kind(key):
+    """Level family of an identify_key_levels key (swing_high_N etc. are swings)"""
+    if key.startswith(('swing_high_', 'swing_low_')):
+        return 'swing'
+    return LEVEL_KINDS.get(key, key)
+
+
+class LevelIndex:
+    """
+    Flat, price-sorted index of structural levels
+
+    Prices live in one sorted float64 array next to parallel name and kind
+    arrays, so nearest-level and band queries are a bisect each and take
+    whole arrays of prices at once. Equal distances resolve to the level
+    that came first in the source dict, like the old dict walk.
+    """
+    __slots__ = ('prices', 'names', 'kinds', '_order')
+
+    def __init__(self, prices, names, kinds):
+        """
+        Args:
+            prices, names, kinds: Parallel sequences in priority order
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        order = np.argsort(prices, kind='stable')
+        self.prices = prices[order]
+        self.names = np.asarray(names, dtype=object)[order]
+        self.kinds = np.asarray(kinds, dtype=object)[order]
+        self._order = order
+
+    @classmethod
+    def from_levels(cls, levels):
+        """
+        Build from an identify_key_levels dict
+
+        Names follow the labels signals carry ('PDH', 'Fib 61.8',
+        'Round $2000'); missing and NaN levels are dropped.
+        """
+        prices, names, kinds = [], [], []
+
+        def add(price, name, kind):
+            if price is not None and price == price:
+                prices.append(float(price))
+                names.append(name)
+                kinds.append(kind)
+
+        for key, value in levels.items():
+            kind = level_kind(key)
+            if key == 'fibonacci':
+                for fib_name, fib_price in value.items():
+                    add(fib_price, f"Fib {fib_name}", kind)
+            elif key == 'round_numbers':
+                for price in value:
+                    add(price, f"Round ${int(price)}", kind)
+            else:
+                add(value, key.upper(), kind)
+
+        return cls(prices, names, kinds)
+
+    def __len__(self):
+        return len(self.prices)
+
+    def __repr__(self):
+        return f"LevelIndex({len(self)} levels)"
+
+    def level(self, position):
+        """(price, name, kind) of the level at a sorted position"""
+        return self.prices[position], self.names[position], self.kinds[position]
+
+    def nearest(self, prices, max_distance_pips=None, pip_size=PIP_SIZE):
+        """
+        Nearest level to each price
+
+        Args:
+            prices: Scalar or array of prices
+            max_distance_pips: Optional cut-off; farther levels don't count
+            pip_size: Price move of one pip
+
+        Returns:
+            (positions, distances_pips) arrays; position -1 where no level
+            qualifies
+        """
+        x = np.atleast_1d(np.asarray(prices, dtype=np.float64))
+        count = len(self.prices)
+        if count == 0:
+            return np.full(len(x), -1), np.full(len(x), np.inf)
+
+        # first level at or above x, and the first level of the block below
+        right = np.searchsorted(self.prices, x, side='left')
+        below = right - 1
+        left = np.searchsorted(self.prices, self.prices[np.maximum(below, 0)], side='left')
+        right_clipped = np.minimum(right, count - 1)
+
+        left_distance = np.where(below >= 0, np.abs(x - self.prices[left]) / pip_size, np.inf)
+        right_distance = np.where(right < count, np.abs(x - self.prices[right_clipped]) / pip_size, np.inf)
+
+        take_right = (right_distance < left_distance) | (
+            (right_distance == left_distance) & (self._order[right_clipped] < self._order[left]))
+        positions = np.where(take_right, right_clipped, left)
+        distances = np.where(take_right, right_distance, left_distance)
+
+        if max_distance_pips is not None:
+            positions = np.where(distances <= max_distance_pips, positions, -1)
+        return positions, distances
+
+    def within(self, prices, max_distance_pips, pip_size=PIP_SIZE):
+        """
+        Levels within max_distance_pips of each price
+
+        Returns:
+            (starts, stops) arrays; levels[starts[i]:stops[i]] are in range
+            of prices[i], in price order
+        """
+        x = np.atleast_1d(np.asarray(prices, dtype=np.float64))
+        band = max_distance_pips * pip_size
+        starts = np.searchsorted(self.prices, x - band, side='left')
+        stops = np.searchsorted(self.prices, x + band, side='right')
+        return starts, stops
@@ -0,0 +1,153 @@
+"""
+Fractal swing pivots: batch detection and a streaming multi-order tracker.
+"""
+from collections import deque
+import numpy as np
+from indicators.rolling import RollingMax, RollingMin, rolling_max, rolling_min
+
+
+# ---------------------------------------------------------------------------
+# Batch: every pivot of a series, one O(n) rolling pass per order
+# ---------------------------------------------------------------------------
+
+def pivot_positions(values, order, highs=True):
+    """
+    Positions of N-left/N-right fractal pivots
+
+    A bar is a pivot high (low) when it is the extreme of the `order` bars
+    on either side and itself; ties with the extreme count. A pivot is only
+    confirmed `order` bars after it formed.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    length = len(values)
+    if length < 2 * order + 1:
+        return np.empty(0, dtype=np.intp)
+
+    extreme = (rolling_max if highs else rolling_min)(values, 2 * order + 1)
+    centers = np.arange(order, length - order)
+    return centers[extreme[centers + order] == values[centers]]
+
+
+def fractal_pivots(high, low, orders=(3, 5, 10)):
+    """
+    Pivot highs and lows at several orders
+
+    Returns:
+        dict of order -> (pivot_high_positions, pivot_low_positions)
+    """
+    return {order: (pivot_positions(high, order, highs=True), pivot_positions(low, order, highs=False))
+            for order in orders}
+
+
+def latest_pivot(values, positions, order, window=None):
+    """
+    Price of the newest pivot confirmed by each bar
+
+    Args:
+        values: The series the pivots were found in
+        positions: Output of pivot_positions for that series and order
+        order: Pivot order (bars each side)
+        window: Optional bars a pivot and its left side must fall within
+
+    Returns:
+        float array, NaN where no pivot qualifies
+    """
+    values = np.asarray(values, dtype=np.float64)
+    length = len(values)
+    newest = np.full(length, -1)
+    newest[positions + order] = positions
+    newest = np.maximum.accumulate(newest) if length else newest
+
+    found = newest >= 0
+    if window is not None:
+        found &= newest - order >= np.arange(length) - window + 1
+    return np.where(found, values[np.maximum(newest, 0)], np.nan)
+
+
+# ---------------------------------------------------------------------------
+# Streaming: pivots confirmed as bars close, O(1) amortized per bar
+# ---------------------------------------------------------------------------
+
+class FractalPivotTracker:
+    """
+    Fractal pivots at several orders, fed one closed bar at a time
+
+    Each order keeps a rolling max/min over its 2N+1 window, so a new bar
+    costs the same however long the history is. The newest `history`
+    confirmed pivots per order are cached as (position, price).
+    """
+
+    def __init__(self, orders=(3, 5, 10), history=500):
+        self.orders = tuple(sorted(orders))
+        self.history = history
+        self.reset()
+
+    def reset(self):
+        """Drop all bars and pivots"""
+        span = 2 * max(self.orders) + 1
+        self.highs = deque(maxlen=span)
+        self.lows = deque(maxlen=span)
+        self.window_highs = {order: RollingMax(2 * order + 1) for order in self.orders}
+        self.window_lows = {order: RollingMin(2 * order + 1) for order in self.orders}
+        self.pivot_highs = {order: deque(maxlen=self.history) for order in self.orders}
+        self.pivot_lows = {order: deque(maxlen=self.history) for order in self.orders}
+        self.count = 0
+
+    def update(self, high, low):
+        """
+        Feed one closed bar
+
+        Returns:
+            dict of order -> (pivot_high, pivot_low) confirmed by this bar,
+            each a (position, price) tuple or None; orders with neither are
+            left out
+        """
+        high = float(high)
+        low = float(low)
+        self.highs.append(high)
+        self.lows.append(low)
+        self.count += 1
+
+        confirmed = {}
+        for order in self.orders:
+            window_high = self.window_highs[order].update(high)
+            window_low = self.window_lows[order].update(low)
+            if self.count < 2 * order + 1:
+                continue
+
+            center = self.count - 1 - order
+            pivot_high = pivot_low = None
+            if window_high == self.highs[-order - 1]:
+                pivot_high = (center, window_high)
+                self.pivot_highs[order].append(pivot_high)
+            if window_low == self.lows[-order - 1]:
+                pivot_low = (center, window_low)
+                self.pivot_lows[order].append(pivot_low)
+            if pivot_high or pivot_low:
+                confirmed[order] = (pivot_high, pivot_low)
+
+        return confirmed
+
+    def latest(self, order, window=None):
+        """
+        Newest confirmed pivot high and low at `order`
+
+        Args:
+            window: Optional bars (up to the newest) a pivot and its left
+                    side must fall within
+
+        Returns:
+            (pivot_high, pivot_low), each (position, price) or None
+        """
+        oldest = None if window is None else self.count - window + order
+
+        def newest(pivots):
+            if not pivots or (oldest is not None and pivots[-1][0] < oldest):
+                return None
+            return pivots[-1]
+
+        return newest(self.pivot_highs[order]), newest(self.pivot_lows[order])
+
+    def pivots(self, order):
+        """Cached (pivot_highs, pivot_lows) lists at `order`, oldest first"""
+        return list(self.pivot_highs[order]), list(self.pivot_lows[order])
@@ -0,0 +1,448 @@
+"""
+Streaming indicators: O(1)-per-bar updates of the TechnicalIndicators columns.
+"""
+import itertools
+import math
+from collections import deque
+import pandas as pd
+import config
+from indicators.rolling import RollingMax, RollingMin, RollingMeanVar
+from indicators.vectorized import INDICATOR_COLUMNS
+
+NAN = float('nan')
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+class EMAState:
+    """
+    Exponential moving average, one value at a time
+
+    Matches ta's EMAIndicator (pandas ewm with adjust=False): seeded with the
+    first value and reported once `window` values have been seen. Leading NaN
+    inputs are skipped, like pandas does for the MACD signal line.
+    """
+    __slots__ = ('window', 'alpha', 'value', 'count')
+
+    def __init__(self, window, alpha=None):
+        self.window = window
+        self.alpha = alpha if alpha is not None else 2.0 / (window + 1)
+        self.value = None
+        self.count = 0
+
+    def update(self, x):
+        if x != x:
+            return NAN
+
+        if self.value is None:
+            self.value = x
+        else:
+            self.value = (1 - self.alpha) * self.value + self.alpha * x
+
+        self.count += 1
+        return self.value if self.count >= self.window else NAN
+
+
+class RSIState:
+    """Wilder RSI (ta's RSIIndicator)"""
+    __slots__ = ('prev_close', 'avg_up', 'avg_down')
+
+    def __init__(self, window):
+        self.prev_close = None
+        self.avg_up = EMAState(window, alpha=1.0 / window)
+        self.avg_down = EMAState(window, alpha=1.0 / window)
+
+    def update(self, close):
+        up = down = 0.0
+        if self.prev_close is not None:
+            diff = close - self.prev_close
+            if diff > 0:
+                up = diff
+            elif diff < 0:
+                down = -diff
+        self.prev_close = close
+
+        avg_up = self.avg_up.update(up)
+        avg_down = self.avg_down.update(down)
+
+        if avg_down != avg_down:
+            return NAN
+        if avg_down == 0:
+            return 100.0
+        return 100 - (100 / (1 + avg_up / avg_down))
+
+
+class ATRState:
+    """
+    Average True Range (ta's AverageTrueRange)
+
+    The first true range is High - Low; the first ATR is the plain mean of
+    `window` true ranges, then Wilder smoothing. Warm-up bars report 0.0.
+    """
+    __slots__ = ('window', 'prev_close', 'count', 'tr_sum', 'value')
+
+    def __init__(self, window):
+        self.window = window
+        self.prev_close = None
+        self.count = 0
+        self.tr_sum = 0.0
+        self.value = 0.0
+
+    def update(self, high, low, close):
+        if self.prev_close is None:
+            tr = high - low
+        else:
+            tr = max(high, self.prev_close) - min(low, self.prev_close)
+        self.prev_close = close
+        self.count += 1
+
+        if self.count < self.window:
+            self.tr_sum += tr
+        elif self.count == self.window:
+            self.value = (self.tr_sum + tr) / self.window
+        else:
+            self.value = (self.value * (self.window - 1) + tr) / float(self.window)
+
+        return self.value
+
+
+class ADXState:
+    """
+    Average Directional Index with +DI / -DI (ta's ADXIndicator)
+
+    Directional movement and true range are Wilder-summed from the second
+    bar; ADX is seeded with the mean of the first `window` DX values. Like
+    ta, warm-up bars report 0.0 rather than NaN.
+    """
+    __slots__ = ('window', 'prev_high', 'prev_low', 'prev_close', 'count',
+                 'tr_sum', 'pos_sum', 'neg_sum', 'dx_seed', 'adx')
+
+    def __init__(self, window=14):
+        self.window = window
+        self.prev_high = None
+        self.prev_low = None
+        self.prev_close = None
+        self.count = 0
+        self.tr_sum = 0.0
+        self.pos_sum = 0.0
+        self.neg_sum = 0.0
+        self.dx_seed = []
+        self.adx = 0.0
+
+    def update(self, high, low, close):
+        """Returns: (adx, adx_pos, adx_neg)"""
+        n = self.window
+
+        if self.prev_close is None:
+            self.prev_high, self.prev_low, self.prev_close = high, low, close
+            return 0.0, 0.0, 0.0
+
+        tr = max(high, self.prev_close) - min(low, self.prev_close)
+        diff_up = high - self.prev_high
+        diff_down = self.prev_low - low
+        pos = diff_up if (diff_up > diff_down and diff_up > 0) else 0.0
+        neg = diff_down if (diff_down > diff_up and diff_down > 0) else 0.0
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+
+        self.count += 1
+        if self.count <= n:
+            self.tr_sum += tr
+            self.pos_sum += pos
+            self.neg_sum += neg
+            if self.count < n:
+                return 0.0, 0.0, 0.0
+        else:
+            self.tr_sum = self.tr_sum - (self.tr_sum / float(n)) + tr
+            self.pos_sum = self.pos_sum - (self.pos_sum / float(n)) + pos
+            self.neg_sum = self.neg_sum - (self.neg_sum / float(n)) + neg
+
+        if self.tr_sum != 0:
+            di_pos = 100 * (self.pos_sum / self.tr_sum)
+            di_neg = 100 * (self.neg_sum / self.tr_sum)
+        else:
+            di_pos = di_neg = 0.0
+
+        if di_pos + di_neg != 0:
+            dx = 100 * abs((di_pos - di_neg) / (di_pos + di_neg))
+        else:
+            dx = 0.0
+
+        if len(self.dx_seed) < n:
+            self.dx_seed.append(dx)
+            if len(self.dx_seed) == n:
+                self.adx = sum(self.dx_seed) / n
+        else:
+            self.adx = ((self.adx * (n - 1)) + dx) / float(n)
+
+        # ta starts reporting +DI / -DI one bar after the sums are seeded
+        if self.count == n:
+            return self.adx, 0.0, 0.0
+        return self.adx, di_pos, di_neg
+
+
+class BollingerState:
+    """Bollinger Bands over a fixed window (population std, like ta)"""
+    __slots__ = ('window_dev', 'moments')
+
+    def __init__(self, window=20, window_dev=2):
+        self.window_dev = window_dev
+        self.moments = RollingMeanVar(window)
+
+    def update(self, close):
+        """Returns: (upper, middle, lower, width)"""
+        mean, var = self.moments.update(close)
+        if mean != mean:
+            return NAN, NAN, NAN, NAN
+
+        std = math.sqrt(var)
+        upper = mean + self.window_dev * std
+        lower = mean - self.window_dev * std
+        width = ((upper - lower) / mean) * 100 if mean != 0 else NAN
+
+        return upper, mean, lower, width
+
+
+class StochasticState:
+    """Stochastic %K and its %D signal line (ta's StochasticOscillator)"""
+    __slots__ = ('highest', 'lowest', 'k_values')
+
+    def __init__(self, window, smooth_window):
+        self.highest = RollingMax(window)
+        self.lowest = RollingMin(window)
+        self.k_values = deque(maxlen=smooth_window)
+
+    def update(self, high, low, close):
+        """Returns: (stoch_k, stoch_d)"""
+        highest = self.highest.update(high)
+        lowest = self.lowest.update(low)
+
+        stoch_k = NAN
+        if highest == highest and highest != lowest:
+            stoch_k = 100 * (close - lowest) / (highest - lowest)
+
+        self.k_values.append(stoch_k)
+        if len(self.k_values) < self.k_values.maxlen:
+            return stoch_k, NAN
+
+        stoch_d = sum(self.k_values) / len(self.k_values)
+        return stoch_k, stoch_d
+
+
+class MACDState:
+    """MACD line, signal and histogram"""
+    __slots__ = ('fast', 'slow', 'signal')
+
+    def __init__(self, window_fast, window_slow, window_sign):
+        self.fast = EMAState(window_fast)
+        self.slow = EMAState(window_slow)
+        self.signal = EMAState(window_sign)
+
+    def update(self, close):
+        """Returns: (macd, macd_signal, macd_diff)"""
+        macd = self.fast.update(close) - self.slow.update(close)
+        signal = self.signal.update(macd)
+        return macd, signal, macd - signal
+
+
+class VolumeState:
+    """Volume moving average, volume ratio and price-volume trend"""
+    __slots__ = ('volumes', 'prev_close', 'pvt')
+
+    def __init__(self, window=20):
+        self.volumes = RollingMeanVar(window)
+        self.prev_close = None
+        self.pvt = NAN
+
+    def update(self, close, volume):
+        """Returns: (volume_ma, volume_ratio, pvt)"""
+        volume_ma, _ = self.volumes.update(volume)
+
+        volume_ratio = NAN
+        if volume_ma == volume_ma:
+            if volume_ma != 0:
+                volume_ratio = volume / volume_ma
+            elif volume != 0:
+                volume_ratio = math.inf
+
+        if self.prev_close is not None and self.prev_close != 0:
+            step = (close - self.prev_close) / self.prev_close * volume
+            self.pvt = step if self.pvt != self.pvt else self.pvt + step
+        self.prev_close = close
+
+        return volume_ma, volume_ratio, self.pvt
+
+
+class DivergenceState:
+    """
+    Price/oscillator divergence flag (vectorized.divergence, bar by bar)
+
+    With pivot_window 0 each bar is compared with the one lookback - 1
+    earlier. Otherwise the last two swing lows/highs (pivot_window bars each
+    side) are compared, which costs O(pivot_window) per bar.
+    """
+    __slots__ = ('lookback', 'pivot_window', 'bars', 'count', 'lows', 'highs')
+
+    def __init__(self, lookback, pivot_window=0):
+        self.lookback = lookback
+        self.pivot_window = pivot_window
+        size = 2 * pivot_window + 1 if pivot_window > 0 else lookback
+        self.bars = deque(maxlen=size)  # (bar number, low, high, oscillator)
+        self.count = 0
+        self.lows = deque(maxlen=2)  # latest confirmed pivots: (bar number, price, oscillator)
+        self.highs = deque(maxlen=2)
+
+    def update(self, low, high, oscillator):
+        self.bars.append((self.count, low, high, oscillator))
+        self.count += 1
+
+        if self.pivot_window == 0:
+            _, first_low, first_high, first_osc = self.bars[0]
+            if low < first_low and oscillator > first_osc:
+                return 1.0
+            if high > first_high and oscillator < first_osc:
+                return -1.0
+            return 0.0
+
+        if len(self.bars) == self.bars.maxlen:
+            number, center_low, center_high, center_osc = self.bars[self.pivot_window]
+            if center_low == min(bar[1] for bar in self.bars):
+                self.lows.append((number, center_low, center_osc))
+            if center_high == max(bar[2] for bar in self.bars):
+                self.highs.append((number, center_high, center_osc))
+
+        bar_number = self.count - 1
+        if len(self.lows) == 2:
+            (_, prev_price, prev_osc), (number, price, osc) = self.lows
+            if price < prev_price and osc > prev_osc and bar_number - number <= self.lookback:
+                return 1.0
+        if len(self.highs) == 2:
+            (_, prev_price, prev_osc), (number, price, osc) = self.highs
+            if price > prev_price and osc < prev_osc and bar_number - number <= self.lookback:
+                return -1.0
+        return 0.0
+
+
+class IndicatorStream:
+    """
+    Stateful, bar-by-bar version of TechnicalIndicators.calculate_all
+
+    Each indicator keeps its own O(1) state, so feeding a new closed bar costs
+    the same no matter how much history sits behind it. Only the last
+    `max_history` fully-warmed rows are kept for to_frame(), which reuses
+    its previous frame and only converts rows added since.
+    """
+
+    def __init__(self, max_history=500):
+        self.max_history = max_history
+        self.reset()
+
+    def reset(self):
+        """Drop all indicator state and history"""
+        self.ema_fast = EMAState(config.EMA_FAST)
+        self.ema_slow = EMAState(config.EMA_SLOW)
+        self.adx = ADXState(14)
+        self.bollinger = BollingerState(20, 2)
+        self.rsi = RSIState(config.RSI_PERIOD)
+        self.stochastic = StochasticState(config.STOCH_PERIOD, config.STOCH_SMOOTH_K)
+        self.macd = MACDState(config.MACD_FAST, config.MACD_SLOW, config.MACD_SIGNAL)
+        self.atr = ATRState(config.ATR_PERIOD)
+        self.volume = VolumeState(20)
+        self.rsi_div = DivergenceState(config.DIVERGENCE_LOOKBACK, config.DIVERGENCE_PIVOT_WINDOW)
+        self.macd_div = DivergenceState(config.DIVERGENCE_LOOKBACK, config.DIVERGENCE_PIVOT_WINDOW)
+
+        self.rows = deque(maxlen=self.max_history)
+        self.index = deque(maxlen=self.max_history)
+        self.last_timestamp = None
+        self.index_name = None
+        self.bars_seen = 0
+        # last to_frame() result and the rows appended after it
+        self._frame = None
+        self._fresh = 0
+
+    def update(self, timestamp, bar):
+        """
+        Feed one closed bar
+
+        Args:
+            timestamp: Bar open time
+            bar: Mapping with Open, High, Low, Close, Volume
+
+        Returns:
+            dict of indicator values for this bar
+        """
+        open_ = float(bar['Open'])
+        high = float(bar['High'])
+        low = float(bar['Low'])
+        close = float(bar['Close'])
+        volume = float(bar['Volume'])
+
+        rsi = self.rsi.update(close)
+        macd = self.macd.update(close)
+        values = [
+            self.ema_fast.update(close),
+            self.ema_slow.update(close),
+            *self.adx.update(high, low, close),
+            *self.bollinger.update(close),
+            rsi,
+            *self.stochastic.update(high, low, close),
+            *macd,
+            self.atr.update(high, low, close),
+            *self.volume.update(close, volume),
+            self.rsi_div.update(low, high, rsi),
+            self.macd_div.update(low, high, macd[0])
+        ]
+
+        self.last_timestamp = timestamp
+        self.bars_seen += 1
+
+        # Only complete rows are kept, like calculate_all (NaN or inf anywhere drops the row)
+        if all(math.isfinite(v) for v in values):
+            self.rows.append([open_, high, low, close, volume] + values)
+            self.index.append(timestamp)
+            self._fresh += 1
+
+        return dict(zip(INDICATOR_COLUMNS, values))
+
+    def extend(self, df):
+        """
+        Feed every bar of df newer than the last one seen
+
+        Returns:
+            Number of bars consumed
+        """
+        if self.last_timestamp is not None:
+            df = df[df.index > self.last_timestamp]
+        self.index_name = df.index.name
+
+        for timestamp, o, h, l, c, v in df[OHLCV_COLUMNS].itertuples(name=None):
+            self.update(timestamp, {'Open': o, 'High': h, 'Low': l, 'Close': c, 'Volume': v})
+
+        return len(df)
+
+    def seed(self, df):
+        """Reset and warm the stream up from an existing OHLCV DataFrame"""
+        self.reset()
+        self.extend(df)
+        return self
+
+    def _rows_frame(self, start):
+        rows = list(itertools.islice(self.rows, start, None))
+        index = list(itertools.islice(self.index, start, None))
+        index = pd.DatetimeIndex(index, name=self.index_name) if index else None
+        return pd.DataFrame(rows, index=index, columns=OHLCV_COLUMNS + INDICATOR_COLUMNS)
+
+    def to_frame(self):
+        """
+        Recent history in the same layout calculate_all returns
+
+        The frame is cached between calls (treat it as read-only): with no
+        new rows it is returned as is, otherwise only the new rows are
+        converted and appended to it.
+        """
+        if self._frame is None or self._fresh >= len(self.rows):
+            self._frame = self._rows_frame(0)
+        elif self._fresh:
+            fresh = self._rows_frame(len(self.rows) - self._fresh)
+            self._frame = pd.concat([self._frame.iloc[len(self._frame) + self._fresh - len(self.rows):], fresh])
+        self._fresh = 0
+        return self._frame
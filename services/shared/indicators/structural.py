@@ -1,121 +1,293 @@
 import pandas as pd
 import numpy as np
+import config
 from data.market_hours import MarketHours
+from indicators.rolling import rolling_max, rolling_min
+from data.bar_series import BarSeries
+from indicators.level_index import LevelIndex, PIP_SIZE
+from indicators.pivots import fractal_pivots, pivot_positions, latest_pivot
+from indicators.calendar_levels import (CALENDAR_LEVELS, CalendarLevels, calendar_level_series,
+                                        previous_day_from_daily)
+
+SWEEP_ABOVE = 1
+SWEEP_BELOW = -1
+SWEEP_DIRECTIONS = {SWEEP_ABOVE: 'above', SWEEP_BELOW: 'below'}
+
+
+def sweep_events(high, low, close, levels):
+    """Liquidity sweeps of every level at every bar in one pass.
+
+    Bar i sweeps a level from above when its High pierces it after bar i-1's
+    High did not and bar i or i+1 closes back below (mirrored for Lows).
+    Returns dict of arrays 'bar', 'level' (position in levels), 'direction'
+    (SWEEP_ABOVE/SWEEP_BELOW) and 'price', ordered by bar, level, then
+    below before above.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    levels = np.asarray(levels, dtype=np.float64).reshape(1, -1)
+    if len(close) < 3 or levels.size == 0:
+        empty = np.empty(0, dtype=np.intp)
+        return {'bar': empty, 'level': empty.copy(), 'direction': np.empty(0, dtype=np.int8),
+                'price': np.empty(0)}
+
+    # rows are bars 1..n-2, columns are levels
+    bar_high, prev_high = high[1:-1, None], high[:-2, None]
+    bar_low, prev_low = low[1:-1, None], low[:-2, None]
+    bar_close, next_close = close[1:-1, None], close[2:, None]
+    above = (bar_high > levels) & (prev_high <= levels) & ((bar_close < levels) | (next_close < levels))
+    below = (bar_low < levels) & (prev_low >= levels) & ((bar_close > levels) | (next_close > levels))
+
+    rows, level_ids, side = np.nonzero(np.stack((below, above), axis=2))
+    bars = rows + 1
+    direction = np.where(side == 1, SWEEP_ABOVE, SWEEP_BELOW).astype(np.int8)
+    price = np.where(side == 1, high[bars], low[bars])
+    return {'bar': bars, 'level': level_ids, 'direction': direction, 'price': price}
+
+
+def latest_sweep(events, level, stops, lookback):
+    """Index of the newest event for one level in the window [stop - lookback, stop), per stop; -1 if none."""
+    stops = np.asarray(stops)
+    chosen = np.flatnonzero(events['level'] == level)
+    if len(chosen) == 0:
+        return np.full(stops.shape, -1)
+    # last event on a bar <= stop - 2 (a same-bar sweep from above sorts last)
+    bars = events['bar'][chosen]
+    position = np.searchsorted(bars, stops - 1, side='left') - 1
+    clipped = np.maximum(position, 0)
+    found = (position >= 0) & (bars[clipped] >= stops - lookback + 1)
+    return np.where(found, chosen[clipped], -1)
 
 
 class StructuralLevels:
-    def __init__(self):
+    # Bars of history each level looks back over
+    SWING_LOOKBACK = 50
+    FIBONACCI_LOOKBACK = 100
+    SWEEP_LOOKBACK = 10
+    # Round-number levels: steps of ROUND_STEP_PIPS ($50 on gold) around
+    # the nearest step below price
+    ROUND_STEP_PIPS = 500
+    ROUND_OFFSETS = (-2, -1, 0, 1, 2)
+
+    def __init__(self, pip_size=None):
+        # price move of one pip of the symbol (default: gold's)
+        self.pip_size = pip_size or PIP_SIZE
+        self.round_step = round(self.ROUND_STEP_PIPS * self.pip_size, 10)
         self.market_hours = MarketHours()
+        # day/week/month levels, rebuilt once per day boundary
+        self.calendar = CalendarLevels()
+        # 0 = swing levels from the lookback range, N = fractal pivots of order N
+        self.pivot_order = config.SWING_PIVOT_ORDER
+        # orders whose newest pivots are extra levels (swing_high_N / swing_low_N)
+        self.pivot_orders = tuple(sorted(set(config.SWING_PIVOT_ORDERS)))
+
+    def history_bars(self, timeframe='H4'):
+        """Rows identify_key_levels reads: the swing/Fibonacci lookbacks and the month back to the bar before its open."""
+        month = 34 * 24 * 60 // config.TIMEFRAME_MINUTES[timeframe] + 1
+        return max(self.SWING_LOOKBACK, self.FIBONACCI_LOOKBACK, month)
 
     def identify_key_levels(self, df_h4, df_daily=None):
         levels = {}
         try:
-            pd_levels = self.market_hours.get_previous_day_levels(df_h4)
-            if pd_levels:
-                levels.update(pd_levels)
-            asian_high, asian_low = self.market_hours.get_asian_range(df_h4)
+            # session filters and resampling need a DatetimeIndex frame
+            frame = df_h4.to_frame(('Open', 'High', 'Low', 'Close')) if isinstance(df_h4, BarSeries) else df_h4
+            # day/week/month levels from the bars themselves (df_daily overrides the previous day)
+            levels.update(self.calendar.levels(frame))
+            if df_daily is not None:
+                levels.update(previous_day_from_daily(df_daily, frame.index[-1].normalize()))
+            asian_high, asian_low = self.market_hours.get_asian_range(frame)
             if asian_high and asian_low:
                 levels['asian_high'] = asian_high
                 levels['asian_low'] = asian_low
-            levels['weekly_open'] = self.get_weekly_open(df_h4)
+            levels['weekly_open'] = self.get_weekly_open(frame)
             swing_high, swing_low = self.find_recent_swing_points(df_h4)
             levels['swing_high'] = swing_high
             levels['swing_low'] = swing_low
+            levels.update(self.find_fractal_pivots(df_h4))
             levels['fibonacci'] = self.calculate_fibonacci_levels(df_h4)
-            current_price = df_h4['Close'].iloc[-1]
+            current_price = np.asarray(df_h4['Close'])[-1]
             levels['round_numbers'] = self.get_round_number_levels(current_price)
             return levels
         except Exception as e:
             print(f'Error identifying structural levels: {e}')
             return {}
 
+    def levels_table(self, df_h4, history=None):
+        """Every key level as of every bar in one vectorized pass, aligned to df_h4.index.
+
+        Row i equals identify_key_levels(df_h4.iloc[:i+1]), or over the last
+        `history` bars up to i when given (like StructuralLevelTracker).
+        Missing levels are NaN; levels_at turns a row back into the dict layout.
+        """
+        index = df_h4.index
+        length = len(index)
+        window = history or max(length, 1)
+        open_ = np.asarray(df_h4['Open'], dtype=np.float64)
+        high = np.asarray(df_h4['High'], dtype=np.float64)
+        low = np.asarray(df_h4['Low'], dtype=np.float64)
+        close = np.asarray(df_h4['Close'], dtype=np.float64)
+        positions = np.arange(length)
+
+        columns = calendar_level_series(index, open_, high, low, close, history)
+
+        # Asian session bars (00:00-08:00, both ends) inside the window
+        asian = np.asarray((index - index.normalize()) <= pd.Timedelta(hours=8))
+        asian_high = rolling_max(np.where(asian, high, -np.inf), window, min_periods=1)
+        asian_low = rolling_min(np.where(asian, low, np.inf), window, min_periods=1)
+        seen = np.isfinite(asian_high) & np.isfinite(asian_low)
+        columns['asian_high'] = np.where(seen, asian_high, np.nan)
+        columns['asian_low'] = np.where(seen, asian_low, np.nan)
+
+        # first bar of each Monday-based week, clipped to the window
+        week = np.asarray(index.normalize() - pd.to_timedelta(index.dayofweek, unit='D'))
+        new_week = np.ones(length, dtype=bool)
+        new_week[1:] = week[1:] != week[:-1]
+        week_first = np.maximum.accumulate(np.where(new_week, positions, 0))
+        columns['weekly_open'] = open_[np.maximum(week_first, positions - window + 1)]
+
+        swing_window = min(self.SWING_LOOKBACK, window)
+        columns['swing_high'], columns['swing_low'] = self._swing_series(high, low, swing_window)
+        for order, (pivot_highs, pivot_lows) in fractal_pivots(high, low, self.pivot_orders).items():
+            columns[f'swing_high_{order}'] = latest_pivot(high, pivot_highs, order, swing_window)
+            columns[f'swing_low_{order}'] = latest_pivot(low, pivot_lows, order, swing_window)
+
+        fib_window = min(self.FIBONACCI_LOOKBACK, window)
+        fib_levels = self.fibonacci_from_range(*self._swing_series(high, low, fib_window))
+        for name, values in fib_levels.items():
+            columns[f'fib_{name}'] = values
+
+        base = np.trunc(close / self.round_step) * self.round_step
+        for offset in self.ROUND_OFFSETS:
+            columns[f'round_{offset:+d}'] = base + offset * self.round_step
+
+        return pd.DataFrame(columns, index=index)
+
+    def levels_at(self, table, position):
+        """Row `position` of a levels_table in identify_key_levels layout."""
+        row = dict(zip(table.columns, table.to_numpy()[position]))
+        levels = {name: row[name] for name in CALENDAR_LEVELS if row[name] == row[name]}
+        if row['asian_high'] == row['asian_high'] and row['asian_high'] and row['asian_low']:
+            levels['asian_high'] = row['asian_high']
+            levels['asian_low'] = row['asian_low']
+        for name in ('weekly_open', 'swing_high', 'swing_low'):
+            levels[name] = row[name]
+        levels.update({name: row[name] for name in table.columns
+                       if name.startswith(('swing_high_', 'swing_low_')) and row[name] == row[name]})
+        levels['fibonacci'] = {name[4:]: row[name] for name in table.columns if name.startswith('fib_')}
+        levels['round_numbers'] = [row[f'round_{offset:+d}'] for offset in self.ROUND_OFFSETS]
+        return levels
+
     def get_weekly_open(self, df):
         try:
             return df.resample('W-MON', label='left', closed='left').first()['Open'].iloc[-1]
         except Exception:
             return df['Open'].iloc[0]
 
-    def find_recent_swing_points(self, df, lookback=50):
+    def find_recent_swing_points(self, df, lookback=SWING_LOOKBACK):
+        """Newest order-N fractal pivots in the lookback (pivot_order N), else the high/low range."""
         try:
-            recent = df.tail(lookback)
-            return recent['High'].max(), recent['Low'].min()
+            return self._swing_points(df, lookback)
         except Exception:
             return None, None
 
-    def calculate_fibonacci_levels(self, df, lookback=100):
+    def find_fractal_pivots(self, df, lookback=SWING_LOOKBACK):
+        """Newest pivot high/low of each of pivot_orders in the lookback as swing_high_N / swing_low_N."""
+        highs = np.asarray(df['High'], dtype=np.float64)[-lookback:]
+        lows = np.asarray(df['Low'], dtype=np.float64)[-lookback:]
+        levels = {}
+        for order, (pivot_highs, pivot_lows) in fractal_pivots(highs, lows, self.pivot_orders).items():
+            if len(pivot_highs):
+                levels[f'swing_high_{order}'] = highs[pivot_highs[-1]]
+            if len(pivot_lows):
+                levels[f'swing_low_{order}'] = lows[pivot_lows[-1]]
+        return levels
+
+    def swing_range_series(self, df, lookback=SWING_LOOKBACK):
+        """Swing high/low as of every bar in one O(n) pass (for backtests)."""
+        return (rolling_max(df['High'], lookback, min_periods=1),
+                rolling_min(df['Low'], lookback, min_periods=1))
+
+    def calculate_fibonacci_levels(self, df, lookback=FIBONACCI_LOOKBACK):
         try:
-            recent = df.tail(lookback)
-            high = recent['High'].max()
-            low = recent['Low'].min()
-            r = high - low
-            return {
-                '0.0': low,
-                '23.6': low + r * 0.236,
-                '38.2': low + r * 0.382,
-                '50.0': low + r * 0.500,
-                '61.8': low + r * 0.618,
-                '78.6': low + r * 0.786,
-                '100.0': high,
-            }
+            return self.fibonacci_from_range(*self._swing_points(df, lookback))
         except Exception:
             return {}
 
+    def fibonacci_from_range(self, high, low):
+        r = high - low
+        return {
+            '0.0': low,
+            '23.6': low + r * 0.236,
+            '38.2': low + r * 0.382,
+            '50.0': low + r * 0.500,
+            '61.8': low + r * 0.618,
+            '78.6': low + r * 0.786,
+            '100.0': high,
+        }
+
+    def _swing_range(self, df, lookback):
+        return np.asarray(df['High'])[-lookback:].max(), np.asarray(df['Low'])[-lookback:].min()
+
+    def _swing_points(self, df, lookback):
+        swing_high, swing_low = self._swing_range(df, lookback)
+        if not self.pivot_order:
+            return swing_high, swing_low
+        highs = np.asarray(df['High'], dtype=np.float64)[-lookback:]
+        lows = np.asarray(df['Low'], dtype=np.float64)[-lookback:]
+        pivot_highs = pivot_positions(highs, self.pivot_order, highs=True)
+        pivot_lows = pivot_positions(lows, self.pivot_order, highs=False)
+        if len(pivot_highs):
+            swing_high = highs[pivot_highs[-1]]
+        if len(pivot_lows):
+            swing_low = lows[pivot_lows[-1]]
+        return swing_high, swing_low
+
+    def _swing_series(self, high, low, window):
+        """_swing_points as of every bar."""
+        swing_highs = rolling_max(high, window, min_periods=1)
+        swing_lows = rolling_min(low, window, min_periods=1)
+        if not self.pivot_order:
+            return swing_highs, swing_lows
+        order = self.pivot_order
+        pivot_highs = latest_pivot(high, pivot_positions(high, order, highs=True), order, window)
+        pivot_lows = latest_pivot(low, pivot_positions(low, order, highs=False), order, window)
+        return (np.where(np.isnan(pivot_highs), swing_highs, pivot_highs),
+                np.where(np.isnan(pivot_lows), swing_lows, pivot_lows))
+
     def get_round_number_levels(self, current_price):
         try:
-            base = int(current_price / 50) * 50
-            return [base - 100, base - 50, base, base + 50, base + 100]
+            base = np.trunc(current_price / self.round_step) * self.round_step
+            return [base + offset * self.round_step for offset in self.ROUND_OFFSETS]
         except Exception:
             return []
 
+    def key_level_index(self, df_h4):
+        """identify_key_levels as a flat, price-sorted LevelIndex (empty when none were found)."""
+        return LevelIndex.from_levels(self.identify_key_levels(df_h4))
+
     def find_nearest_level(self, current_price, levels, max_distance_pips=20):
+        """levels: identify_key_levels dict or LevelIndex. Returns (price, name, distance_pips)."""
         try:
-            nearest_level = None
-            nearest_distance = float('inf')
-            nearest_name = None
-
-            for level_name, level_price in levels.items():
-                if level_name == 'fibonacci':
-                    for fib_name, fib_price in level_price.items():
-                        dist = abs(current_price - fib_price) / 0.10
-                        if dist <= max_distance_pips and dist < nearest_distance:
-                            nearest_distance = dist
-                            nearest_level = fib_price
-                            nearest_name = f'Fib {fib_name}'
-                    continue
-                if level_name == 'round_numbers':
-                    for rn in level_price:
-                        dist = abs(current_price - rn) / 0.10
-                        if dist <= max_distance_pips and dist < nearest_distance:
-                            nearest_distance = dist
-                            nearest_level = rn
-                            nearest_name = f'Round ${int(rn)}'
-                    continue
-                if level_price is not None:
-                    dist = abs(current_price - level_price) / 0.10
-                    if dist <= max_distance_pips and dist < nearest_distance:
-                        nearest_distance = dist
-                        nearest_level = level_price
-                        nearest_name = level_name.upper()
-
-            return (nearest_level, nearest_name, nearest_distance) if nearest_level else (None, None, None)
+            index = levels if isinstance(levels, LevelIndex) else LevelIndex.from_levels(levels)
+            positions, distances = index.nearest(current_price, max_distance_pips, self.pip_size)
+            if positions[0] >= 0:
+                return index.prices[positions[0]], index.names[positions[0]], distances[0]
+            return None, None, None
         except Exception as e:
             print(f'Error finding nearest level: {e}')
             return None, None, None
 
-    def check_liquidity_sweep(self, df, level_price, lookback=10):
+    def check_liquidity_sweep(self, df, level_price, lookback=SWEEP_LOOKBACK):
         try:
-            recent = df.tail(lookback)
-            for i in range(len(recent) - 2, 0, -1):
-                bar = recent.iloc[i]
-                prev_bar = recent.iloc[i - 1]
-                next_bar = recent.iloc[i + 1]
-                if bar['High'] > level_price and prev_bar['High'] <= level_price:
-                    if bar['Close'] < level_price or next_bar['Close'] < level_price:
-                        return {'detected': True, 'direction': 'above', 'sweep_price': bar['High']}
-                if bar['Low'] < level_price and prev_bar['Low'] >= level_price:
-                    if bar['Close'] > level_price or next_bar['Close'] > level_price:
-                        return {'detected': True, 'direction': 'below', 'sweep_price': bar['Low']}
-            return {'detected': False, 'direction': 'none'}
+            window = slice(-lookback, None)
+            events = sweep_events(np.asarray(df['High'])[window], np.asarray(df['Low'])[window],
+                                  np.asarray(df['Close'])[window], [level_price])
+            if len(events['bar']) == 0:
+                return {'detected': False, 'direction': 'none'}
+            # newest bar wins; at the same bar a sweep from above is checked first
+            return {'detected': True, 'direction': SWEEP_DIRECTIONS[int(events['direction'][-1])],
+                    'sweep_price': events['price'][-1]}
         except Exception as e:
             print(f'Error checking liquidity sweep: {e}')
             return {'detected': False, 'direction': 'none'}
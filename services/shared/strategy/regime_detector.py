@@ -1,14 +1,18 @@
 import config
+from data.bar_series import BarSeries
 
 
 class RegimeDetector:
+    REQUIRED_COLUMNS = ('ADX', 'EMA_20', 'EMA_50', 'BB_upper', 'BB_lower')
+
     def detect_regime(self, df):
         try:
-            adx = df['ADX'].iloc[-1]
-            ema_20 = df['EMA_20'].iloc[-1]
-            ema_50 = df['EMA_50'].iloc[-1]
-            close = df['Close'].iloc[-1]
-            bb_width = (df['BB_upper'].iloc[-1] - df['BB_lower'].iloc[-1]) / close
+            bars = BarSeries.wrap(df)
+            adx = bars.last('ADX')
+            ema_20 = bars.last('EMA_20')
+            ema_50 = bars.last('EMA_50')
+            close = bars.last('Close')
+            bb_width = (bars.last('BB_upper') - bars.last('BB_lower')) / close
 
             if adx > config.ADX_THRESHOLD_TRENDING:
                 return ('trending_bull', adx) if ema_20 > ema_50 else ('trending_bear', adx)
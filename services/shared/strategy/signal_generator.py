@@ -9,9 +9,13 @@ from strategy.regime_detector import RegimeDetector
 from strategy.risk_manager import RiskManager
 from indicators.technical import TechnicalIndicators
 from indicators.structural import StructuralLevels
+from data.bar_series import BarSeries
 
 
 class SignalGenerator:
+    H4_COLUMNS = RegimeDetector.REQUIRED_COLUMNS
+    M15_COLUMNS = ('RSI', 'Stoch_K', 'Stoch_D', 'Volume_Ratio', 'RSI_div', 'MACD_div')
+
     def __init__(self):
         self.market_hours = MarketHours()
         self.regime_detector = RegimeDetector()
@@ -19,12 +23,21 @@ class SignalGenerator:
         self.technical = TechnicalIndicators()
         self.structural = StructuralLevels()
 
-    def generate_signal(self, df_h4, df_m15, timestamp=None):
+    def history_bars(self, timeframe):
+        """Rows of warmed-up history generate_signal reads: structural levels on H4, the sweep window on M15."""
+        if timeframe == config.TIMEFRAME_H4:
+            return self.structural.history_bars(timeframe)
+        return StructuralLevels.SWEEP_LOOKBACK
+
+    def generate_signal(self, df_h4, df_m15, timestamp=None, levels=None):
         """
         Generate a trading signal from H4 (trend/structure) and M15 (entry) data.
+        levels: optional precomputed key levels (e.g. StructuralLevelTracker.level_index()).
         Returns a signal dict or None.
         """
         try:
+            df_h4 = BarSeries.wrap(df_h4)
+            df_m15 = BarSeries.wrap(df_m15)
             should_trade, reason = self.market_hours.should_trade_now(timestamp)
             if not should_trade:
                 return None
@@ -33,11 +46,12 @@ class SignalGenerator:
             if not self.regime_detector.is_favorable_regime(regime):
                 return None
 
-            levels = self.structural.identify_key_levels(df_h4)
+            if levels is None:
+                levels = self.structural.key_level_index(df_h4)
             if not levels:
                 return None
 
-            current_price = df_m15['Close'].iloc[-1]
+            current_price = df_m15.last('Close')
             nearest_level, level_name, distance = self.structural.find_nearest_level(current_price, levels)
             if not nearest_level:
                 return None
@@ -65,10 +79,10 @@ class SignalGenerator:
 
     def _check_long_conditions(self, df, current_price, level, regime):
         try:
-            rsi = df['RSI'].iloc[-1]
-            stoch_k = df['Stoch_K'].iloc[-1]
-            stoch_d = df['Stoch_D'].iloc[-1]
-            rsi_div = self.technical.check_rsi_divergence(df)
+            rsi = df.last('RSI')
+            stoch_k = df.last('Stoch_K')
+            stoch_d = df.last('Stoch_D')
+            rsi_div = self.technical.divergence_label(df, 'RSI_div')
 
             rsi_ok = rsi < config.RSI_OVERSOLD or rsi_div == 'bullish'
             stoch_ok = stoch_k > stoch_d and stoch_k < 30
@@ -83,10 +97,10 @@ class SignalGenerator:
 
     def _check_short_conditions(self, df, current_price, level, regime):
         try:
-            rsi = df['RSI'].iloc[-1]
-            stoch_k = df['Stoch_K'].iloc[-1]
-            stoch_d = df['Stoch_D'].iloc[-1]
-            rsi_div = self.technical.check_rsi_divergence(df)
+            rsi = df.last('RSI')
+            stoch_k = df.last('Stoch_K')
+            stoch_d = df.last('Stoch_D')
+            rsi_div = self.technical.divergence_label(df, 'RSI_div')
 
             rsi_ok = rsi > config.RSI_OVERBOUGHT or rsi_div == 'bearish'
             stoch_ok = stoch_k < stoch_d and stoch_k > 70
@@ -141,15 +155,15 @@ class SignalGenerator:
     def _calculate_confidence(self, df, regime, pip_risk):
         try:
             confidence = 50
-            if self.technical.check_rsi_divergence(df):
+            if self.technical.divergence_label(df, 'RSI_div'):
                 confidence += 15
-            if self.technical.check_macd_divergence(df):
+            if self.technical.divergence_label(df, 'MACD_div'):
                 confidence += 10
             if regime in ('range', 'breakout_pending'):
                 confidence += 10
             if pip_risk < 20:
                 confidence += 10
-            if df['Volume_Ratio'].iloc[-1] > 1.2:
+            if df.last('Volume_Ratio') > 1.2:
                 confidence += 5
             return min(confidence, 100)
         except Exception:
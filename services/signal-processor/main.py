@@ -28,9 +28,18 @@ log = logging.getLogger('signal-processor')
 
 KAFKA_BROKER = os.getenv('KAFKA_BROKER', 'redpanda:9092')
 METRICS_PORT = int(os.getenv('METRICS_PORT', 8001))
-MIN_H4_BARS = int(os.getenv('MIN_H4_BARS', 60))
-MIN_M15_BARS = int(os.getenv('MIN_M15_BARS', 100))
-MAX_TICKS = int(os.getenv('MAX_TICKS', 50000))  # rolling tick buffer size
+# Bar thresholds and kept history default to what the indicators and signal
+# logic actually read (see bar_plan); a non-zero env value overrides.
+MIN_H4_BARS = int(os.getenv('MIN_H4_BARS', 0))
+MIN_M15_BARS = int(os.getenv('MIN_M15_BARS', 0))
+# Rolling tick buffer size. The default holds ~260 H4 bars of simulated ticks,
+# enough for every indicator to converge without a history store.
+MAX_TICKS = int(os.getenv('MAX_TICKS', 150000))
+HISTORY_BARS = int(os.getenv('HISTORY_BARS', 0))  # indicator rows kept per timeframe
+# Tick density the buffer is sized for: tick-ingestion interpolates
+# TICKS_PER_BAR ticks per 5-minute bar (its densest mode).
+TICKS_PER_BAR = int(os.getenv('TICKS_PER_BAR', 12))
+TICK_BAR_SECONDS = 300
 
 ticks_consumed = Counter('signal_processor_ticks_consumed_total', 'Ticks consumed from raw.ticks')
 signals_generated = Counter('signal_processor_signals_total', 'Trading signals generated')
@@ -90,27 +99,167 @@ class TickBuffer:
         return False
 
 
-def build_signal_dfs(buffer: TickBuffer):
-    """Resample buffer and calculate indicators. Run in thread pool to avoid blocking."""
-    import sys, os as _os
-    sys.path.insert(0, '/app/shared')
+# Incremental indicator state per resample frequency, fed with closed bars only.
+_streams: dict = {}
+
+_FREQ_TIMEFRAMES = {'15min': 'M15', '4h': 'H4'}
+_bar_plans: dict = {}
+
+
+def buffer_bars(freq: str, max_ticks: int = None) -> int:
+    """Closed bars of freq the tick buffer can hold (its oldest bar is partial)."""
+    seconds = (max_ticks or MAX_TICKS) / TICKS_PER_BAR * TICK_BAR_SECONDS
+    return int(seconds // pd.Timedelta(freq).total_seconds()) - 1
+
+
+def bar_plan(freq: str) -> tuple[int, int]:
+    """(closed bars needed before signalling, indicator rows to keep) for freq.
+
+    The stream computes every indicator column, so the minimum is their
+    converged warm-up plus the history generate_signal reads. Without a
+    history store the tick buffer is the only source of bars, so the
+    minimum is capped at what it holds (check_bar_plan rejects a buffer
+    too small for the newest row to converge).
+    """
+    plan = _bar_plans.get(freq)
+    if plan is None:
+        import config
+        from indicators.technical import TechnicalIndicators
+        from strategy.signal_generator import SignalGenerator
+
+        timeframe = _FREQ_TIMEFRAMES[freq]
+        history = HISTORY_BARS or SignalGenerator().history_bars(timeframe)
+        minimum = {'M15': MIN_M15_BARS, 'H4': MIN_H4_BARS}[timeframe]
+        if not minimum:
+            minimum = TechnicalIndicators.required_bars(history=history)
+            if not config.HISTORY_STORE_DIR:
+                minimum = min(minimum, buffer_bars(freq))
+        plan = _bar_plans[freq] = (minimum, history)
+    return plan
 
+
+def check_bar_plan() -> None:
+    """Raise if the tick buffer can never satisfy bar_plan (the service would never signal)."""
+    import config
     from indicators.technical import TechnicalIndicators
 
-    tech = TechnicalIndicators()
-    df_m15 = buffer.to_ohlcv('15min')
-    df_h4 = buffer.to_ohlcv('4h')
+    if config.HISTORY_STORE_DIR:
+        return
+    for freq, timeframe in _FREQ_TIMEFRAMES.items():
+        minimum, held = bar_plan(freq)[0], buffer_bars(freq)
+        explicit = {'M15': MIN_M15_BARS, 'H4': MIN_H4_BARS}[timeframe]
+        # the derived minimum is already capped at `held`; it must still leave a converged row
+        needed = explicit or TechnicalIndicators.required_bars(history=1)
+        if held < needed:
+            ticks = (needed + 1) * int(pd.Timedelta(freq).total_seconds()) // TICK_BAR_SECONDS * TICKS_PER_BAR
+            raise RuntimeError(
+                f'Tick buffer holds {held} closed {timeframe} bars but signalling needs {needed}: '
+                f'raise MAX_TICKS to at least {ticks} or set HISTORY_STORE_DIR'
+            )
+        log.info(f'{timeframe}: signalling after {minimum} closed bars (buffer holds {held})')
+
+
+def _indicator_frame(freq: str, ohlcv: pd.DataFrame) -> pd.DataFrame:
+    """Advance the indicator stream for freq with newly closed bars; O(1) per bar."""
+    from indicators.technical import TechnicalIndicators
+
+    closed = ohlcv.iloc[:-1]  # last bar is still forming
+    stream = _streams.get(freq)
+    if stream is None or stream.last_timestamp not in closed.index:
+        # First run, or the tick buffer rolled past the last bar we saw: reseed.
+        stream = TechnicalIndicators().create_stream(closed, max_history=bar_plan(freq)[1])
+        _streams[freq] = stream
+    else:
+        stream.extend(closed)
+    return stream.to_frame()
+
+
+# Structural levels kept current from closed bars, per resample frequency.
+_level_trackers: dict = {}
+
+
+def _key_levels(freq: str, ohlcv: pd.DataFrame):
+    """Advance the level tracker for freq with newly closed bars; returns its LevelIndex."""
+    from indicators.level_tracker import StructuralLevelTracker
+
+    closed = ohlcv.iloc[:-1]  # last bar is still forming
+    tracker = _level_trackers.get(freq)
+    if tracker is None or tracker.last_timestamp not in closed.index:
+        # same window as the indicator rows the stream keeps
+        tracker = StructuralLevelTracker(history=bar_plan(freq)[1]).seed(closed)
+        _level_trackers[freq] = tracker
+    else:
+        tracker.extend(closed)
+    return tracker.level_index()
+
+
+# On-disk bar history (HISTORY_STORE_DIR): warms the frames up past what the
+# tick buffer holds and keeps the closed tick bars for backtests.
+_history = {}
+_archived: dict = {}
+
+
+def _history_store():
+    """The shared HistoryStore, or None when HISTORY_STORE_DIR is unset."""
+    if 'store' not in _history:
+        import config
+        from data.history_store import HistoryStore
+
+        _history['store'] = HistoryStore(config.HISTORY_STORE_DIR) if config.HISTORY_STORE_DIR else None
+    return _history['store']
+
+
+def _with_history(freq: str, ohlcv: pd.DataFrame) -> pd.DataFrame:
+    """Archive newly closed bars of freq and prepend stored bars the buffer lacks.
+
+    The oldest buffered bar is usually partial (the buffer started or rolled
+    mid-bar), so it is neither archived nor kept when the store has it.
+    """
+    store = _history_store()
+    if store is None or len(ohlcv) < 2:
+        return ohlcv
+
+    import config
+
+    timeframe = _FREQ_TIMEFRAMES[freq]
+    try:
+        closed = ohlcv.iloc[1:-1]  # the last bar is still forming
+        fresh = closed[closed.index > _archived[freq]] if freq in _archived else closed
+        if len(fresh):
+            store.append(config.SYMBOL, timeframe, fresh)
+            _archived[freq] = fresh.index[-1]
+
+        stored = store.frame(config.SYMBOL, timeframe, end=ohlcv.index[1], bars=bar_plan(freq)[0] + 1,
+                             columns=list(ohlcv.columns), tz='UTC')
+    except Exception as e:
+        log.warning(f'History store error ({timeframe}): {e}')
+        return ohlcv
+
+    if stored is None:
+        return ohlcv
+    return pd.concat([stored, ohlcv[ohlcv.index > stored.index[-1]]])
+
+
+def build_signal_dfs(buffer: TickBuffer):
+    """Resample buffer and update indicators and H4 levels. Run in thread pool to avoid blocking."""
+    import sys
+    sys.path.insert(0, '/app/shared')
+
+    df_m15 = _with_history('15min', buffer.to_ohlcv('15min'))
+    df_h4 = _with_history('4h', buffer.to_ohlcv('4h'))
 
-    if len(df_m15) < MIN_M15_BARS or len(df_h4) < MIN_H4_BARS:
-        return None, None, len(df_m15), len(df_h4)
+    # the last bar of each frame is still forming
+    if len(df_m15) - 1 < bar_plan('15min')[0] or len(df_h4) - 1 < bar_plan('4h')[0]:
+        return None, None, None, len(df_m15), len(df_h4)
 
-    df_m15 = tech.calculate_all(df_m15)
-    df_h4 = tech.calculate_all(df_h4)
+    levels = _key_levels('4h', df_h4)
+    df_m15 = _indicator_frame('15min', df_m15)
+    df_h4 = _indicator_frame('4h', df_h4)
 
     if df_m15.empty or df_h4.empty:
-        return None, None, 0, 0
+        return None, None, None, 0, 0
 
-    return df_m15, df_h4, len(df_m15), len(df_h4)
+    return df_m15, df_h4, levels, len(df_m15), len(df_h4)
 
 
 async def process_tick(
@@ -131,7 +280,7 @@ async def process_tick(
     t0 = time.monotonic()
 
     try:
-        df_m15, df_h4, n_m15, n_h4 = await loop.run_in_executor(
+        df_m15, df_h4, levels, n_m15, n_h4 = await loop.run_in_executor(
             executor, build_signal_dfs, buffer
         )
     except Exception as e:
@@ -139,7 +288,7 @@ async def process_tick(
         return
 
     if df_m15 is None:
-        log.debug(f'Not enough bars yet — M15: {n_m15}/{MIN_M15_BARS}, H4: {n_h4}/{MIN_H4_BARS}')
+        log.debug(f"Not enough bars yet — M15: {n_m15}/{bar_plan('15min')[0]}, H4: {n_h4}/{bar_plan('4h')[0]}")
         return
 
     try:
@@ -148,7 +297,7 @@ async def process_tick(
         from strategy.signal_generator import SignalGenerator
 
         gen = SignalGenerator()
-        signal = gen.generate_signal(df_h4, df_m15)
+        signal = gen.generate_signal(df_h4, df_m15, levels=levels)
     except Exception as e:
         log.error(f'Signal generation error: {e}')
         return
@@ -187,6 +336,7 @@ async def health_server() -> None:
 
 
 async def main() -> None:
+    check_bar_plan()
     start_http_server(METRICS_PORT)
     log.info(f'Prometheus metrics on :{METRICS_PORT}')
 
@@ -1,7 +1,11 @@
 import os
+import re
 import sys
 
+import pytest
+
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'shared'))
 import main  # noqa: E402
 
 
@@ -27,3 +31,50 @@ def test_buffer_respects_maxlen():
 
 def test_empty_buffer_returns_empty_frame():
     assert main.TickBuffer().to_ohlcv('15min').empty
+
+
+def test_bar_plan_fits_tick_buffer(monkeypatch):
+    import config
+    from indicators.technical import TechnicalIndicators
+
+    monkeypatch.setattr(config, 'HISTORY_STORE_DIR', '')
+    monkeypatch.setattr(main, '_bar_plans', {})
+    converged = TechnicalIndicators.required_bars(history=1)
+    for freq in ('15min', '4h'):
+        assert converged <= main.bar_plan(freq)[0] <= main.buffer_bars(freq)
+    main.check_bar_plan()
+
+    # the old 50k-tick buffer never reaches a converged H4 row: refuse to start
+    monkeypatch.setattr(main, 'MAX_TICKS', 50000)
+    monkeypatch.setattr(main, '_bar_plans', {})
+    assert main.buffer_bars('4h') < converged
+    with pytest.raises(RuntimeError, match='MAX_TICKS') as error:
+        main.check_bar_plan()
+
+    # the size it asks for is enough
+    monkeypatch.setattr(main, 'MAX_TICKS', int(re.search(r'at least (\d+)', str(error.value)).group(1)))
+    monkeypatch.setattr(main, '_bar_plans', {})
+    main.check_bar_plan()
+
+
+def test_key_levels_track_pivots_across_closes(monkeypatch):
+    import numpy as np
+    import pandas as pd
+    from indicators.structural import StructuralLevels
+
+    monkeypatch.setattr(main, '_level_trackers', {})
+    monkeypatch.setattr(main, 'bar_plan', lambda freq: (60, 200))
+    rng = np.random.default_rng(3)
+    close = 2000 + np.cumsum(rng.normal(0, 4, 300))
+    ohlcv = pd.DataFrame({'Open': close, 'High': close + 2, 'Low': close - 2, 'Close': close, 'Volume': 1.0},
+                         index=pd.date_range('2024-01-01', periods=300, freq='4h', tz='UTC'))
+
+    main._key_levels('4h', ohlcv.iloc[:250])
+    tracker = main._level_trackers['4h']
+    for end in range(251, 301):
+        index = main._key_levels('4h', ohlcv.iloc[:end])
+    # advanced bar by bar, not reseeded, and matching a batch pass over its window
+    assert main._level_trackers['4h'] is tracker and tracker.bars_seen == 200 + 50
+    expected = StructuralLevels().identify_key_levels(ohlcv.iloc[99:299])
+    assert tracker.levels() == expected
+    assert {'SWING_HIGH_3', 'SWING_LOW_3'} <= set(index.names)
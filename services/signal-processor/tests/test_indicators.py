@@ -0,0 +1,498 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'shared'))
+from indicators.streaming import INDICATOR_COLUMNS  # noqa: E402
+from indicators.technical import TechnicalIndicators  # noqa: E402
+
+
+def _ohlcv(n=400, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 2000 + np.cumsum(rng.normal(0, 1.5, n))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) + rng.random(n) * 2,
+        'Low': np.minimum(open_, close) - rng.random(n) * 2,
+        'Close': close,
+        'Volume': rng.integers(50, 500, n).astype(float),
+    }, index=pd.date_range('2024-01-01', periods=n, freq='15min'))
+
+
+def test_stream_matches_calculate_all():
+    df = _ohlcv()
+    batch = TechnicalIndicators(backend='ta').calculate_all(df)
+    streamed = TechnicalIndicators().create_stream(df, max_history=len(df)).to_frame()
+
+    assert list(streamed.index) == list(batch.index)
+    np.testing.assert_allclose(streamed[INDICATOR_COLUMNS], batch[INDICATOR_COLUMNS], rtol=1e-9)
+
+
+def test_numpy_backend_matches_ta():
+    df = _ohlcv(n=1500)
+    expected = TechnicalIndicators(backend='ta').calculate_all(df)
+    actual = TechnicalIndicators(backend='numpy').calculate_all(df)
+
+    assert list(actual.columns) == list(expected.columns)
+    assert list(actual.index) == list(expected.index)
+    np.testing.assert_allclose(actual, expected, rtol=1e-7, atol=1e-9)
+
+
+def test_numpy_backend_short_frame_is_empty_like_ta():
+    df = _ohlcv(n=40)
+    assert TechnicalIndicators(backend='numpy').calculate_all(df).empty
+    assert TechnicalIndicators(backend='ta').calculate_all(df).empty
+
+
+def test_stream_extend_only_consumes_new_bars():
+    df = _ohlcv()
+    stream = TechnicalIndicators().create_stream(df.iloc[:300], max_history=50)
+    assert stream.extend(df.iloc[:350]) == 50
+    assert stream.extend(df.iloc[:350]) == 0
+
+    full = TechnicalIndicators().create_stream(df.iloc[:350], max_history=50)
+    assert len(stream.to_frame()) == 50
+    pd.testing.assert_frame_equal(stream.to_frame(), full.to_frame())
+
+
+def test_stream_frame_is_reused_and_extended():
+    df = _ohlcv()
+    stream = TechnicalIndicators().create_stream(df.iloc[:300], max_history=50)
+    first = stream.to_frame()
+    assert stream.to_frame() is first
+
+    for end in (301, 305, 360, 400):
+        stream.extend(df.iloc[:end])
+        full = TechnicalIndicators().create_stream(df.iloc[:end], max_history=50).to_frame()
+        pd.testing.assert_frame_equal(stream.to_frame(), full)
+
+
+def test_requested_columns_only():
+    from strategy.signal_generator import SignalGenerator
+
+    df = _ohlcv()
+    wanted = SignalGenerator.M15_COLUMNS
+    full = TechnicalIndicators().calculate_all(df)
+    for backend in ('numpy', 'ta'):
+        subset = TechnicalIndicators(backend=backend).calculate_all(df, wanted)
+        assert set(subset.columns) == set(df.columns) | set(wanted)
+        np.testing.assert_allclose(subset.loc[full.index, list(wanted)], full[list(wanted)], rtol=1e-7)
+
+
+def test_indicator_cache_hits_and_evicts():
+    from indicators.cache import IndicatorCache
+
+    df = _ohlcv()
+    df.attrs.update(symbol='XAUUSD', timeframe='M15')
+    cache = IndicatorCache(max_bytes=10 ** 7)
+    tech = TechnicalIndicators(cache=cache)
+
+    first = tech.calculate_all(df)
+    hit = tech.calculate_all(df.copy())
+    assert (cache.hits, cache.misses) == (1, 1)
+    pd.testing.assert_frame_equal(hit, first)
+    assert np.shares_memory(hit['RSI'].to_numpy(), first['RSI'].to_numpy())
+
+    # a changed forming bar or another column set is a different entry
+    moved = df.copy()
+    moved.iloc[-1, moved.columns.get_loc('Close')] += 1.0
+    tech.calculate_all(moved)
+    assert cache.misses == 2
+    tech.calculate_all(df, ('RSI',))
+    assert cache.misses == 3 and len(cache) == 3
+
+    cache.max_bytes = cache.current_bytes - 1
+    cache.put(('extra',), first.iloc[:10])
+    assert cache.evictions >= 1 and cache.current_bytes <= cache.max_bytes
+
+
+def test_indicator_cache_charges_whole_block_and_is_read_only():
+    from indicators.cache import IndicatorCache
+
+    df = _ohlcv()
+    df.attrs.update(symbol='XAUUSD', timeframe='M15')
+    cache = IndicatorCache(max_bytes=10 ** 7)
+    tech = TechnicalIndicators(cache=cache)
+    first = tech.calculate_all(df)
+
+    # the trimmed view keeps the warm-up rows' block alive too
+    block = first['RSI'].to_numpy().base
+    while block.base is not None:
+        block = block.base
+    assert cache.current_bytes >= block.nbytes > first.memory_usage(index=False).sum()
+
+    close, rsi = first['Close'].iloc[-1], first['RSI'].iloc[-1]
+    hit = tech.calculate_all(df)
+    with pytest.raises(ValueError):
+        hit['RSI'].to_numpy()[-1] = 0.0
+    # writes through the computed frame or a hit either raise (no copy-on-write)
+    # or stay in the caller's copy; new columns always stay the caller's
+    for frame in (first, hit):
+        frame['Mine'] = 1.0
+        try:
+            frame.loc[frame.index[-1], ['Close', 'RSI']] = -5.0
+        except ValueError:
+            pass
+    again = tech.calculate_all(df)
+    assert cache.hits == 2
+    assert 'Mine' not in again.columns
+    assert again['Close'].iloc[-1] == close != -5.0 and again['RSI'].iloc[-1] == rsi != -5.0
+
+
+def test_calculate_all_returns_trimmed_block_view():
+    df = _ohlcv()
+    before = df.copy()
+    result = TechnicalIndicators(cache=None).calculate_all(df)
+
+    pd.testing.assert_frame_equal(df, before)
+    assert result.attrs['warmup'] == len(df) - len(result) == 49
+    assert result.index[0] == df.index[49]
+    # all columns live in one float64 block, so the frame's array is a view
+    assert np.shares_memory(result.to_numpy(), result['RSI'].to_numpy())
+
+
+def test_calculate_all_drops_undefined_rows_mid_series():
+    df = _ohlcv()
+    df.iloc[200:230, :4] = 2000.0    # flat range: Stoch_K is 0/0
+    df.iloc[300:325, 4] = 0.0        # no volume: Volume_Ratio is 0/0
+
+    for backend in ('numpy', 'ta'):
+        result = TechnicalIndicators(backend=backend, cache=None).calculate_all(df)
+        assert np.isfinite(result.to_numpy()).all()
+        assert result.attrs['warmup'] == 49 and result.index[0] == df.index[49]
+        assert df.index[215] not in result.index and df.index[260] in result.index
+
+    # same rows as the old calculate_all's dropna()
+    tech = TechnicalIndicators(backend='ta', cache=None)
+    expected = tech.add_all_ta(df.copy()).replace([np.inf, -np.inf], np.nan).dropna()
+    pd.testing.assert_index_equal(tech.calculate_all(df).index, expected.index)
+
+    streamed = TechnicalIndicators().create_stream(df, max_history=len(df)).to_frame()
+    assert list(streamed.index) == list(TechnicalIndicators(cache=None).calculate_all(df).index)
+
+
+def test_parameter_grids_match_single_period_kernels():
+    from indicators import vectorized
+
+    df = _ohlcv(n=600)
+    high, low, close = (df[name].to_numpy() for name in ('High', 'Low', 'Close'))
+    periods = [5, 9, 14, 21, 50]
+    grids = vectorized.compute_grid(high, low, close,
+                                    {'EMA': periods, 'RSI': periods, 'Stoch': periods, 'ATR': periods})
+
+    tr = vectorized.true_range(high, low, close)
+    for column, period in enumerate(periods):
+        lowest, highest = vectorized.rolling_min(low, period), vectorized.rolling_max(high, period)
+        stoch_k = 100 * (close - lowest) / (highest - lowest)
+        expected = {
+            'EMA': vectorized.ema(close, period),
+            'RSI': vectorized.rsi(close, period),
+            'ATR': vectorized.atr(tr, period),
+            'Stoch_K': stoch_k,
+            'Stoch_D': vectorized.rolling_mean(stoch_k, 3),
+        }
+        for name, values in expected.items():
+            np.testing.assert_allclose(grids[name][:, column], values, rtol=1e-9, err_msg=f'{name}({period})')
+
+
+def test_divergence_columns_match_tail_check_and_stream(monkeypatch):
+    import config
+
+    df = _ohlcv()
+    result = TechnicalIndicators(cache=None).calculate_all(df)
+
+    # pivot_window 0 reproduces the old tail(lookback) endpoint comparison
+    for end in (120, 250, len(df)):
+        recent = result.iloc[:end - 49].tail(config.DIVERGENCE_LOOKBACK)
+        low_div = recent['Low'].iloc[-1] < recent['Low'].iloc[0]
+        high_div = recent['High'].iloc[-1] > recent['High'].iloc[0]
+        rsi_up = recent['RSI'].iloc[-1] > recent['RSI'].iloc[0]
+        rsi_down = recent['RSI'].iloc[-1] < recent['RSI'].iloc[0]
+        expected = 1.0 if low_div and rsi_up else -1.0 if high_div and rsi_down else 0.0
+        assert recent['RSI_div'].iloc[-1] == expected
+
+    # another lookback recomputes instead of reading the column
+    tech = TechnicalIndicators(cache=None)
+    for end in range(100, len(df), 5):
+        window = result.iloc[:end]
+        assert tech.check_rsi_divergence(window) == tech.divergence_label(window, 'RSI_div')
+        recent = window.tail(5)
+        low_div, high_div = recent['Low'].iloc[-1] < recent['Low'].iloc[0], recent['High'].iloc[-1] > recent['High'].iloc[0]
+        rsi_up, rsi_down = recent['RSI'].iloc[-1] > recent['RSI'].iloc[0], recent['RSI'].iloc[-1] < recent['RSI'].iloc[0]
+        expected = 'bullish' if low_div and rsi_up else 'bearish' if high_div and rsi_down else None
+        assert tech.check_rsi_divergence(window, lookback=5) == expected
+
+    monkeypatch.setattr(config, 'DIVERGENCE_PIVOT_WINDOW', 3)
+    batch = TechnicalIndicators(cache=None).calculate_all(df)
+    streamed = TechnicalIndicators().create_stream(df, max_history=len(df)).to_frame()
+    assert batch['RSI_div'].abs().sum() > 0
+    np.testing.assert_array_equal(streamed['RSI_div'], batch['RSI_div'])
+    np.testing.assert_array_equal(streamed['MACD_div'], batch['MACD_div'])
+
+
+def test_rolling_kernels_match_pandas():
+    from indicators import rolling
+    from indicators.structural import StructuralLevels
+
+    df = _ohlcv(n=700)
+    close = df['Close']
+    for window in (3, 20, 50):
+        np.testing.assert_allclose(rolling.rolling_max(close, window), close.rolling(window).max(), rtol=1e-12)
+        np.testing.assert_allclose(rolling.rolling_min(close, window), close.rolling(window).min(), rtol=1e-12)
+        mean, var = rolling.rolling_mean_var(close, window)
+        np.testing.assert_allclose(mean, close.rolling(window).mean(), rtol=1e-10)
+        np.testing.assert_allclose(var, close.rolling(window).var(ddof=0), rtol=1e-6)
+
+        streams = (rolling.RollingMax(window), rolling.RollingMin(window), rolling.RollingMeanVar(window, resync=64))
+        streamed = np.array([[streams[0].update(x), streams[1].update(x), *streams[2].update(x)] for x in close])
+        np.testing.assert_allclose(streamed, np.column_stack((
+            rolling.rolling_max(close, window), rolling.rolling_min(close, window), mean, var)), rtol=1e-6)
+
+    highs, lows = StructuralLevels().swing_range_series(df, lookback=50)
+    for end in (10, 200, len(df)):
+        assert (highs[end - 1], lows[end - 1]) == StructuralLevels().find_recent_swing_points(df.iloc[:end])
+
+
+def test_bar_series_views_match_frame():
+    from data.bar_series import BarSeries
+    from indicators.structural import StructuralLevels
+    from strategy.regime_detector import RegimeDetector
+
+    df = TechnicalIndicators(cache=None).calculate_all(_ohlcv())
+    bars = BarSeries.from_frame(df)
+
+    head = bars[:120]
+    assert len(head) == 120 and np.shares_memory(head['Close'], df['Close'].to_numpy())
+    assert head.last('RSI') == df['RSI'].iloc[119]
+    assert head.value('Close', -6) == df['Close'].iloc[114]
+    assert head.timestamp() == df.index[119]
+
+    cut = df.index[200]
+    assert len(bars.until(cut)) == 201 and bars.after(cut).timestamp(0) == df.index[201]
+    pd.testing.assert_frame_equal(bars[10:50].to_frame(), df.iloc[10:50])
+
+    levels = StructuralLevels()
+    assert levels.identify_key_levels(head) == levels.identify_key_levels(df.iloc[:120])
+    for price in (df['Close'].iloc[-5], df['Low'].iloc[-3]):
+        assert levels.check_liquidity_sweep(bars, price) == levels.check_liquidity_sweep(df, price)
+    assert RegimeDetector().detect_regime(bars) == RegimeDetector().detect_regime(df)
+
+
+def test_required_bars_cover_warmup_and_convergence():
+    from indicators import vectorized
+
+    df = _ohlcv(n=1500)
+    tech = TechnicalIndicators(cache=None)
+    full = tech.calculate_all(df)
+    # without convergence padding the plan is exactly the NaN warm-up
+    assert vectorized.warmup_bars(tolerance=1) == full.attrs['warmup']
+
+    columns = ['EMA_50', 'RSI', 'ATR', 'MACD_signal', 'ADX']
+    bars = tech.required_bars(columns, history=5, tolerance=1e-4)
+    recent = tech.calculate_all(df.iloc[-bars:], columns)
+    assert len(recent) >= 5
+    np.testing.assert_allclose(recent[columns].iloc[-5:], full[columns].iloc[-5:], rtol=1e-3)
+
+
+def test_sweep_events_match_windowed_check():
+    from indicators.structural import SWEEP_DIRECTIONS, StructuralLevels, latest_sweep, sweep_events
+
+    df = _ohlcv(n=600)
+    levels = np.round(np.linspace(df['Low'].min(), df['High'].max(), 12))
+    events = sweep_events(df['High'], df['Low'], df['Close'], levels)
+    assert len(events['bar']) > 0
+
+    structural = StructuralLevels()
+    stops = np.arange(3, len(df) + 1)
+    for level_id, level in enumerate(levels):
+        found = latest_sweep(events, level_id, stops, structural.SWEEP_LOOKBACK)
+        for stop in stops[::7]:
+            check = structural.check_liquidity_sweep(df.iloc[:stop], level)
+            event = found[stop - 3]
+            assert check['detected'] == (event >= 0)
+            if event >= 0:
+                assert check['direction'] == SWEEP_DIRECTIONS[int(events['direction'][event])]
+                assert check['sweep_price'] == events['price'][event]
+
+
+def test_level_index_matches_brute_force():
+    from indicators.level_index import PIP_SIZE, LevelIndex
+    from indicators.structural import StructuralLevels
+
+    df = _ohlcv()
+    levels = StructuralLevels().identify_key_levels(df)
+    index = LevelIndex.from_levels(levels)
+    pivots = [key for key in levels if key.startswith(('swing_high_', 'swing_low_'))]
+    assert pivots and len(index) == 8 + 7 + 5 + len(pivots) and (np.diff(index.prices) >= 0).all()
+    assert set(index.kinds) >= {'previous_day', 'swing', 'fibonacci', 'round_number'}
+
+    prices = np.linspace(index.prices[0] - 5, index.prices[-1] + 5, 400)
+    positions, distances = index.nearest(prices, max_distance_pips=20)
+    gaps = np.abs(prices[:, None] - index.prices[None, :]) / PIP_SIZE
+    np.testing.assert_allclose(distances, gaps.min(axis=1))
+    assert ((positions >= 0) == (gaps.min(axis=1) <= 20)).all()
+
+    starts, stops = index.within(prices, 20)
+    np.testing.assert_array_equal(stops - starts, (gaps <= 20 + 1e-9).sum(axis=1))
+
+    price = df['Close'].iloc[-1]
+    assert StructuralLevels().find_nearest_level(price, levels) == StructuralLevels().find_nearest_level(price, index)
+
+
+def test_level_tracker_matches_identify_key_levels():
+    from indicators.level_tracker import StructuralLevelTracker
+    from indicators.structural import StructuralLevels
+
+    n = 400
+    df = _ohlcv(n=n)
+    df.index = pd.date_range('2024-01-03 20:00', periods=n, freq='4h', tz='UTC')
+    df = df[df.index.dayofweek < 5]
+
+    changes = []
+    tracker = StructuralLevelTracker(history=60, on_change=lambda ts, changed: changes.append(changed))
+    structural = StructuralLevels()
+    for end in range(1, len(df) + 1):
+        tracker.extend(df.iloc[:end])
+        assert tracker.levels() == structural.identify_key_levels(df.iloc[max(0, end - 60):end])
+    assert changes and all(changes)
+    assert tracker.level_index() is tracker.level_index()
+
+
+def test_levels_table_rows_match_identify_key_levels():
+    from indicators.structural import StructuralLevels
+
+    n = 300
+    df = _ohlcv(n=n)
+    df.index = pd.date_range('2024-01-03 20:00', periods=n, freq='4h')
+    df = df[df.index.dayofweek < 5]
+
+    structural = StructuralLevels()
+    table = structural.levels_table(df)
+    assert table.index.equals(df.index)
+    for end in range(1, len(df) + 1, 3):
+        assert structural.levels_at(table, end - 1) == structural.identify_key_levels(df.iloc[:end])
+
+    windowed = structural.levels_table(df, history=40)
+    assert structural.levels_at(windowed, -1) == structural.identify_key_levels(df.iloc[-40:])
+
+
+def test_fractal_pivots_match_brute_force_and_stream(monkeypatch):
+    import config
+    from indicators.level_tracker import StructuralLevelTracker
+    from indicators.pivots import FractalPivotTracker, fractal_pivots
+    from indicators.structural import StructuralLevels
+
+    df = _ohlcv(n=300)
+    df.loc[df.index[100:104], 'High'] = df['High'].iloc[100:104].max()  # a flat top
+    high, low = df['High'].to_numpy(), df['Low'].to_numpy()
+    orders = (3, 5, 10)
+
+    batch = fractal_pivots(high, low, orders)
+    tracker = FractalPivotTracker(orders)
+    for h, l in zip(high, low):
+        tracker.update(h, l)
+    for order in orders:
+        span = range(order, len(df) - order)
+        expected_highs = [i for i in span if high[i] == high[i - order:i + order + 1].max()]
+        expected_lows = [i for i in span if low[i] == low[i - order:i + order + 1].min()]
+        assert batch[order][0].tolist() == expected_highs
+        assert batch[order][1].tolist() == expected_lows
+        pivot_highs, pivot_lows = tracker.pivots(order)
+        assert [p for p, _ in pivot_highs] == expected_highs
+        assert [p for p, _ in pivot_lows] == expected_lows
+
+    monkeypatch.setattr(config, 'SWING_PIVOT_ORDER', 5)
+    df.index = pd.date_range('2024-01-03 20:00', periods=len(df), freq='4h')
+    structural = StructuralLevels()
+    table = structural.levels_table(df, history=60)
+    levels = StructuralLevelTracker(history=60)
+    for end in range(1, len(df) + 1):
+        levels.extend(df.iloc[:end])
+        expected = structural.identify_key_levels(df.iloc[max(0, end - 60):end])
+        assert levels.levels() == expected
+        assert structural.levels_at(table, end - 1) == expected
+    assert expected['swing_high'] != df['High'].iloc[-50:].max() or expected['swing_low'] != df['Low'].iloc[-50:].min()
+    # the swing order is one of the pivot levels, from the same tracker
+    assert expected.get('swing_high_5', expected['swing_high']) == expected['swing_high']
+    assert {'swing_high_3', 'swing_low_3'} <= set(expected)
+
+
+def test_calendar_levels_match_resampled_periods():
+    from indicators.calendar_levels import CalendarLevels
+    from indicators.structural import StructuralLevels
+
+    n = 400
+    df = _ohlcv(n=n)
+    df.index = pd.date_range('2024-01-25 20:00', periods=n, freq='4h')
+    df = df[df.index.dayofweek < 5]
+
+    cached = CalendarLevels()
+    for end in range(30, len(df) + 1, 7):
+        frame = df.iloc[max(0, end - 150):end]
+        days = frame.index.normalize()
+        yesterday = frame[days == days[days < days[-1]][-1]]
+        weeks = frame.index.to_period('W')
+        last_week = frame[weeks == weeks[weeks < weeks[-1]][-1]]
+        months = frame.index.to_period('M')
+
+        expected = {'pdh': yesterday['High'].max(), 'pdl': yesterday['Low'].min(), 'pdc': yesterday['Close'].iloc[-1]}
+        if last_week.index[0] > frame.index[0]:
+            expected.update(pwh=last_week['High'].max(), pwl=last_week['Low'].min(), pwc=last_week['Close'].iloc[-1])
+        if months[0] != months[-1]:
+            expected['monthly_open'] = frame['Open'][months == months[-1]].iloc[0]
+        assert cached.levels(frame) == expected == CalendarLevels().levels(frame)
+
+    daily = df.resample('1D').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last'}).dropna()
+    daily['High'] += 1
+    levels = StructuralLevels().identify_key_levels(df, df_daily=daily)
+    assert levels['pdh'] == daily['High'].iloc[-2]
+
+
+def test_session_table_matches_should_trade_now(monkeypatch):
+    import config
+    from data.market_hours import MarketHours
+
+    monkeypatch.setattr(config, 'MARKET_HOLIDAYS', ['2024-12-25'])
+    monkeypatch.setattr(config, 'MARKET_HALF_DAYS', ['2024-12-24'])
+    hours = MarketHours()
+    index = pd.date_range('2024-12-16', '2024-12-31', freq='30min')
+
+    sessions, allowed = hours.session_table(index)
+    for timestamp, session, ok in zip(index, sessions, allowed):
+        assert ok == hours.should_trade_now(timestamp)[0]
+        assert session == hours.session_name(timestamp.hour)
+    assert not allowed[index.normalize() == '2024-12-25'].any()
+    assert allowed[(index.normalize() == '2024-12-24') & (index.hour < config.HALF_DAY_CLOSE)].any()
+
+    aware_sessions, aware_allowed = hours.session_table(index.tz_localize('UTC').tz_convert('America/New_York'))
+    assert (aware_allowed == allowed).all() and (aware_sessions == sessions).all()
+
+
+def test_history_store_roundtrip(tmp_path):
+    from data.history_store import HistoryStore
+
+    df = _ohlcv(n=6000)
+    df['Volume'] = df['Volume'].round()
+    store = HistoryStore(tmp_path)
+    store.append('XAUUSD', 'M15', df.iloc[:4000])
+    store.append('XAUUSD', 'M15', df.iloc[3500:])
+    store.append('XAUUSD', 'M15', df.iloc[100:200])  # re-fetched bars replace their old copies
+
+    assert [path.stem for path in store.months('XAUUSD', 'M15')] == ['2024-01', '2024-02', '2024-03']
+    assert store.last_time('XAUUSD', 'M15') == df.index[-1]
+
+    start, end = df.index[2500], df.index[3100]
+    window = df[(df.index >= start) & (df.index < end)]
+    loaded = store.frame('XAUUSD', 'M15', start, end, columns=list(df.columns))
+    pd.testing.assert_frame_equal(loaded, window, check_dtype=False, check_index_type=False, check_freq=False,
+                                  check_names=False)
+    assert loaded.attrs == {'symbol': 'XAUUSD', 'timeframe': 'M15'}
+
+    newest = store.load('XAUUSD', 'M15', end=end, bars=50)
+    np.testing.assert_array_equal(newest['close'], df['Close'].iloc[3050:3100])
+    assert isinstance(store.load('XAUUSD', 'M15', df.index[10], df.index[20]), np.memmap)
+    assert store.frame('XAUUSD', 'H4') is None
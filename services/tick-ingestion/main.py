@@ -1,7 +1,8 @@
 """
 Tick Ingestion Service
 Polls Alpha Vantage FX_INTRADAY for XAU/USD 5-min bars, simulates per-tick data,
-and publishes to Kafka topic raw.ticks.
+and publishes to Kafka topic raw.ticks. With TICK_ARCHIVE_DIR set it replays
+real MT5 ticks recorded by the bot (data/tick_recorder.py) instead.
 
 Free tier budget: 25 API calls/day -> poll every 58 min (24 calls) + 1 startup call.
 """
@@ -11,6 +12,7 @@ import logging
 import os
 import time
 from datetime import datetime, timezone
+from typing import Iterator
 
 import aiohttp
 import numpy as np
@@ -33,6 +35,9 @@ POLL_INTERVAL = int(os.getenv('POLL_INTERVAL_SECONDS', 3480))  # 58 min
 METRICS_PORT = int(os.getenv('METRICS_PORT', 8000))
 TICKS_PER_BAR = int(os.getenv('TICKS_PER_BAR', 12))
 SPREAD = float(os.getenv('XAU_SPREAD', 0.10))  # typical XAU/USD spread in USD
+TICK_ARCHIVE_DIR = os.getenv('TICK_ARCHIVE_DIR', '')
+TICK_REPLAY_SYMBOL = os.getenv('TICK_REPLAY_SYMBOL', 'XAUUSD')
+TICK_REPLAY_SPEED = float(os.getenv('TICK_REPLAY_SPEED', 1.0))  # 0 = as fast as possible
 
 tick_count = Counter('tick_ingestion_ticks_total', 'Total ticks published to Kafka')
 api_calls_total = Counter('tick_ingestion_api_calls_total', 'Total Alpha Vantage API calls made')
@@ -172,6 +177,21 @@ def simulate_ticks(bar: dict, n: int = TICKS_PER_BAR) -> list[dict]:
     return ticks
 
 
+def archived_ticks(root: str, symbol: str, start=None, end=None) -> Iterator[dict]:
+    """Recorded MT5 ticks from a TickArchive as raw.ticks messages, oldest first, read a chunk at a time."""
+    from data.tick_archive import TickArchive
+
+    for chunk in TickArchive(root).iter_chunks(symbol, start, end):
+        for t in chunk:
+            yield {
+                'ts': int(t['time_msc']) / 1000,
+                'bid': float(t['bid']),
+                'ask': float(t['ask']),
+                'volume': float(t['volume_real'] or t['volume']),
+                'source': 'mt5_archive',
+            }
+
+
 async def publish_ticks(producer: AIOKafkaProducer, ticks: list[dict]) -> None:
     for tick in ticks:
         t0 = time.monotonic()
@@ -240,6 +260,21 @@ async def run(producer: AIOKafkaProducer) -> None:
                 await publish_ticks(producer, simulate_ticks(simulate_random_walk_bar()))
 
 
+async def replay(producer: AIOKafkaProducer) -> None:
+    """Publish the archived ticks of TICK_REPLAY_SYMBOL, paced at TICK_REPLAY_SPEED x real time."""
+    log.info(f'Replaying archived {TICK_REPLAY_SYMBOL} ticks from {TICK_ARCHIVE_DIR}')
+
+    previous = None
+    replayed = 0
+    for tick in archived_ticks(TICK_ARCHIVE_DIR, TICK_REPLAY_SYMBOL):
+        if TICK_REPLAY_SPEED > 0 and previous is not None:
+            await asyncio.sleep(max(tick['ts'] - previous, 0) / TICK_REPLAY_SPEED)
+        previous = tick['ts']
+        await publish_ticks(producer, [tick])
+        replayed += 1
+    log.info(f'Tick replay finished ({replayed} ticks).')
+
+
 async def health(_req):
     if _ready:
         return web.Response(text='ok')
@@ -269,7 +304,8 @@ async def main() -> None:
     log.info(f'Connected to Kafka at {KAFKA_BROKER}')
 
     try:
-        await asyncio.gather(health_server(), run(producer))
+        source = replay(producer) if TICK_ARCHIVE_DIR else run(producer)
+        await asyncio.gather(health_server(), source)
     except Exception:
         _ready = False
         raise
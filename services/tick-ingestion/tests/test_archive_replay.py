@@ -0,0 +1,38 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'shared'))
+import main  # noqa: E402
+from data.tick_archive import TICK_DTYPE, TickArchive  # noqa: E402
+
+
+def _ticks(first_msc, n, step_ms=250):
+    ticks = np.zeros(n, dtype=TICK_DTYPE)
+    ticks['time_msc'] = first_msc + np.arange(n) * step_ms
+    ticks['time'] = ticks['time_msc'] // 1000
+    ticks['bid'] = 2000.0 + np.arange(n) * 0.01
+    ticks['ask'] = ticks['bid'] + 0.2
+    ticks['volume'] = 1
+    return ticks
+
+
+def test_archive_replay_across_days(tmp_path):
+    archive = TickArchive(tmp_path)
+    day = 86_400_000
+    first = 1_700_000_000_000 // day * day + day - 1_000  # one second before midnight
+    assert archive.append('XAUUSD', _ticks(first, 8)) == 8
+    assert archive.append('XAUUSD', _ticks(first, 12)) == 4      # overlap is skipped
+    archive.compact('XAUUSD', str(np.datetime64(first // day + 1, 'D')))
+    assert [chunk[4] for chunk in archive.index('XAUUSD')] == [4, 8]  # one chunk per day
+
+    ticks = list(main.archived_ticks(str(tmp_path), 'XAUUSD'))
+    assert len(ticks) == 12
+    assert [t['ts'] for t in ticks] == sorted(t['ts'] for t in ticks)
+    assert ticks[0] == {'ts': first / 1000, 'bid': 2000.0, 'ask': 2000.2,
+                        'volume': 1.0, 'source': 'mt5_archive'}
+
+    window = list(main.archived_ticks(str(tmp_path), 'XAUUSD', first + 1_000, first + 2_000))
+    assert [t['ts'] for t in window] == [(first + ms) / 1000 for ms in (1_000, 1_250, 1_500, 1_750)]
@@ -3,8 +3,12 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 import config
+from data.bar_series import BarSeries
 
 class RegimeDetector:
+    # Indicator columns detect_regime reads
+    REQUIRED_COLUMNS = ('ADX', 'EMA_20', 'EMA_50', 'BB_upper', 'BB_lower')
+    
     def detect_regime(self, df):
         """
         Detect market regime
@@ -13,12 +17,13 @@ class RegimeDetector:
         Regimes: 'trending_bull', 'trending_bear', 'range', 'breakout_pending'
         """
         try:
-            adx = df['ADX'].iloc[-1]
-            ema_20 = df['EMA_20'].iloc[-1]
-            ema_50 = df['EMA_50'].iloc[-1]
-            close = df['Close'].iloc[-1]
+            bars = BarSeries.wrap(df)
+            adx = bars.last('ADX')
+            ema_20 = bars.last('EMA_20')
+            ema_50 = bars.last('EMA_50')
+            close = bars.last('Close')
             
-            bb_width = (df['BB_upper'].iloc[-1] - df['BB_lower'].iloc[-1]) / close
+            bb_width = (bars.last('BB_upper') - bars.last('BB_lower')) / close
             
             if adx > config.ADX_THRESHOLD_TRENDING:
                 if ema_20 > ema_50:
@@ -63,7 +68,7 @@ if __name__ == "__main__":
         
         if df is not None:
             tech = TechnicalIndicators()
-            df = tech.calculate_all(df)
+            df = tech.calculate_all(df, RegimeDetector.REQUIRED_COLUMNS)
             
             detector = RegimeDetector()
             regime, adx = detector.detect_regime(df)
@@ -5,16 +5,27 @@ sys.path.append(str(Path(__file__).parent.parent))
 import config
 
 class RiskManager:
-    def calculate_position_size(self, account_balance, entry_price, stop_loss, pip_value=10.0):
+    def __init__(self, pip_size=None, pip_value=None):
+        """
+        Args:
+            pip_size: Price move of one pip (default: config.PIP_SIZE, gold)
+            pip_value: Account-currency value of one pip per lot
+                       (default: config.PIP_VALUE, gold's $10)
+        """
+        self.pip_size = pip_size or config.PIP_SIZE
+        self.pip_value = pip_value or config.PIP_VALUE
+    
+    def calculate_position_size(self, account_balance, entry_price, stop_loss, pip_value=None):
         """
         Calculate lot size based on risk percentage
         
-        Default pip_value for gold: $10 per pip per lot
+        pip_value defaults to this manager's (the symbol's value per pip per lot)
         """
         try:
+            pip_value = pip_value or self.pip_value
             risk_amount = account_balance * (config.RISK_PERCENT / 1000)
             
-            pip_risk = abs(entry_price - stop_loss) / 0.10
+            pip_risk = self.price_to_pips(entry_price - stop_loss)
             
             if pip_risk > config.MAX_STOP_LOSS_PIPS:
                 print(f"Stop loss too wide: {pip_risk:.1f} pips (max: {config.MAX_STOP_LOSS_PIPS})")
@@ -55,7 +66,7 @@ class RiskManager:
     
     def price_to_pips(self, price_diff):
         """Convert price difference to pips"""
-        return abs(price_diff) / 0.10
+        return abs(price_diff) / self.pip_size
     
     def validate_risk_reward(self, entry, stop_loss, take_profit):
         """Validate minimum risk/reward ratio"""
@@ -71,4 +82,23 @@ class RiskManager:
             return rr_ratio >= config.MIN_RISK_REWARD
             
         except Exception as e:
-            return False
\ No newline at end of file
+            return False
+    
+    def calculate_risk_metrics(self, entry, stop_loss, tp1, tp2, tp3, account_balance):
+        """Pip distances, dollar risk and reward/risk of a signal"""
+        pip_risk = self.price_to_pips(entry - stop_loss)
+        pip_tp1 = self.price_to_pips(tp1 - entry)
+        pip_tp2 = self.price_to_pips(tp2 - entry)
+        pip_tp3 = self.price_to_pips(tp3 - entry)
+        risk_dollars = account_balance * (config.RISK_PERCENT / 100)
+        rr_ratio = pip_tp1 / pip_risk if pip_risk > 0 else 0
+        
+        return {
+            'pip_risk': pip_risk,
+            'pip_tp1': pip_tp1,
+            'pip_tp2': pip_tp2,
+            'pip_tp3': pip_tp3,
+            'risk_dollars': risk_dollars,
+            'expected_reward': risk_dollars * rr_ratio,
+            'rr_ratio': rr_ratio
+        }
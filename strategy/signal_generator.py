@@ -14,27 +14,62 @@ from strategy.regime_detector import RegimeDetector
 from strategy.risk_manager import RiskManager
 from indicators.technical import TechnicalIndicators
 from indicators.structural import StructuralLevels
+from data.bar_series import BarSeries
+from data.metadata_cache import pip_spec
 
 class SignalGenerator:
-    def __init__(self):
+    # Indicator columns read from each timeframe (pass to calculate_all)
+    H4_COLUMNS = RegimeDetector.REQUIRED_COLUMNS
+    M15_COLUMNS = ('RSI', 'Stoch_K', 'Stoch_D', 'Volume_Ratio', 'RSI_div', 'MACD_div')
+    # Stop distance beyond the swept level
+    STOP_BUFFER_PIPS = 10
+    
+    def __init__(self, symbol_info=None):
+        """
+        Args:
+            symbol_info: Contract specification of the symbol traded (as
+                         from DataHandler.get_symbol_info); sets the pip
+                         size and value, and the price digits of signals.
+                         Gold's when None.
+        """
+        pip_size, pip_value = pip_spec(symbol_info)
+        self.digits = symbol_info['digits'] if symbol_info else 2
         self.market_hours = MarketHours()
         self.regime_detector = RegimeDetector()
-        self.risk_manager = RiskManager()
+        self.risk_manager = RiskManager(pip_size, pip_value)
         self.technical = TechnicalIndicators()
-        self.structural = StructuralLevels()
+        self.structural = StructuralLevels(pip_size)
     
-    def generate_signal(self, df_h4, df_m15, timestamp=None):
+    def history_bars(self, timeframe):
+        """
+        Rows of warmed-up history generate_signal reads on `timeframe`
+        
+        H4 feeds the structural levels; M15 only the sweep check and the
+        latest indicator values.
+        """
+        if timeframe == config.TIMEFRAME_H4:
+            return self.structural.history_bars(timeframe)
+        return StructuralLevels.SWEEP_LOOKBACK
+    
+    def generate_signal(self, df_h4, df_m15, timestamp=None, levels=None):
         """
         Main signal generation function
         
         Args:
-            df_h4: H4 timeframe data
-            df_m15: M15 timeframe data
+            df_h4: H4 timeframe data (DataFrame or BarSeries)
+            df_m15: M15 timeframe data (DataFrame or BarSeries)
             timestamp: Optional timestamp for backtesting
+            levels: Optional precomputed key levels (LevelIndex or
+                    identify_key_levels dict), e.g. from a
+                    StructuralLevelTracker; identified from df_h4 if None
         
         Returns: Signal dict or None
         """
         try:
+            # Array-backed views: scalar reads below skip pandas indexing
+            df_h4 = BarSeries.wrap(df_h4)
+            df_m15 = BarSeries.wrap(df_m15)
+            
             # Step 1: Check if we should trade now
             should_trade, reason = self.market_hours.should_trade_now(timestamp)
             if not should_trade:
@@ -51,20 +86,21 @@ class SignalGenerator:
             print(f" Regime: {self.regime_detector.get_regime_description(regime)}")
             
             # Step 3: Identify structural levels
-            levels = self.structural.identify_key_levels(df_h4)
+            if levels is None:
+                levels = self.structural.key_level_index(df_h4)
             if not levels:
                 print("  No structural levels identified")
                 return None
             
             # Step 4: Check for level interaction
-            current_price = df_m15['Close'].iloc[-1]
+            current_price = df_m15.last('Close')
             nearest_level, level_name, distance = self.structural.find_nearest_level(current_price, levels)
             
             if not nearest_level:
-                print(f"  No nearby levels (Current: ${current_price:.2f})")
+                print(f"  No nearby levels (Current: ${current_price:.{self.digits}f})")
                 return None
             
-            print(f" Near level: {level_name} at ${nearest_level:.2f} ({distance:.1f} pips away)")
+            print(f" Near level: {level_name} at ${nearest_level:.{self.digits}f} ({distance:.1f} pips away)")
             
             # Step 5: Check for liquidity sweep
             sweep = self.structural.check_liquidity_sweep(df_m15, nearest_level)
@@ -106,12 +142,12 @@ class SignalGenerator:
         """Check if all conditions are met for a LONG entry"""
         try:
             # Get indicators
-            rsi = df['RSI'].iloc[-1]
-            stoch_k = df['Stoch_K'].iloc[-1]
-            stoch_d = df['Stoch_D'].iloc[-1]
+            rsi = df.last('RSI')
+            stoch_k = df.last('Stoch_K')
+            stoch_d = df.last('Stoch_D')
             
-            # Check RSI divergence
-            rsi_div = self.technical.check_rsi_divergence(df)
+            # RSI divergence (whole-series column from calculate_all)
+            rsi_div = self.technical.divergence_label(df, 'RSI_div')
             
             print(f"[DATA] LONG Check - RSI: {rsi:.1f}, Stoch K: {stoch_k:.1f}, D: {stoch_d:.1f}")
             
@@ -140,12 +176,12 @@ class SignalGenerator:
         """Check if all conditions are met for a SHORT entry"""
         try:
             # Get indicators
-            rsi = df['RSI'].iloc[-1]
-            stoch_k = df['Stoch_K'].iloc[-1]
-            stoch_d = df['Stoch_D'].iloc[-1]
+            rsi = df.last('RSI')
+            stoch_k = df.last('Stoch_K')
+            stoch_d = df.last('Stoch_D')
             
-            # Check RSI divergence
-            rsi_div = self.technical.check_rsi_divergence(df)
+            # RSI divergence (whole-series column from calculate_all)
+            rsi_div = self.technical.divergence_label(df, 'RSI_div')
             
             print(f" SHORT Check - RSI: {rsi:.1f}, Stoch K: {stoch_k:.1f}, D: {stoch_d:.1f}")
             
@@ -174,12 +210,13 @@ class SignalGenerator:
         """Build complete signal with all details"""
         try:
             # Calculate stop loss
+            buffer = self.STOP_BUFFER_PIPS * self.risk_manager.pip_size
             if direction == 'LONG':
                 # Stop below the sweep low
-                stop_loss = level - (10 * 0.10)  # 10 pips below
+                stop_loss = level - buffer
             else:
                 # Stop above the sweep high
-                stop_loss = level + (10 * 0.10)  # 10 pips above
+                stop_loss = level + buffer
             
             # Validate stop loss distance
             pip_risk = self.risk_manager.price_to_pips(entry_price - stop_loss)
@@ -195,19 +232,15 @@ class SignalGenerator:
                 print(f"[WARN]  Risk/reward ratio too low")
                 return None
             
-            # Get actual account balance from MT5
-            from data.data_handler import DataHandler
-            handler = DataHandler()
+            # Live account balance from the shared metadata cache (no terminal
+            # round-trip while it is fresh); config balance when not connected
+            from data.metadata_cache import metadata
             account_balance = config.ACCOUNT_BALANCE  # Fallback
-            
-            # Try to get real balance if connected
-            try:
-                import MetaTrader5 as mt5
-                account_info = mt5.account_info()
-                if account_info:
-                    account_balance = account_info.balance
-                    print(f" Using live account balance: ${account_balance:.2f}")
-            except:
+            account_info = metadata.get('account')
+            if account_info:
+                account_balance = account_info['balance']
+                print(f" Using live account balance: ${account_balance:.2f}")
+            else:
                 print(f"  Using config balance: ${account_balance:.2f}")
             
             # Calculate position size
@@ -232,11 +265,11 @@ class SignalGenerator:
             # Build signal dictionary
             signal = {
                 'signal': direction,
-                'entry_price': round(entry_price, 2),
-                'stop_loss': round(stop_loss, 2),
-                'take_profit_1': round(tp1, 2),
-                'take_profit_2': round(tp2, 2),
-                'take_profit_3': round(tp3, 2),
+                'entry_price': round(entry_price, self.digits),
+                'stop_loss': round(stop_loss, self.digits),
+                'take_profit_1': round(tp1, self.digits),
+                'take_profit_2': round(tp2, self.digits),
+                'take_profit_3': round(tp3, self.digits),
                 'lot_size': lot_size,
                 'confidence': confidence,
                 'pips_risk': round(metrics['pip_risk'], 1),
@@ -262,12 +295,12 @@ class SignalGenerator:
             confidence = 50  # Base confidence
             
             # RSI divergence adds confidence
-            rsi_div = self.technical.check_rsi_divergence(df)
+            rsi_div = self.technical.divergence_label(df, 'RSI_div')
             if rsi_div:
                 confidence += 15
             
             # MACD divergence adds confidence
-            macd_div = self.technical.check_macd_divergence(df)
+            macd_div = self.technical.divergence_label(df, 'MACD_div')
             if macd_div:
                 confidence += 10
             
@@ -280,7 +313,7 @@ class SignalGenerator:
                 confidence += 10
             
             # High volume adds confidence
-            volume_ratio = df['Volume_Ratio'].iloc[-1]
+            volume_ratio = df.last('Volume_Ratio')
             if volume_ratio > 1.2:
                 confidence += 5
             
@@ -309,8 +342,8 @@ if __name__ == "__main__":
         if df_h4 is not None and df_m15 is not None:
             # Calculate indicators
             tech = TechnicalIndicators()
-            df_h4 = tech.calculate_all(df_h4)
-            df_m15 = tech.calculate_all(df_m15)
+            df_h4 = tech.calculate_all(df_h4, SignalGenerator.H4_COLUMNS)
+            df_m15 = tech.calculate_all(df_m15, SignalGenerator.M15_COLUMNS)
             
             # Generate signal
             generator = SignalGenerator()
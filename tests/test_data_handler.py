@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from data.data_handler import DataHandler
+from data.history_store import HistoryStore
+from data.sources import SyntheticSource
+
+
+def _offline_handler(tmp_path, **kwargs):
+    # never connected: fetches can only come from the store
+    handler = DataHandler(SyntheticSource(now='2024-06-03'), 'XAUUSD', **kwargs)
+    handler.store = HistoryStore(tmp_path)
+    index = pd.date_range('2024-05-01', periods=300, freq='4h', name='Time')
+    close = 2000 + np.arange(300.0)
+    handler.store.append('XAUUSD', 'H4', pd.DataFrame(
+        {'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close, 'Volume': 1.0}, index=index))
+    return handler
+
+
+def test_live_path_gets_none_when_not_connected(tmp_path):
+    handler = _offline_handler(tmp_path)
+    assert handler.get_gold_data('H4', bars=50) is None
+    assert handler.get_frames({'H4': dict(bars=50), 'M15': dict(bars=50)}) == {'H4': None, 'M15': None}
+    assert handler.get_range('H4', '2024-05-20', '2024-05-30') is None
+    assert handler.for_symbol('XAGUSD').get_gold_data('H4', bars=50) is None
+
+
+def test_store_fallback_is_opt_in(tmp_path):
+    handler = _offline_handler(tmp_path, store_fallback=True)
+    df = handler.get_gold_data('H4', bars=50)
+    assert len(df) == 50 and df['Close'].iloc[-1] == 2299.0
+    window = handler.get_range('H4', '2024-05-20', '2024-05-30')
+    assert window.index[-1] <= pd.Timestamp('2024-05-30') and len(window) > 50
+    assert handler.for_symbol('XAGUSD').store_fallback
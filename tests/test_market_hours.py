@@ -0,0 +1,65 @@
+import importlib
+
+import pandas as pd
+import pytest
+
+import config
+from data.market_hours import MarketHours
+
+
+@pytest.fixture
+def calendar(monkeypatch):
+    # entries as an operator would type them in .env, spaces included
+    monkeypatch.setenv('MARKET_HOLIDAYS', '2024-12-25, 2024-12-26 ,')
+    monkeypatch.setenv('MARKET_HALF_DAYS', ' 2024-12-24')
+    importlib.reload(config)
+    yield config
+    monkeypatch.delenv('MARKET_HOLIDAYS')
+    monkeypatch.delenv('MARKET_HALF_DAYS')
+    importlib.reload(config)
+
+
+def _utc(text):
+    return pd.Timestamp(text, tz='UTC')
+
+
+def test_calendar_entries_are_stripped(calendar):
+    assert calendar.MARKET_HOLIDAYS == ['2024-12-25', '2024-12-26']
+    assert calendar.MARKET_HALF_DAYS == ['2024-12-24']
+    hours = MarketHours()
+    assert not hours.should_trade_now(pd.Timestamp('2024-12-25 10:00'))[0]
+    assert not hours.should_trade_now(pd.Timestamp('2024-12-24 18:00'))[0]
+
+
+def test_next_scan_time_within_session():
+    hours = MarketHours()
+    assert hours.next_scan_time(_utc('2024-12-16 10:07')) == _utc('2024-12-16 10:15:05')
+    # a scan not yet run for the bar that just closed is still due
+    assert hours.next_scan_time(_utc('2024-12-16 10:15:03')) == _utc('2024-12-16 10:15:05')
+    assert hours.last_bar_open(_utc('2024-12-16 10:15:05')) == _utc('2024-12-16 10:00')
+
+
+def test_next_scan_time_scans_the_last_bar_at_session_close():
+    hours = MarketHours()
+    close = _utc(f'2024-12-16 {config.NY_CLOSE}:00:05')
+    assert hours.next_scan_time(_utc('2024-12-16 20:50')) == close
+    bar_open = hours.last_bar_open(close).tz_localize(None)
+    assert hours.should_trade_now(bar_open)[0]
+
+    # after the close the next scan is the first bar of the next session
+    opens = _utc(f'2024-12-17 {config.LONDON_OPEN}:15:05')
+    assert hours.next_scan_time(close + pd.Timedelta(seconds=1)) == opens
+    assert hours.next_scan_time(_utc('2024-12-17 03:00')) == opens
+
+
+def test_next_scan_time_skips_weekends_and_holidays(calendar):
+    hours = MarketHours()
+    monday = _utc(f'2024-12-23 {calendar.LONDON_OPEN}:15:05')
+    assert hours.next_scan_time(_utc(f'2024-12-20 {calendar.NY_CLOSE}:00:06')) == monday
+    assert hours.next_scan_time(_utc('2024-12-21 12:00')) == monday
+
+    # half day: the bar before HALF_DAY_CLOSE is scanned, then two holidays
+    half_close = _utc(f'2024-12-24 {calendar.HALF_DAY_CLOSE}:00:05')
+    assert hours.next_scan_time(_utc('2024-12-24 16:50')) == half_close
+    assert hours.next_scan_time(half_close + pd.Timedelta(seconds=1)) == \
+        _utc(f'2024-12-27 {calendar.LONDON_OPEN}:15:05')
@@ -0,0 +1,103 @@
+import time
+import types
+
+import pytest
+
+from data import metadata_cache
+from data.metadata_cache import MetadataCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = types.SimpleNamespace(now=1000.0)
+    fake.monotonic = lambda: fake.now
+    monkeypatch.setattr(metadata_cache, 'time', fake)
+    return fake
+
+
+def _counting(values):
+    calls = []
+
+    def loader():
+        calls.append(None)
+        return values[min(len(calls), len(values)) - 1]
+    return loader, calls
+
+
+def test_values_are_cached_until_the_ttl_runs_out(clock):
+    cache = MetadataCache()
+    loader, calls = _counting([{'balance': 1}, {'balance': 2}])
+    cache.register('account', loader, ttl=60)
+
+    assert cache.get('account') == {'balance': 1}
+    clock.now += 59
+    assert cache.get('account') == {'balance': 1} and len(calls) == 1
+    clock.now += 1
+    assert cache.get('account') == {'balance': 2} and len(calls) == 2
+    assert cache.get('missing') is None
+
+
+def test_invalidate_and_unregister(clock):
+    cache = MetadataCache()
+    loader, calls = _counting([1, 2, 3])
+    cache.register(('symbol', 'XAUUSD'), loader, ttl=60)
+    cache.register('account', lambda: 'account', ttl=60)
+    cache.get(('symbol', 'XAUUSD'))
+
+    cache.invalidate(('symbol', 'XAUUSD'))
+    assert cache.get(('symbol', 'XAUUSD')) == 2
+    cache.invalidate()
+    assert cache.get(('symbol', 'XAUUSD')) == 3
+
+    cache.unregister(('symbol', 'XAUUSD'))
+    assert cache.get(('symbol', 'XAUUSD')) is None
+    assert cache.get('account') == 'account'
+    cache.unregister()
+    assert cache.get('account') is None
+
+
+def test_failed_loads_are_not_cached(clock, capsys):
+    cache = MetadataCache()
+    results = iter([None, RuntimeError('terminal busy'), 'spec'])
+
+    def loader():
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    cache.register('symbol', loader, ttl=60)
+
+    assert cache.get('symbol') is None
+    assert cache.get('symbol') is None
+    assert 'terminal busy' in capsys.readouterr().out
+    assert cache.get('symbol') == 'spec'
+
+
+def test_refresh_reloads_only_entries_due(clock):
+    cache = MetadataCache()
+    soon, soon_calls = _counting([1, 2])
+    later, later_calls = _counting([1, 2])
+    cache.register('soon', soon, ttl=10)
+    cache.register('later', later, ttl=100)
+    cache.get('soon'), cache.get('later')
+
+    clock.now += 5
+    cache.refresh(margin=10)
+    assert len(soon_calls) == 2 and len(later_calls) == 1
+    # the refreshed value is served without another load
+    clock.now += 9
+    assert cache.get('soon') == 2 and len(soon_calls) == 2
+
+
+def test_refresher_thread_keeps_entries_warm():
+    cache = MetadataCache()
+    loader, calls = _counting([1])
+    cache.register('account', loader, ttl=0.05)
+    cache.start_refresher(interval=0.01)
+    try:
+        deadline = time.monotonic() + 2
+        while len(calls) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        cache.stop_refresher()
+    assert len(calls) >= 3
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from data.rate_buffer import RATE_DTYPE, RateBuffer
+
+STEP = 900
+
+
+def _rates(times, price=2000.0):
+    rows = np.zeros(len(times), dtype=RATE_DTYPE)
+    rows['time'] = times
+    rows['open'] = rows['high'] = rows['low'] = rows['close'] = price + np.arange(len(times))
+    rows['tick_volume'] = 1
+    return rows
+
+
+def _times(first, count):
+    return 1_700_000_100 // STEP * STEP + STEP * np.arange(first, first + count)
+
+
+def test_overlap_replaces_forming_bar_and_counts_closed_ones():
+    buffer = RateBuffer(10, RATE_DTYPE)
+    assert buffer.merge(_rates(_times(0, 5))) == 5
+
+    # refetch from the forming bar: it is overwritten, two bars are new
+    update = _rates(_times(4, 3), price=3000.0)
+    assert buffer.merge(update) == 2
+    rows = buffer.rows()
+    assert list(rows['time']) == list(_times(0, 7))
+    assert rows['close'][4] == 3000.0
+
+    # an unchanged forming bar keeps the cached frame
+    frame = buffer.to_frame()
+    assert buffer.merge(rows[-1:].copy()) == 0
+    assert buffer.to_frame() is frame
+
+
+def test_gap_is_appended_after_the_newest_row():
+    buffer = RateBuffer(10, RATE_DTYPE)
+    buffer.merge(_rates(_times(0, 4)))
+
+    # bars after a gap (weekend, outage) are all new and keep their times
+    assert buffer.merge(_rates(_times(20, 3))) == 3
+    assert list(buffer.rows()['time']) == list(_times(0, 4)) + list(_times(20, 3))
+    assert buffer.last_time() == _times(22, 1)[0]
+
+
+def test_fetch_older_than_window_replaces_it():
+    buffer = RateBuffer(10, RATE_DTYPE)
+    buffer.merge(_rates(_times(5, 5)))
+    assert buffer.merge(_rates(_times(0, 8))) == 0
+    assert list(buffer.rows()['time']) == list(_times(0, 8))
+
+
+def test_merges_match_a_deduplicated_reference_across_wraps():
+    rng = np.random.default_rng(3)
+    capacity = 16
+    buffer = RateBuffer(capacity, RATE_DTYPE)
+    reference = pd.Series(dtype=float)
+    newest = 0
+    for _ in range(300):
+        # start at or before the newest bar (overlap) or after it (gap)
+        first = newest + int(rng.integers(-3, 4))
+        rates = _rates(_times(first, int(rng.integers(1, 2 * capacity))), price=float(rng.integers(1000)))
+        before = buffer.last_time()
+        closed = buffer.merge(rates)
+
+        kept = reference[reference.index < rates['time'][0]]
+        reference = pd.concat([kept, pd.Series(rates['close'], index=rates['time'])]).iloc[-capacity:]
+        assert closed == (len(rates) if before is None else int((rates['time'] > before).sum()))
+        assert list(buffer.rows()['time']) == list(reference.index)
+        assert np.array_equal(buffer.rows()['close'], reference.to_numpy())
+        assert np.array_equal(buffer.to_frame(5)['Close'].to_numpy(), reference.to_numpy()[-5:])
+        newest = int((buffer.last_time() - _times(0, 1)[0]) // STEP)
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import config
+from data.data_handler import DataHandler
+from data.rate_buffer import rates_frame
+from data.resampler import BarResampler, resample_rates
+from data.sources import SyntheticSource
+
+
+@pytest.fixture
+def resampled(monkeypatch):
+    monkeypatch.setattr(config, 'RESAMPLE_BASE_TIMEFRAME', 'M15')
+    monkeypatch.setattr(config, 'RESAMPLED_TIMEFRAMES', ['H4', 'D1'])
+    monkeypatch.setattr(config, 'RESAMPLE_OFFSET_MINUTES', 0)
+
+
+def _direct(source, timeframe, index):
+    """The source's own bars of a timeframe, as a broker would serve them"""
+    df = rates_frame(source.rates_from_pos('XAUUSD', timeframe, 5000))
+    return df.loc[index]
+
+
+def test_resampled_frames_match_directly_fetched_bars(resampled):
+    source = SyntheticSource(days=60, now='2024-06-04 09:52')
+    handler = DataHandler(source, 'XAUUSD')
+    assert handler.connect_mt5()
+
+    # scan after scan: the resampled H4/D1 always equal the source's own bars,
+    # the forming one included
+    for _ in range(40):
+        frames = handler.get_frames({'H4': dict(bars=60), 'D1': dict(bars=10), 'M15': dict(bars=200)})
+        for timeframe in ('H4', 'D1'):
+            df = frames[timeframe]
+            assert len(df) == {'H4': 60, 'D1': 10}[timeframe]
+            pd.testing.assert_frame_equal(df, _direct(source, timeframe, df.index), check_freq=False)
+        source.advance(37 * 60)
+    handler.disconnect_mt5()
+
+
+def test_incremental_resampler_matches_batch():
+    rng = np.random.default_rng(11)
+    source = SyntheticSource(days=20, now='2024-06-04 09:52')
+    m15 = source.rates_from_pos('XAUUSD', 'M15', 5000)
+
+    for offset in (0, 60):
+        resampler = BarResampler(240, capacity=200, offset_minutes=offset)
+        # the first window starts part way into a period, which is dropped
+        first, stop = 7, 300
+        resampler.update(m15[first:stop])
+        while stop < len(m15):
+            batch = resample_rates(m15[first:stop], 240, offset)[1:]
+            assert len(resampler.buffer) == min(len(batch), 200)
+            assert np.array_equal(resampler.buffer.rows(), batch[-len(resampler.buffer):])
+            # overlapping windows reaching back past the forming bar's open
+            step = int(rng.integers(1, 30))
+            stop += step
+            resampler.update(m15[max(first, stop - step - 16 - int(rng.integers(0, 30))):stop])
+
+        with pytest.raises(ValueError):
+            resampler.update(m15[-2:])
+
+
+def test_offset_grid_matches_minute_aggregation():
+    source = SyntheticSource(days=10, now='2024-06-04 09:52')
+    m1 = source.rates_from_pos('XAUUSD', 'M1', 20000)
+    m15 = resample_rates(m1, 15)
+    for minutes, offset in ((240, 60), (1440, 120)):
+        assert np.array_equal(resample_rates(m15, minutes, offset), resample_rates(m1, minutes, offset))
+        assert set((resample_rates(m15, minutes, offset)['time'] - offset * 60) % (minutes * 60)) == {0}
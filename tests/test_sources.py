@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.data_handler import DataHandler
+from data.sources import MarketDataSource, SyntheticSource
+
+MONDAY = pd.Timestamp('2024-06-03 10:07', tz='UTC')
+
+
+def test_synthetic_bars_arrive_as_the_clock_advances():
+    source = SyntheticSource(days=30, now=MONDAY)
+    handler = DataHandler(source, 'XAUUSD')
+    assert handler.connect_mt5()
+    before = handler.get_gold_data('M15', bars=200).copy()
+
+    source.advance(15 * 60)
+    after = handler.get_gold_data('M15', bars=200)
+    assert handler.new_bars['M15'] == 1
+    assert after.index[-1] - before.index[-1] == pd.Timedelta(minutes=15)
+    # closed bars never change; the forming one only grows
+    assert after.loc[before.index[1:-1]].equals(before.iloc[1:-1])
+
+    # across a weekend and into days that were not drawn yet
+    source.advance(7 * 86400)
+    later = handler.get_gold_data('H4', bars=50)
+    assert later.index[-1] == pd.Timestamp('2024-06-10 08:00')
+    handler.disconnect_mt5()
+
+
+def test_synthetic_path_prefix_is_stable():
+    grown = SyntheticSource(days=30, now=MONDAY)
+    grown.rates_from_pos('XAUUSD', 'M15', 10)
+    grown.advance(3 * 3600)
+    fresh = SyntheticSource(days=30, now=MONDAY + pd.Timedelta(hours=3))
+    for timeframe in ('M15', 'H4'):
+        assert np.array_equal(grown.rates_from_pos('XAUUSD', timeframe, 500),
+                              fresh.rates_from_pos('XAUUSD', timeframe, 500))
+
+    # the forming bar is built from the minutes up to the clock only
+    m1 = grown.rates_from_pos('XAUUSD', 'M1', 1)
+    assert grown.rates_from_pos('XAUUSD', 'M15', 1)['close'][0] == m1['close'][0]
+    assert m1['time'][0] == (MONDAY + pd.Timedelta(hours=3)).timestamp()
+
+
+def test_synthetic_source_follows_the_wall_clock():
+    source = SyntheticSource(days=10)
+    last = source.rates_from_pos('XAUUSD', 'M1', 1)
+    now = pd.Timestamp.now(tz='UTC').floor('min')
+    if now.weekday() < 5:
+        assert pd.Timestamp(int(last['time'][0]), unit='s', tz='UTC') >= now - pd.Timedelta(minutes=1)
+
+
+def test_incomplete_source_fails_when_created():
+    class NoPrices(MarketDataSource):
+        def connect(self):
+            return True
+
+        def rates_from_pos(self, symbol, timeframe, count):
+            return None
+
+        def rates_range(self, symbol, timeframe, date_from, date_to):
+            return None
+
+        def symbol_info(self, symbol):
+            return None
+
+    with pytest.raises(TypeError, match='current_price'):
+        NoPrices()
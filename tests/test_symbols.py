@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import config
+from data.data_handler import DataHandler
+from data.metadata_cache import metadata, pip_spec
+from data.sources import DEFAULT_SYMBOL_INFO, SyntheticSource
+from indicators.level_tracker import StructuralLevelTracker
+from indicators.structural import StructuralLevels
+from strategy.signal_generator import SignalGenerator
+
+SILVER = dict(DEFAULT_SYMBOL_INFO, point=0.001, digits=3, trade_contract_size=5000.0,
+              trade_tick_size=0.001, trade_tick_value=5.0)
+EURUSD = dict(DEFAULT_SYMBOL_INFO, point=0.00001, digits=5, trade_contract_size=100000.0,
+              trade_tick_size=0.00001, trade_tick_value=1.0)
+
+
+def test_pip_spec_follows_the_contract():
+    assert pip_spec(None) == (config.PIP_SIZE, config.PIP_VALUE)
+    assert pip_spec(DEFAULT_SYMBOL_INFO) == pytest.approx((0.10, 10.0))
+    assert pip_spec(SILVER) == pytest.approx((0.01, 50.0))
+    assert pip_spec(EURUSD) == pytest.approx((0.0001, 10.0))
+    # no tick value reported: contract size in the account currency
+    no_tick = {key: value for key, value in SILVER.items() if not key.startswith('trade_tick')}
+    assert pip_spec(no_tick) == pytest.approx((0.01, 50.0))
+
+
+def test_signal_generator_sizes_by_symbol():
+    gold = SignalGenerator()
+    silver = SignalGenerator(SILVER)
+    assert gold.risk_manager.price_to_pips(1.0) == pytest.approx(10)
+    assert silver.risk_manager.price_to_pips(0.10) == pytest.approx(10)
+    assert silver.digits == 3
+
+    # same risk in pips and dollars: a silver lot is worth 5x a gold lot per pip
+    gold_lots = gold.risk_manager.calculate_position_size(100000, 2000.0, 1998.0)
+    silver_lots = silver.risk_manager.calculate_position_size(100000, 25.0, 24.8)
+    assert silver_lots == pytest.approx(gold_lots / 5, abs=0.01)
+
+    assert silver.structural.get_round_number_levels(24.37) == pytest.approx([10, 15, 20, 25, 30])
+    assert gold.structural.get_round_number_levels(2037.0) == [1900, 1950, 2000, 2050, 2100]
+
+
+def test_levels_follow_the_pip_size():
+    rng = np.random.default_rng(5)
+    close = 25 + np.cumsum(rng.normal(0, 0.05, 400))
+    index = pd.date_range('2024-01-01', periods=400, freq='4h')
+    df = pd.DataFrame({'Open': close, 'High': close + 0.05, 'Low': close - 0.05, 'Close': close}, index=index)
+
+    structural = StructuralLevels(pip_size=0.01)
+    table = structural.levels_table(df, history=120)
+    tracker = StructuralLevelTracker(history=120, structural=structural)
+    for timestamp, bar in df.iterrows():
+        tracker.update(timestamp, bar)
+    assert tracker.levels()['round_numbers'] == structural.levels_at(table, len(df) - 1)['round_numbers']
+
+    # 20 pips of silver is 0.20 in price
+    price = float(close[-1])
+    levels = {'pdh': price + 0.15, 'pdl': price - 0.5}
+    assert structural.find_nearest_level(price, levels)[1] == 'PDH'
+    assert StructuralLevels().find_nearest_level(price, {'pdh': price + 0.15})[2] == pytest.approx(1.5)
+
+
+def test_disconnect_unregisters_every_symbol():
+    handler = DataHandler(SyntheticSource(now='2024-06-03'), 'XAUUSD')
+    assert handler.connect_mt5()
+    others = [handler.for_symbol(symbol) for symbol in ('XAGUSD', 'XAUEUR')]
+    assert all(other.get_symbol_info() for other in others)
+
+    handler.disconnect_mt5()
+    for symbol in ('XAUUSD', 'XAGUSD', 'XAUEUR'):
+        assert metadata.get(('symbol', symbol)) is None
+    assert not any(other.connected for other in others)
@@ -0,0 +1,89 @@
+import numpy as np
+
+from data.tick_archive import TICK_DTYPE, TickArchive
+from data.tick_recorder import TickRecorder
+
+DAY = 86_400_000
+FIRST = 1_700_000_000_000 // DAY * DAY + DAY - 1_000  # one second before midnight
+
+
+def _ticks(times, bid=2000.0):
+    ticks = np.zeros(len(times), dtype=TICK_DTYPE)
+    ticks['time_msc'] = times
+    ticks['time'] = ticks['time_msc'] // 1000
+    ticks['bid'] = bid + np.arange(len(times)) * 0.01
+    ticks['ask'] = ticks['bid'] + 0.2
+    ticks['volume'] = 1
+    return ticks
+
+
+class FakeSource:
+    """Serves a fixed tick array, as copy_ticks_range would"""
+
+    def __init__(self, ticks):
+        self.ticks = ticks
+
+    def ticks_range(self, symbol, date_from, date_to):
+        return self.ticks[self.ticks['time_msc'] >= int(date_from.timestamp()) * 1000]
+
+
+class FailingArchive(TickArchive):
+    fail = True
+
+    def append(self, symbol, ticks):
+        if self.fail:
+            raise OSError('disk full')
+        return super().append(symbol, ticks)
+
+
+def test_append_keeps_new_ticks_in_the_same_millisecond(tmp_path):
+    archive = TickArchive(tmp_path)
+    assert archive.append('XAUUSD', _ticks([FIRST, FIRST + 250])) == 2
+    # a repeat of the last tick plus another one stamped the same millisecond
+    more = np.concatenate([_ticks([FIRST + 250], bid=2000.01), _ticks([FIRST + 250, FIRST + 500], bid=2001.0)])
+    assert archive.append('XAUUSD', more) == 2
+    assert archive.load('XAUUSD')['time_msc'].tolist() == [FIRST, FIRST + 250, FIRST + 250, FIRST + 500]
+
+
+def test_compact_replaces_the_chunks_under_a_new_name(tmp_path):
+    archive = TickArchive(tmp_path)
+    archive.append('XAUUSD', _ticks([FIRST - 500, FIRST]))
+    archive.append('XAUUSD', _ticks([FIRST + 250, FIRST + 500]))
+    day = str(np.datetime64(FIRST // DAY, 'D'))
+    before = {chunk[1] for chunk in archive.index('XAUUSD')}
+
+    archive.compact('XAUUSD', day)
+    chunks = archive.index('XAUUSD')
+    assert len(chunks) == 1 and chunks[0][1] not in before
+    files = sorted(p.name for p in (tmp_path / 'XAUUSD' / day).iterdir())
+    assert files == [chunks[0][1].split('/')[-1]]
+    assert archive.load('XAUUSD')['time_msc'].tolist() == [FIRST - 500, FIRST, FIRST + 250, FIRST + 500]
+
+
+def test_poll_keeps_ticks_sharing_the_last_millisecond(tmp_path):
+    source = FakeSource(_ticks([FIRST, FIRST + 250]))
+    recorder = TickRecorder(source, ['XAUUSD'], TickArchive(tmp_path), poll_seconds=1, flush_seconds=1)
+    recorder.last['XAUUSD'] = FIRST - 1_000
+    assert recorder.poll() == 2
+
+    # the broker delivers a second tick stamped FIRST + 250 after the poll
+    source.ticks = np.concatenate([source.ticks, _ticks([FIRST + 250], bid=2001.0)])
+    assert recorder.poll() == 1
+    assert recorder.poll() == 0
+    assert recorder.flush() == 3
+    assert recorder.archive.load('XAUUSD')['bid'].tolist() == [2000.0, 2000.01, 2001.0]
+
+
+def test_flush_keeps_pending_ticks_when_the_archive_fails(tmp_path):
+    archive = FailingArchive(tmp_path)
+    recorder = TickRecorder(FakeSource(_ticks([FIRST, FIRST + 250])), ['XAUUSD'], archive,
+                            poll_seconds=1, flush_seconds=1)
+    recorder.last['XAUUSD'] = FIRST - 1_000
+    recorder.poll()
+    assert recorder.flush() == 0
+    assert len(recorder.pending['XAUUSD']) == 1
+
+    archive.fail = False
+    assert recorder.flush() == 2
+    assert recorder.pending['XAUUSD'] == []
+    assert len(archive.load('XAUUSD')) == 2